@@ -0,0 +1,153 @@
+"""This module defines a square matrix type that stores only a band of diagonals."""
+
+from typing import Union
+import numpy as np
+
+from acmpy.compat import nonnegint, require_nonnegint, NDArrayFloat
+
+
+class BandedMatrix:
+    """
+    This class models a square matrix that is zero outside a band of diagonals.
+
+    The band consists of the lower diagonals below the main diagonal and the upper diagonals above it.
+    The diagonals are stored row-aligned, i.e. data[lower + d, i] is the matrix element [i, i + d]
+    for -lower <= d <= upper. The entries of data that lie outside the matrix are zero.
+
+    Products of banded matrices are banded, with the bandwidths added,
+    so a product of n x n matrices with bandwidths w1 and w2 costs O(n * w1 * w2) instead of O(n^3).
+    Products with dense matrices are dense.
+    """
+
+    data: NDArrayFloat
+    lower: nonnegint
+    upper: nonnegint
+
+    # Make NumPy defer binary operators such as ndarray @ BandedMatrix to the reflected methods below.
+    __array_ufunc__ = None
+
+    def __init__(self, data: NDArrayFloat, lower: nonnegint, upper: nonnegint) -> None:
+        require_nonnegint('lower', lower)
+        require_nonnegint('upper', upper)
+        if data.ndim != 2 or data.shape[0] != lower + upper + 1:
+            raise ValueError(f'data must have {lower + upper + 1} rows. Got shape: {data.shape}')
+
+        self.data = data
+        self.lower = lower
+        self.upper = upper
+
+    @staticmethod
+    def from_ndarray(M: NDArrayFloat, lower: nonnegint, upper: nonnegint) -> 'BandedMatrix':
+        """Return the band of the square matrix M. Elements outside the band are ignored."""
+        n: int = M.shape[0]
+        if M.shape != (n, n):
+            raise ValueError(f'M must be square. Got shape: {M.shape}')
+
+        data: NDArrayFloat = np.zeros((lower + upper + 1, n))
+        for d in range(-lower, upper + 1):
+            lo, hi = BandedMatrix.diagonal_rows(n, d)
+            data[lower + d, lo:hi] = M[np.arange(lo, hi), np.arange(lo + d, hi + d)]
+
+        return BandedMatrix(data, lower, upper)
+
+    @staticmethod
+    def diagonal_rows(n: int, d: int) -> tuple[int, int]:
+        """Return the range of rows i for which [i, i + d] lies inside an n x n matrix."""
+        return max(0, -d), min(n, n - d)
+
+    @property
+    def n(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.n, self.n
+
+    @property
+    def nbytes(self) -> int:
+        """Return the number of bytes of the stored diagonals."""
+        return self.data.nbytes
+
+    def diagonal(self, d: int = 0) -> NDArrayFloat:
+        """Return the elements [i, i + d] of the diagonal d."""
+        if -self.lower <= d <= self.upper:
+            lo, hi = BandedMatrix.diagonal_rows(self.n, d)
+            return self.data[self.lower + d, lo:hi]
+
+        return np.zeros(max(0, self.n - abs(d)))
+
+    def toarray(self) -> NDArrayFloat:
+        """Return the dense matrix."""
+        n: int = self.n
+        M: NDArrayFloat = np.zeros((n, n))
+        for d in range(-self.lower, self.upper + 1):
+            lo, hi = BandedMatrix.diagonal_rows(n, d)
+            M[np.arange(lo, hi), np.arange(lo + d, hi + d)] = self.data[self.lower + d, lo:hi]
+
+        return M
+
+    def __mul__(self, c: float) -> 'BandedMatrix':
+        return BandedMatrix(self.data * c, self.lower, self.upper)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, c: float) -> 'BandedMatrix':
+        return BandedMatrix(self.data / c, self.lower, self.upper)
+
+    def __neg__(self) -> 'BandedMatrix':
+        return BandedMatrix(-self.data, self.lower, self.upper)
+
+    def __matmul__(self, other: Union['BandedMatrix', NDArrayFloat]) -> Union['BandedMatrix', NDArrayFloat]:
+        n: int = self.n
+        if other.shape[0] != n:
+            raise ValueError(f'Incompatible shapes for matrix product: {self.shape}, {other.shape}')
+
+        if isinstance(other, BandedMatrix):
+            lower: int = min(self.lower + other.lower, n - 1)
+            upper: int = min(self.upper + other.upper, n - 1)
+
+            # Once the band covers the whole matrix a dense product is faster.
+            if lower + upper + 1 >= n:
+                return self.toarray() @ other.toarray()
+
+            data: NDArrayFloat = np.zeros((lower + upper + 1, n))
+            for p in range(-self.lower, self.upper + 1):
+                lo, hi = BandedMatrix.diagonal_rows(n, p)
+                for q in range(-other.lower, other.upper + 1):
+                    if -lower <= p + q <= upper:
+                        # [i, i + p + q] += [i, i + p] * [i + p, i + p + q]
+                        data[lower + p + q, lo:hi] += self.data[self.lower + p, lo:hi] \
+                            * other.data[other.lower + q, lo + p:hi + p]
+
+            return BandedMatrix(data, lower, upper)
+
+        res: NDArrayFloat = np.zeros(other.shape)
+        for p in range(-self.lower, self.upper + 1):
+            lo, hi = BandedMatrix.diagonal_rows(n, p)
+            # [i, :] += [i, i + p] * other[i + p, :]
+            res[lo:hi] += self.data[self.lower + p, lo:hi].reshape((-1,) + (1,) * (other.ndim - 1)) \
+                * other[lo + p:hi + p]
+
+        return res
+
+    def __rmatmul__(self, other: NDArrayFloat) -> NDArrayFloat:
+        n: int = self.n
+        if other.shape[-1] != n:
+            raise ValueError(f'Incompatible shapes for matrix product: {other.shape}, {self.shape}')
+
+        res: NDArrayFloat = np.zeros(other.shape)
+        for p in range(-self.lower, self.upper + 1):
+            lo, hi = BandedMatrix.diagonal_rows(n, p)
+            # [:, i + p] += other[:, i] * [i, i + p]
+            res[..., lo + p:hi + p] += other[..., lo:hi] * self.data[self.lower + p, lo:hi]
+
+        return res
+
+
+RadialMatrix = Union[BandedMatrix, NDArrayFloat]
+"""A radial operator matrix is either banded or dense."""
+
+
+def to_ndarray(M: RadialMatrix) -> NDArrayFloat:
+    """Return M as a dense matrix."""
+    return M.toarray() if isinstance(M, BandedMatrix) else M
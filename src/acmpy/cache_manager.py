@@ -0,0 +1,243 @@
+"""This module manages the caches that implement the Maple remember option of the Rep* procedures.
+
+Explanation
+===========
+
+The Maple code uses the remember option on the procedures that build representation matrices,
+and uses forget to clear their remember tables at the end of each call of RepXspace,
+RepRadial_Prod, RepRadial_LC and RepSO5r3_Prod, so that each calculation starts afresh.
+
+Here, each such procedure is decorated with ``@managed_cache`` instead of ``@cache``.
+All these caches are registered with the ``cache_manager`` which applies one of the following policies:
+
+- ``CachePolicy.CLEAR_PER_CALL``: the caches are cleared at the end of each call, as in the Maple code
+- ``CachePolicy.KEEP_ACROSS_CALLS``: the caches are never cleared, so later calls reuse earlier matrices
+- ``CachePolicy.BOUNDED``: the caches are kept, but each holds at most a budget of array bytes
+  and evicts its least recently used entries when it exceeds its budget
+
+Each cache counts its hits, misses and evictions and the bytes it holds.
+Other stores of matrices, e.g. the spherical_store, are registered with the ``cache_manager`` too,
+so that they are cleared by ``cache_manager.clear()`` and kept within their budget under the bounded policy,
+although they are not cleared at the end of each call.
+
+A procedure whose matrices also depend on a setting of the current ACMContext, e.g. the lambda function,
+is decorated with ``@cache_manager.cache_by(key)`` instead, where key returns that setting,
+so that calculations with different settings do not share cached matrices.
+"""
+
+import sys
+from collections import OrderedDict
+from enum import Enum
+from functools import update_wrapper
+from threading import RLock
+from typing import Any, Callable, Hashable, NamedTuple, Optional, Union
+
+import numpy as np
+
+
+class CachePolicy(Enum):
+    """The policies that the cache manager can apply."""
+    CLEAR_PER_CALL = 'clear-per-call'
+    KEEP_ACROSS_CALLS = 'keep-across-calls'
+    BOUNDED = 'bounded'
+
+
+class CacheInfo(NamedTuple):
+    """The statistics of a cache."""
+    hits: int
+    misses: int
+    evictions: int
+    currsize: int
+    nbytes: int
+    max_bytes: Optional[int]
+
+
+def value_nbytes(value: Any) -> int:
+    """Return the number of bytes held by a cached value, counting the array data of matrices."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(value_nbytes(item) for item in value)
+    nbytes: Optional[int] = getattr(value, 'nbytes', None)
+    return nbytes if isinstance(nbytes, int) else sys.getsizeof(value)
+
+
+class ManagedStore:
+    """
+    This class models a store of values whose size is managed by the cache manager.
+    Its entries are kept in least recently used order, with the number of bytes of each.
+    """
+
+    manager: 'CacheManager'
+    max_bytes: Optional[int]
+    entries: OrderedDict[Hashable, tuple[Any, int]]
+    hits: int
+    misses: int
+    evictions: int
+    nbytes: int
+
+    def __init__(self, manager: 'CacheManager', max_bytes: Optional[int] = None) -> None:
+        self.manager = manager
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self.lock = RLock()
+
+    def insert(self, key: Hashable, value: Any) -> None:
+        """Add the value unless the key is already present, evicting entries to keep within the budget."""
+        size: int = value_nbytes(value)
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = (value, size)
+                self.nbytes += size
+                self.evict()
+
+    def budget(self) -> Optional[int]:
+        """Return the maximum number of bytes this cache may hold, or None if unbounded."""
+        if self.manager.policy is not CachePolicy.BOUNDED:
+            return None
+        return self.max_bytes if self.max_bytes is not None else self.manager.default_max_bytes
+
+    def evict(self) -> None:
+        """Evict the least recently used entries until the cache is within its budget."""
+        budget: Optional[int] = self.budget()
+        if budget is None:
+            return
+
+        with self.lock:
+            while self.nbytes > budget and self.entries:
+                _, (_, size) = self.entries.popitem(last=False)
+                self.nbytes -= size
+                self.evictions += 1
+
+    def cache_clear(self) -> None:
+        """Clear the cache. The statistics are kept."""
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self.entries), self.nbytes, self.budget())
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class ManagedCache(ManagedStore):
+    """This class models a function whose results are cached by the cache manager."""
+
+    fn: Callable
+    context_key: Optional[Callable[[], Hashable]]
+
+    def __init__(self, fn: Callable, manager: 'CacheManager', max_bytes: Optional[int] = None,
+                 context_key: Optional[Callable[[], Hashable]] = None) -> None:
+        super().__init__(manager, max_bytes)
+        update_wrapper(self, fn)
+        self.fn = fn
+        self.context_key = context_key
+
+    def __call__(self, *args, **kwargs) -> Any:
+        key: Hashable = args if not kwargs else args + (ManagedCache,) + tuple(sorted(kwargs.items()))
+        if self.context_key is not None:
+            key = (self.context_key(), key)
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+
+        value: Any = self.fn(*args, **kwargs)
+
+        with self.lock:
+            self.misses += 1
+            self.insert(key, value)
+
+        return value
+
+    def __reduce__(self) -> str:
+        # pickle a managed cache by reference to the module level function it decorates
+        return self.fn.__qualname__
+
+
+class CacheManager:
+    """This class manages a set of caches under a common policy."""
+
+    policy: CachePolicy
+    default_max_bytes: int
+    caches: dict[str, ManagedStore]
+
+    def __init__(self, policy: CachePolicy = CachePolicy.CLEAR_PER_CALL,
+                 default_max_bytes: int = 256 * 2 ** 20) -> None:
+        self.policy = policy
+        self.default_max_bytes = default_max_bytes
+        self.caches = {}
+
+    def cache(self, fn: Callable, context_key: Optional[Callable[[], Hashable]] = None) -> ManagedCache:
+        """Decorate fn with a cache registered with this manager."""
+        managed: ManagedCache = ManagedCache(fn, self, context_key=context_key)
+        self.register(fn.__name__, managed)
+        return managed
+
+    def register(self, name: str, store: ManagedStore) -> None:
+        """Register a store with this manager, so that it is cleared and bounded with the caches."""
+        self.caches[name] = store
+
+    def cache_by(self, context_key: Callable[[], Hashable]) -> Callable[[Callable], ManagedCache]:
+        """Return a decorator of functions with a cache whose keys also include the value of context_key()."""
+        return lambda fn: self.cache(fn, context_key)
+
+    def get_cache(self, name: Union[str, ManagedStore]) -> ManagedStore:
+        return self.caches[name] if isinstance(name, str) else name
+
+    def set_policy(self, policy: Union[CachePolicy, str], default_max_bytes: Optional[int] = None) -> None:
+        """Set the policy, and optionally the default budget of each cache in bytes."""
+        self.policy = CachePolicy(policy)
+        if default_max_bytes is not None:
+            if default_max_bytes < 0:
+                raise ValueError(f'default_max_bytes must be nonnegative. Got: {default_max_bytes}')
+            self.default_max_bytes = default_max_bytes
+        for managed in self.caches.values():
+            managed.evict()
+
+    def set_max_bytes(self, name: Union[str, ManagedStore], max_bytes: Optional[int]) -> None:
+        """Set the budget of one cache in bytes, or None to use the default budget."""
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(f'max_bytes must be nonnegative. Got: {max_bytes}')
+        managed: ManagedStore = self.get_cache(name)
+        managed.max_bytes = max_bytes
+        managed.evict()
+
+    def end_of_call(self, *caches: ManagedStore) -> None:
+        """Clear the given caches if the policy is to clear them at the end of each call."""
+        if self.policy is CachePolicy.CLEAR_PER_CALL:
+            for managed in caches:
+                managed.cache_clear()
+
+    def clear(self) -> None:
+        """Clear all the caches."""
+        for managed in self.caches.values():
+            managed.cache_clear()
+
+    def stats(self) -> dict[str, CacheInfo]:
+        """Return the statistics of each cache."""
+        return {name: managed.cache_info() for name, managed in self.caches.items()}
+
+    def reset_stats(self) -> None:
+        for managed in self.caches.values():
+            managed.reset_stats()
+
+    def nbytes(self) -> int:
+        """Return the total number of bytes held by all the caches."""
+        return sum(managed.nbytes for managed in self.caches.values())
+
+
+cache_manager: CacheManager = CacheManager()
+"""The cache manager of the Rep* procedures."""
+
+managed_cache: Callable[[Callable], ManagedCache] = cache_manager.cache
+"""The decorator that replaces @cache on the Rep* procedures."""
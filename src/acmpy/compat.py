@@ -18,6 +18,8 @@ nonnegint = int
 posint = int
 
 NDArrayFloat = npt.NDArray[np.float64]
+NDArrayInt = npt.NDArray[np.int_]
+NDArrayBool = npt.NDArray[np.bool_]
 
 
 def require_algebraic(name: str, value: Expr) -> None:
@@ -1,6 +1,12 @@
 """This module computes eigenvalues and eigenbases."""
 
+import warnings
+from typing import Hashable, NamedTuple, Optional, Union
+
 import numpy as np
+import scipy.linalg as la
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
 from sympy import Matrix, shape
 from acmpy.compat import NDArrayFloat
 
@@ -77,6 +83,199 @@ def Eigenfiddle(Hmatrix: NDArrayFloat) -> tuple[NDArrayFloat, NDArrayFloat]:
     return eigenvalues, P
 
 
+EIGSH_MIN_DIM: int = 200
+"""The smallest dimension of a sparse matrix that is diagonalised by ARPACK rather than LAPACK."""
+
+
+# # The following procedure has no Maple counterpart.
+# # It is Eigenfiddle restricted to the lowest eig_num eigenvalues,
+# # which are returned in ascending order, together with the matrix
+# # whose eig_num columns are the corresponding (orthonormal) eigenvectors.
+# # If eig_num is None, or not less than the dimension, all the eigenvalues are obtained.
+# # A dense Hmatrix is diagonalised by LAPACK, restricted to the required eigenvalues.
+# # A sparse Hmatrix is diagonalised by the Lanczos method of ARPACK,
+# # unless it is too small for that to be worthwhile, or the method does not converge.
+def Eigenfiddle_lowest(Hmatrix: Union[NDArrayFloat, sp.spmatrix], eig_num: Optional[int]
+                       ) -> tuple[NDArrayFloat, NDArrayFloat]:
+    n, m = Hmatrix.shape
+    if n != m:
+        raise ValueError(f'Matrix is not square: {n}, {m}')
+
+    if eig_num is not None and eig_num < 1:
+        raise ValueError(f'eig_num must be positive: {eig_num}')
+
+    if eig_num is None or eig_num >= n:
+        return Eigenfiddle(Hmatrix if isinstance(Hmatrix, np.ndarray) else Hmatrix.toarray())
+
+    eigenvalues: NDArrayFloat
+    P: NDArrayFloat
+
+    if not isinstance(Hmatrix, np.ndarray) and n > EIGSH_MIN_DIM and eig_num < n // 2:
+        H_sparse: sp.csr_matrix = sp.csr_matrix((Hmatrix + Hmatrix.T) / 2)
+        # a fixed random starting vector, so that the results are reproducible
+        v0: NDArrayFloat = np.random.default_rng(0).uniform(-1.0, 1.0, size=(n,))
+        try:
+            eigenvalues, P = spla.eigsh(H_sparse, k=eig_num, which='SA', v0=v0)
+        except spla.ArpackNoConvergence:
+            # the dense diagonalisation below is slower but always succeeds
+            pass
+        else:
+            order: np.ndarray = np.argsort(eigenvalues)
+            return eigenvalues[order], P[:, order]
+
+    H_dense: NDArrayFloat = Hmatrix if isinstance(Hmatrix, np.ndarray) else Hmatrix.toarray()
+    H_sym: NDArrayFloat = (H_dense + H_dense.T) / 2
+    eigenvalues, P = la.eigh(H_sym, subset_by_index=[0, eig_num - 1])
+
+    return eigenvalues, P
+
+
+# # The following procedure has no Maple counterpart.
+# # It returns the number of negative eigenvalues of the symmetric Hmatrix,
+# # which by Sylvester's law of inertia is that of the block diagonal factor D
+# # of its factorisation L*D*L^T, whose blocks are 1x1 or 2x2.
+def Negative_count(Hmatrix: NDArrayFloat) -> int:
+    D: NDArrayFloat
+    _, D, _ = la.ldl(Hmatrix)
+    n: int = D.shape[0]
+
+    count: int = 0
+    i: int = 0
+    while i < n:
+        if i + 1 < n and D[i + 1, i] != 0:
+            # a 2x2 block has a negative eigenvalue for each negative one of its determinant and trace
+            det: float = D[i, i] * D[i + 1, i + 1] - D[i + 1, i] * D[i, i + 1]
+            if det < 0:
+                count += 1
+            elif D[i, i] + D[i + 1, i + 1] < 0:
+                count += 2
+            i += 2
+        else:
+            if D[i, i] < 0:
+                count += 1
+            i += 1
+
+    return count
+
+
+class EigenSolveStats(NamedTuple):
+    """
+    The statistics of a diagonalisation by an EigenSession: method is 'lobpcg' if the warm-started
+    iteration converged to the lowest eigenvalues, 'eigh' if a dense diagonalisation was used from the start,
+    and 'fallback' if it was used because the iteration did not converge.
+    """
+    key: Hashable
+    dim: int
+    method: str
+    iterations: int
+
+
+class EigenSession:
+    """
+    This class models a sequence of diagonalisations of slowly varying symmetric matrices,
+    e.g. those of the L spaces of a Hamiltonian at neighbouring points of a parameter scan,
+    of which only the lowest eig_num eigenvalues are required.
+
+    The eigenvectors obtained for a key, e.g. L, are the initial block of the LOBPCG iteration for the same key
+    in the next diagonalisation. The iteration has converged when the residual of each eigenvector is below
+    tol times the scale of the eigenvalues. Small residuals only show that the eigenvectors span an invariant
+    subspace, e.g. that of a seniority block, so the eigenvalues are only accepted if no other eigenvalue
+    lies below the highest of them, as counted by the inertia of the shifted matrix.
+    Without a previous eigenbasis of the same dimension, or if the iteration does not converge
+    within maxiter iterations to the lowest eigenvalues, the lowest eigenvalues
+    are obtained by a dense diagonalisation instead.
+    """
+
+    eig_num: int
+    tol: float
+    maxiter: int
+    bases: dict[Hashable, NDArrayFloat]
+    stats: list[EigenSolveStats]
+
+    def __init__(self, eig_num: int, tol: float = 1e-8, maxiter: int = 100) -> None:
+        if eig_num < 1:
+            raise ValueError(f'eig_num must be positive: {eig_num}')
+        if tol <= 0:
+            raise ValueError(f'tol must be positive: {tol}')
+        if maxiter < 1:
+            raise ValueError(f'maxiter must be positive: {maxiter}')
+
+        self.eig_num = eig_num
+        self.tol = tol
+        self.maxiter = maxiter
+        self.bases = {}
+        self.stats = []
+
+    def solve(self, key: Hashable, Hmatrix: Union[NDArrayFloat, sp.spmatrix]) -> tuple[NDArrayFloat, NDArrayFloat]:
+        """Return the lowest eigenvalues of Hmatrix and their eigenvectors, starting from those of the key."""
+        n, m = Hmatrix.shape
+        if n != m:
+            raise ValueError(f'Matrix is not square: {n}, {m}')
+
+        k: int = min(self.eig_num, n)
+        X: Optional[NDArrayFloat] = self.bases.get(key)
+
+        method: str = 'eigh'
+        iterations: int = 0
+        eigenvalues: NDArrayFloat
+        P: NDArrayFloat
+
+        # LOBPCG is only worthwhile when the block is small compared to the dimension
+        if X is not None and X.shape == (n, k) and 5 * k < n:
+            H: Union[NDArrayFloat, sp.spmatrix] = (Hmatrix + Hmatrix.T) / 2
+            # the eigenvalues are estimated by the Rayleigh quotients of the initial block
+            rayleigh: NDArrayFloat = np.sum(X * (H @ X), axis=0)
+            scale: float = max(1.0, float(np.max(np.abs(rayleigh))))
+
+            # a diagonal preconditioner approximating the inverse of H shifted to near its lowest eigenvalue
+            diagonal: NDArrayFloat = H.diagonal()
+            M: sp.dia_matrix = sp.diags(1 / (np.abs(diagonal - np.min(rayleigh)) + scale))
+
+            residual_history: list[NDArrayFloat]
+            with warnings.catch_warnings():
+                # non-convergence is detected below from the residuals
+                warnings.simplefilter('ignore', UserWarning)
+                eigenvalues, P, residual_history = spla.lobpcg(H, X, M=M, tol=self.tol * scale, maxiter=self.maxiter,
+                                                               largest=False, retResidualNormsHistory=True)
+
+            # the history has an entry for the initial block, each iteration, and the final and postprocessed blocks
+            iterations = max(0, len(residual_history) - 3)
+            order: np.ndarray = np.argsort(eigenvalues)
+            eigenvalues, P = eigenvalues[order], P[:, order]
+
+            residuals: NDArrayFloat = np.linalg.norm(H @ P - P * eigenvalues, axis=0)
+            if np.all(residuals <= self.tol * scale):
+                # a level that crossed below from outside the span of the initial block is missed by the iteration
+                shift: float = eigenvalues[-1] - self.tol * scale
+                H_dense: NDArrayFloat = H if isinstance(H, np.ndarray) else H.toarray()
+                below: int = Negative_count(H_dense - shift * np.eye(n))
+                method = 'lobpcg' if below == np.count_nonzero(eigenvalues < shift) else 'fallback'
+            else:
+                method = 'fallback'
+
+        if method != 'lobpcg':
+            eigenvalues, P = Eigenfiddle_lowest(Hmatrix, k)
+
+        self.bases[key] = P
+        self.stats.append(EigenSolveStats(key, n, method, iterations))
+
+        return eigenvalues, P
+
+    def reset(self) -> None:
+        """Forget the previous eigenbases and statistics."""
+        self.bases.clear()
+        self.stats.clear()
+
+    @property
+    def iterations(self) -> int:
+        """The total number of LOBPCG iterations, including those of iterations that did not converge."""
+        return sum(stat.iterations for stat in self.stats)
+
+    def count(self, method: str) -> int:
+        """Return the number of diagonalisations that used the method."""
+        return sum(1 for stat in self.stats if stat.method == method)
+
+
 def Eigenvectors(M: Matrix) -> tuple[list[float], Matrix]:
     """Return the eigenvalues and eigenvectors as in Maple."""
     P: Matrix
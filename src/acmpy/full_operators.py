@@ -1,26 +1,42 @@
 """6. Procedures that represent operators on the full (cross-product) Hilbert space."""
 
 import numpy as np
-from typing import Optional
+import scipy.sparse as sp
 from functools import cache
+from typing import Callable, Optional, Union
 
-from sympy import S, Symbol, Expr, Matrix, zeros, eye, Rational, sqrt
+from sympy import S, Symbol, Expr, Matrix, zeros, eye, Rational, sqrt, lambdify
 
 from acmpy.compat import nonnegint, require_nonnegint, require_nonnegint_range, posint, require_posint, \
-    NDArrayFloat, Matrix_to_ndarray
+    NDArrayFloat, NDArrayInt, Matrix_to_ndarray
 from acmpy.spherical_space import dimSO5r3_rngVvarL, lbsSO5r3_rngVvarL, lbsSO5r3_rngL, \
     Alpha, AngularMomentum, Seniority, SO5SO3Label, dimSO3, Spherical_Operators
 from acmpy.radial_bases import Nu, dimRadial, lbsRadial
-from acmpy.radial_space import RepRadial, RepRadial_param, \
-    RepRadial_bS_DS, RepRadialshfs_Prod, RepRadial_Prod_rem, RepRadial_LC_rem, Radial_Operators, Radial_Db, \
-    Radial_bm, Radial_bm2, Radial_D2b, Radial_bDb, Radial_b, RepRadial_b2_sqrt, RepRadial_b2_sqrtInv
+from acmpy.radial_space import RepRadial, RepRadial_band, RepRadial_param, \
+    RepRadial_bS_DS_band, RepRadialshfs_Prod, RepRadialshfs_Prod_band, RepRadial_Prod_rem, RepRadial_LC_rem, \
+    Radial_Operators, Radial_Db, \
+    Radial_bm, Radial_bm2, Radial_D2b, Radial_bDb, Radial_b, RepRadial_b2_eigen, RepRadial_b2_sqrt, \
+    RepRadial_b2_sqrtInv
 from acmpy.internal_operators import NUMBER, SENIORITY, ALFA, ANGMOM, RepSO5_Y_rem, RepSO5r3_Prod_rem, \
     Convert_red, NumSO5r3_Prod, Qred_p1, Qred_m1, QxQred_p2, QxQred_m2, QxQred_0, QxQxQred_p3, QxQxQred_m3, \
     QxQxQred_m1, QxQxQred_p1, ME_SO5red, Xspace_Pi, Xspace_PiPi2, Xspace_PiPi4, Xspace_PiqPi, \
     OperatorSum, OperatorTerm, OperatorProduct
+from acmpy.cache_manager import ManagedCache, cache_manager
 from acmpy.so5_so3_cg import CG_SO5r3
 import acmpy.globals as g
-from acmpy.globals import ACM_eval_lambda_fun
+from acmpy.globals import ACM_eval_lambda_fun, ACMContext, use_context
+
+XspaceMatrix = Union[NDArrayFloat, sp.bsr_matrix]
+"""
+A representation matrix on the full Hilbert space, either dense or, if requested with sparse=True,
+a scipy.sparse BSR matrix whose blocks act on the radial space.
+"""
+
+lambda_fun_cache: Callable[[Callable], ManagedCache] = cache_manager.cache_by(lambda: g.glb_lam_fun)
+"""
+The decorator that replaces @cache on the Rep* procedures whose matrices depend on the lambda function,
+so that calculations in contexts with different lambda functions do not share their matrices.
+"""
 
 
 # ###########################################################################
@@ -93,6 +109,31 @@ def lbsXspace(nu_min: nonnegint, nu_max: nonnegint,
     return [(nu,) + s for s in sph_labels for nu in rad_labels]
 
 
+# # The following procedure has no Maple counterpart.
+# # It returns the labels of lbsXspace as four float arrays nu, v, alpha, L,
+# # for the evaluation of coefficients that are functions of the labels.
+XspaceLabelArrays = tuple[NDArrayFloat, NDArrayFloat, NDArrayFloat, NDArrayFloat]
+
+
+def lbsXspace_arrays(nu_min: nonnegint, nu_max: nonnegint,
+                     v_min: nonnegint, v_max: nonnegint,
+                     L_min: nonnegint, L_max: Optional[nonnegint]
+                     ) -> XspaceLabelArrays:
+    Xlabels: NDArrayFloat = np.array(lbsXspace(nu_min, nu_max, v_min, v_max, L_min, L_max),
+                                     dtype=np.float64).reshape((-1, 4))
+    nu, v, a, L = Xlabels.T
+    return nu, v, a, L
+
+
+# # The following procedure has no Maple counterpart.
+# # It compiles a coefficient, i.e. an expression in NUMBER, SENIORITY, ALFA and ANGMOM,
+# # into a function of the label arrays returned by lbsXspace_arrays.
+# # The compiled function is remembered.
+@cache
+def Xspace_coeff_fun(coeff: Expr) -> Callable[..., NDArrayFloat]:
+    return lambdify((NUMBER, SENIORITY, ALFA, ANGMOM), coeff, modules='numpy')
+
+
 # ###########################################################################
 #
 #
@@ -231,61 +272,61 @@ def RepXspace(x_oplc: OperatorSum,
               anorm: float, lambda_base: float,
               nu_min: nonnegint, nu_max: nonnegint,
               v_min: nonnegint, v_max: nonnegint,
-              L: nonnegint, L_max: Optional[nonnegint] = None
-              ) -> NDArrayFloat:
+              L: nonnegint, L_max: Optional[nonnegint] = None,
+              sparse: bool = False, context: Optional[ACMContext] = None
+              ) -> XspaceMatrix:
+    if context is not None:
+        with use_context(context):
+            return RepXspace(x_oplc, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L, L_max, sparse)
+
     require_nonnegint_range('nu', nu_min, nu_max)
     require_nonnegint_range('v', v_min, v_max)
     if L_max is None:
         L_max = L
     require_nonnegint_range('L', L, L_max)
 
-    Rmat: NDArrayFloat
+    Rmat: XspaceMatrix
     if len(x_oplc) == 0:
         d: int = dimXspace(nu_min, nu_max, v_min, v_max, L, L_max)
         Rmat = np.zeros((d, d), dtype=np.float64)
     else:
-        Xlabels: list[XspaceLabel] = lbsXspace(nu_min, nu_max, v_min, v_max, L, L_max)
-        Rmat = RepXspace_Term(x_oplc[0], Xlabels, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L, L_max)
+        Xlabels: XspaceLabelArrays = lbsXspace_arrays(nu_min, nu_max, v_min, v_max, L, L_max)
+        Rmat = RepXspace_Term(x_oplc[0], Xlabels, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L, L_max,
+                              sparse)
         for op_term in x_oplc[1:]:
-            Rmat = Rmat + RepXspace_Term(op_term, Xlabels, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L, L_max)
-
-    RepRadial.cache_clear()
-    RepRadial_param.cache_clear()
-    RepRadial_b2_sqrt.cache_clear()
-    RepRadial_b2_sqrtInv.cache_clear()
-    RepRadial_bS_DS.cache_clear()
-    RepRadialshfs_Prod.cache_clear()
-    RepRadial_Prod_rem.cache_clear()
-    RepRadial_LC_rem.cache_clear()
-    RepXspace_Pi.cache_clear()
-    RepXspace_PiPi.cache_clear()
-    RepXspace_PiqPi.cache_clear()
-    RepSO5_Y_rem.cache_clear()
-    RepSO5r3_Prod_rem.cache_clear()
+            Rmat = Rmat + RepXspace_Term(op_term, Xlabels, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L, L_max,
+                                         sparse)
+
+    if sparse:
+        rad_dim: int = dimRadial(nu_min, nu_max)
+        Rmat = sp.bsr_matrix(Rmat, blocksize=(rad_dim, rad_dim))
+
+    cache_manager.end_of_call(*RepXspace_remembered)
 
     return Rmat
 
 
-def RepXspace_Term(op_term: OperatorTerm, Xlabels: list[XspaceLabel],
+def RepXspace_Term(op_term: OperatorTerm, Xlabels: XspaceLabelArrays,
                    anorm: float, lambda_base: float,
                    nu_min: nonnegint, nu_max: nonnegint,
                    v_min: nonnegint, v_max: nonnegint,
-                   L: nonnegint, L_max: nonnegint
-                   ) -> NDArrayFloat:
+                   L: nonnegint, L_max: nonnegint,
+                   sparse: bool = False
+                   ) -> XspaceMatrix:
     """Compute the matrix representation of the operator term acting on the truncated full Hilbert space."""
     prod: OperatorProduct = op_term[1]
-    Rmat: NDArrayFloat = RepXspace_Prod(prod, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L, L_max)
+    Rmat: XspaceMatrix = RepXspace_Prod(prod, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L, L_max, sparse)
 
     coeff: Expr = op_term[0]
     if coeff.is_constant():
         return float(coeff) * Rmat
 
-    coeffs: list[Expr] = [coeff.subs({NUMBER: nu,
-                                      SENIORITY: v,
-                                      ALFA: a,
-                                      ANGMOM: L})
-                          for (nu, v, a, L) in Xlabels]
-    return np.array([float(c) for c in coeffs]) * Rmat
+    diagonal: NDArrayFloat = np.broadcast_to(np.asarray(Xspace_coeff_fun(coeff)(*Xlabels), dtype=np.float64),
+                                             Xlabels[0].shape)
+    if sparse:
+        return Rmat @ sp.diags(diagonal)
+
+    return diagonal * Rmat
 
 
 # # The procedure RepXspace_Prod below returns the (alternative SO(3)-reduced)
@@ -403,19 +444,20 @@ def RepXspace_Prod(x_ops: tuple[Symbol, ...],
                    anorm: float, lambda_base: float,
                    nu_min: nonnegint, nu_max: nonnegint,
                    v_min: nonnegint, v_max: nonnegint,
-                   L_min: nonnegint, L_max: Optional[nonnegint]
-                   ) -> NDArrayFloat:
+                   L_min: nonnegint, L_max: Optional[nonnegint],
+                   sparse: bool = False
+                   ) -> XspaceMatrix:
     if L_max is None:
         L_max = L_min
     require_nonnegint_range('nu', nu_min, nu_max)
     require_nonnegint_range('v', v_min, v_max)
     require_nonnegint_range('L', L_min, L_max)
 
-    run_Mat: Optional[NDArrayFloat] = None
+    run_Mat: Optional[XspaceMatrix] = None
     up_running: int = 0
     sph_ops: tuple[Symbol, ...] = ()
     nu_ops: tuple[Symbol, ...] = ()
-    xsp_Mat: NDArrayFloat
+    xsp_Mat: XspaceMatrix
 
     for this_op in x_ops:
 
@@ -429,7 +471,8 @@ def RepXspace_Prod(x_ops: tuple[Symbol, ...],
                                          anorm, lambda_base,
                                          nu_min, nu_max,
                                          v_min, v_max,
-                                         L_min, L_max)
+                                         L_min, L_max,
+                                         sparse)
                 nu_ops = ()
                 sph_ops = ()
                 if up_running > 0:
@@ -464,6 +507,9 @@ def RepXspace_Prod(x_ops: tuple[Symbol, ...],
                 raise ValueError(f'Operator {this_op} undefined.')
 
             assert xsp_Mat is not None
+            if sparse:
+                # the Xspace operators are remembered as dense matrices
+                xsp_Mat = sp.bsr_matrix(xsp_Mat, blocksize=(dimRadial(nu_min, nu_max),) * 2)
             if up_running > 0:
                 assert run_Mat is not None
                 run_Mat = run_Mat @ xsp_Mat
@@ -477,7 +523,8 @@ def RepXspace_Prod(x_ops: tuple[Symbol, ...],
                                  anorm, lambda_base,
                                  nu_min, nu_max,
                                  v_min, v_max,
-                                 L_min, L_max)
+                                 L_min, L_max,
+                                 sparse)
 
         if up_running > 0:
             assert run_Mat is not None
@@ -489,9 +536,10 @@ def RepXspace_Prod(x_ops: tuple[Symbol, ...],
 
     if up_running == 0:
         assert run_Mat is None
-        run_Mat = np.eye(dimXspace(nu_min, nu_max,
-                                   v_min, v_max,
-                                   L_min, L_max))
+        d: int = dimXspace(nu_min, nu_max,
+                           v_min, v_max,
+                           L_min, L_max)
+        run_Mat = sp.identity(d, format='csr') if sparse else np.eye(d)
 
     assert run_Mat is not None
     return run_Mat
@@ -613,15 +661,16 @@ def RepXspace_Twin(rad_ops: tuple[Symbol, ...], sph_ops: tuple[Symbol, ...],
                    anorm: float, lambda_base: float,
                    nu_min: nonnegint, nu_max: nonnegint,
                    v_min: nonnegint, v_max: nonnegint,
-                   L_min: nonnegint, L_max: Optional[nonnegint]
-                   ) -> NDArrayFloat:
+                   L_min: nonnegint, L_max: Optional[nonnegint],
+                   sparse: bool = False
+                   ) -> XspaceMatrix:
     if L_max is None:
         L_max = L_min
     require_nonnegint_range('nu', nu_min, nu_max)
     require_nonnegint_range('v', v_min, v_max)
     require_nonnegint_range('L', L_min, L_max)
 
-    g.glb_nu_lap = 0
+    g.current_context().glb_nu_lap = 0
 
     sph_dim: int = dimSO5r3_rngVvarL(v_min, v_max, L_min, L_max)
     sph_labels: list[SO5SO3Label] = lbsSO5r3_rngVvarL(v_min, v_max, L_min, L_max)
@@ -632,27 +681,45 @@ def RepXspace_Twin(rad_ops: tuple[Symbol, ...], sph_ops: tuple[Symbol, ...],
     rad_dim: int = dimRadial(nu_min, nu_max)
     direct_dim: int = sph_dim * rad_dim
 
+    # Each radial block depends on the initial and final states only through their lambdas,
+    # so it is computed once for each distinct pair (lambda_disp_init, lambda_disp_fin).
+    i2s, j2s, blocks = RepXspace_Twin_blocks(rad_ops, sph_Mat, sph_labels, anorm, lambda_base, nu_min, nu_max)
+
+    if sparse:
+        indptr: NDArrayInt = np.concatenate(([0], np.cumsum(np.bincount(i2s, minlength=sph_dim))))
+        return sp.bsr_matrix((blocks, j2s, indptr), shape=(direct_dim, direct_dim))
+
     direct_Mat: NDArrayFloat = np.zeros((direct_dim, direct_dim))
-    for j2 in range(1, sph_dim + 1):
-        jdisp: int = (j2 - 1) * rad_dim
-        lambda_disp_init = ACM_eval_lambda_fun(sph_labels[j2 - 1][0])
+    direct_Mat.reshape((sph_dim, rad_dim, sph_dim, rad_dim))[i2s, :, j2s, :] = blocks
 
-        for i2 in range(1, sph_dim + 1):
-            idisp: int = (i2 - 1) * rad_dim
-            lambda_disp_fin = ACM_eval_lambda_fun(sph_labels[i2 - 1][0])
-            sph_ME: float = sph_Mat[i2 - 1, j2 - 1]
+    return direct_Mat
 
-            if sph_ME == 0:
-                continue
 
-            rad_Mat: NDArrayFloat = RepRadial_Prod_rem(rad_ops, anorm,
-                                                       lambda_base + lambda_disp_init,
-                                                       lambda_disp_fin - lambda_disp_init,
-                                                       nu_min, nu_max, g.glb_nu_lap)
+# # The following procedure has no Maple counterpart.
+# # It returns the positions (i2,j2) of the nonzero elements of sph_Mat, row by row,
+# # and the corresponding blocks sph_Mat[i2,j2] * rad_Mat of RepXspace_Twin,
+# # computing rad_Mat once for each distinct pair of initial and final lambdas.
+def RepXspace_Twin_blocks(rad_ops: tuple[Symbol, ...], sph_Mat: NDArrayFloat, sph_labels: list[SO5SO3Label],
+                          anorm: float, lambda_base: float,
+                          nu_min: nonnegint, nu_max: nonnegint
+                          ) -> tuple[NDArrayInt, NDArrayInt, NDArrayFloat]:
+    rad_dim: int = dimRadial(nu_min, nu_max)
 
-            direct_Mat[idisp:(idisp + rad_dim), jdisp:(jdisp + rad_dim)] = rad_Mat * sph_ME
+    lambda_disp: dict[Seniority, nonnegint] = {v: ACM_eval_lambda_fun(v) for v in {v for v, _, _ in sph_labels}}
+    lambdas: NDArrayInt = np.array([lambda_disp[v] for v, _, _ in sph_labels])
 
-    return direct_Mat
+    i2s, j2s = np.nonzero(sph_Mat)
+    pairs, group = np.unique(np.stack((lambdas[j2s], lambdas[i2s]), axis=1), axis=0, return_inverse=True)
+
+    rad_Mats: NDArrayFloat = np.zeros((len(pairs), rad_dim, rad_dim))
+    for k, (lambda_disp_init, lambda_disp_fin) in enumerate(pairs.tolist()):
+        rad_Mats[k] = RepRadial_Prod_rem(rad_ops, anorm,
+                                         lambda_base + lambda_disp_init,
+                                         lambda_disp_fin - lambda_disp_init,
+                                         nu_min, nu_max, g.glb_nu_lap)
+
+    blocks: NDArrayFloat = rad_Mats[group.reshape(-1)] * sph_Mat[i2s, j2s][:, np.newaxis, np.newaxis]
+    return i2s, j2s, blocks
 
 
 # # The following procedure RepXpsace_Pi returns the Matrix representation
@@ -766,7 +833,7 @@ def RepXspace_Twin(rad_ops: tuple[Symbol, ...], sph_ops: tuple[Symbol, ...],
 #
 #   direct_Mat:
 # end:
-@cache
+@lambda_fun_cache
 def RepXspace_Pi(anorm: float, lambda_base: float,
                  nu_min: nonnegint, nu_max: nonnegint,
                  v_min: nonnegint, v_max: nonnegint,
@@ -967,7 +1034,7 @@ def RepXspace_Pi(anorm: float, lambda_base: float,
 #
 #   direct_Mat:
 # end:
-@cache
+@lambda_fun_cache
 def RepXspace_PiPi(PiPi_L: nonnegint,
                    anorm: float, lambda_base: float,
                    nu_min: nonnegint, nu_max: nonnegint,
@@ -1215,7 +1282,7 @@ def RepXspace_PiPi(PiPi_L: nonnegint,
 #
 #   direct_Mat:
 # end:
-@cache
+@lambda_fun_cache
 def RepXspace_PiqPi(anorm: float, lambda_base: float,
                     nu_min: nonnegint, nu_max: nonnegint,
                     v_min: nonnegint, v_max: nonnegint,
@@ -1532,3 +1599,25 @@ def QmxQxQred_m1(v: posint) -> Expr:
             * CG_SO5r3(v, 1, L1, 2, 1, 2, v, a, L)
             * sqrt(dimSO3(L)) * (-1) ** L for (_, a, L) in mediates) \
         / CG_SO5r3(v, 1, L1, 3, 1, 0, v - 1, 1, L1) / sqrt(5 * dimSO3(L1))
+
+
+# # The following has no Maple counterpart.
+# # These are the remembered procedures whose tables are cleared at the end
+# # of each call of RepXspace (see the list of forget calls in RepXspace),
+# # depending on the cache policy of cache_manager.
+RepXspace_remembered: tuple[ManagedCache, ...] = (RepRadial,
+                                                  RepRadial_band,
+                                                  RepRadial_param,
+                                                  RepRadial_b2_eigen,
+                                                  RepRadial_b2_sqrt,
+                                                  RepRadial_b2_sqrtInv,
+                                                  RepRadial_bS_DS_band,
+                                                  RepRadialshfs_Prod,
+                                                  RepRadialshfs_Prod_band,
+                                                  RepRadial_Prod_rem,
+                                                  RepRadial_LC_rem,
+                                                  RepXspace_Pi,
+                                                  RepXspace_PiPi,
+                                                  RepXspace_PiqPi,
+                                                  RepSO5_Y_rem,
+                                                  RepSO5r3_Prod_rem)
@@ -4,15 +4,22 @@ diagonalising, basis transforming, and data displaying.
 """
 
 import numpy as np
-from typing import Optional
-
-from acmpy.compat import nonnegint, require_nonnegint, require_nonnegint_range, iquo, NDArrayFloat
+import scipy.sparse as sp
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import Context, copy_context
+from dataclasses import replace
+from multiprocessing.context import BaseContext
+from typing import NamedTuple, Optional, Union
+
+from acmpy.compat import nonnegint, posint, require_nonnegint, require_nonnegint_range, require_posint, iquo, \
+    NDArrayFloat
 from acmpy.internal_operators import OperatorSum, Op_Tame
 from acmpy.spherical_space import dimSO5r3_rngV
-from acmpy.full_operators import RepXspace, dimXspace
+from acmpy.full_operators import RepXspace, dimXspace, XspaceMatrix
 from acmpy.radial_bases import dimRadial
-from acmpy.eigenvalues import Eigenfiddle
-from acmpy.globals import Designators, MatrixElementFunction
+from acmpy.eigenvalues import Eigenfiddle, Eigenfiddle_lowest, EigenSession
+from acmpy.parallel import worker_count, blas_threads_per_worker, blas_threads, fork_context, init_worker
+from acmpy.globals import Designator, Designators, MatrixElementFunction, ACMContext, use_context
 import acmpy.globals as g
 
 # ###########################################################################
@@ -142,13 +149,27 @@ def DigXspace(ham_op: OperatorSum,
               anorm: float, lambda_base: float,
               nu_min: nonnegint, nu_max: nonnegint,
               v_min: nonnegint, v_max: nonnegint,
-              L_min: nonnegint, L_max: Optional[nonnegint] = None
+              L_min: nonnegint, L_max: Optional[nonnegint] = None,
+              workers: Optional[int] = 1, pool: str = 'thread',
+              eig_num: Optional[int] = None, sparse: bool = False,
+              session: Optional[EigenSession] = None, context: Optional[ACMContext] = None
               ) -> tuple[EigenValues, EigenBases, XParams, LValues]:
+    if context is not None:
+        with use_context(context):
+            return DigXspace(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, L_max,
+                             workers, pool, eig_num, sparse, session)
+
     LLM: nonnegint = L_min if L_max is None else L_max
 
     require_nonnegint_range('nu', nu_min, nu_max)
     require_nonnegint_range('v', v_min, v_max)
     require_nonnegint_range('L', L_min, LLM)
+    if eig_num is not None:
+        require_posint('eig_num', eig_num)
+
+    if workers != 1:
+        return DigXspace_concurrent(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, LLM,
+                                    workers, pool, eig_num, sparse, session)
 
     Xparams: XParams = anorm, lambda_base, nu_min, nu_max, v_min, v_max
 
@@ -159,7 +180,7 @@ def DigXspace(ham_op: OperatorSum,
     LL: int
     sph_dim: int
 
-    L_matrix: NDArrayFloat
+    L_matrix: XspaceMatrix
     eigen_vals_result: NDArrayFloat
     eigen_bases_result: NDArrayFloat
 
@@ -170,29 +191,144 @@ def DigXspace(ham_op: OperatorSum,
             if sph_dim > 0:
                 Lvals.append(LL)
 
-                L_matrix = RepXspace(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, LL)
-                eigen_vals_result, eigen_bases_result = Eigenfiddle(L_matrix)
+                L_matrix = RepXspace(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, LL, sparse=sparse)
+                eigen_vals_result, eigen_bases_result = Eigenfiddle_session(L_matrix, LL, eig_num, session)
 
                 eigen_vals.append(eigen_vals_result)
                 eigen_bases.append(eigen_bases_result)
     else:
-        rep_matrix_np: NDArrayFloat = RepXspace(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, LLM)
+        rep_matrix: XspaceMatrix = RepXspace(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, LLM,
+                                             sparse=sparse)
+        # a sparse matrix is converted to CSR, which can be sliced into the L blocks
+        rep_matrix_np: Union[NDArrayFloat, sp.csr_matrix] = \
+            rep_matrix if isinstance(rep_matrix, np.ndarray) else rep_matrix.tocsr()
         rad_dim: int = dimRadial(nu_min, nu_max)
         Lstart: int = 1
 
         for LL in range(L_min, LLM + 1):
             sph_dim = dimSO5r3_rngV(v_min, v_max, LL)
-            Lstop: int = Lstart + rad_dim * sph_dim
+            Lstop: int = Lstart + rad_dim * sph_dim - 1
             if sph_dim > 0:
                 Lvals.append(LL)
 
                 L_matrix = rep_matrix_np[(Lstart - 1):Lstop, (Lstart - 1):Lstop]
-                eigen_vals_result, eigen_bases_result = Eigenfiddle(L_matrix)
+                eigen_vals_result, eigen_bases_result = Eigenfiddle_session(L_matrix, LL, eig_num, session)
 
                 eigen_vals.append(eigen_vals_result)
                 eigen_bases.append(eigen_bases_result)
 
-                Lstart = Lstop
+                Lstart = Lstop + 1
+
+    return eigen_vals, eigen_bases, Xparams, Lvals
+
+
+# # The following procedure has no Maple counterpart.
+# # It diagonalises the matrix L_matrix of the space of angular momentum LL,
+# # obtaining the lowest eig_num eigenvalues (all if eig_num is None),
+# # or those of the EigenSession session, starting from its eigenvectors for LL.
+def Eigenfiddle_session(L_matrix: XspaceMatrix, LL: nonnegint,
+                        eig_num: Optional[int], session: Optional[EigenSession]
+                        ) -> tuple[NDArrayFloat, NDArrayFloat]:
+    if session is None:
+        return Eigenfiddle_lowest(L_matrix, eig_num)
+
+    return session.solve(LL, L_matrix)
+
+
+# # The following procedure has no Maple counterpart.
+# # It represents the operator ham_op on the space of a single value LL
+# # of the angular momentum, and diagonalises it, as DigXspace does for tame operators.
+def DigXspace_L(ham_op: OperatorSum,
+                anorm: float, lambda_base: float,
+                nu_min: nonnegint, nu_max: nonnegint,
+                v_min: nonnegint, v_max: nonnegint,
+                LL: nonnegint,
+                eig_num: Optional[int] = None, sparse: bool = False,
+                session: Optional[EigenSession] = None
+                ) -> tuple[NDArrayFloat, NDArrayFloat]:
+    return Eigenfiddle_session(RepXspace(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, LL, sparse=sparse),
+                               LL, eig_num, session)
+
+
+# # The following procedure has no Maple counterpart.
+# # It is DigXspace_L run in the context, e.g. a copy of that of the thread submitting it.
+def DigXspace_L_context(context: Context,
+                        ham_op: OperatorSum,
+                        anorm: float, lambda_base: float,
+                        nu_min: nonnegint, nu_max: nonnegint,
+                        v_min: nonnegint, v_max: nonnegint,
+                        LL: nonnegint,
+                        eig_num: Optional[int] = None, sparse: bool = False,
+                        session: Optional[EigenSession] = None
+                        ) -> tuple[NDArrayFloat, NDArrayFloat]:
+    return context.run(DigXspace_L, ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, LL,
+                       eig_num, sparse, session)
+
+
+# # The following procedure has no Maple counterpart.
+# # It is DigXspace with the L spaces handled concurrently on a pool of
+# # workers, threads or (forked) processes, by default one per core.
+# # For tame operators, each worker represents and diagonalises an L space;
+# # otherwise the representation is formed on all the L values, as in DigXspace,
+# # and only the diagonalisations run concurrently, on threads.
+# # The largest L spaces are started first, and the BLAS threads of each worker
+# # are limited so that together the workers do not oversubscribe the cores.
+# # The workers use the current ACMContext: threads run in copies of it,
+# # and forked processes inherit it.
+def DigXspace_concurrent(ham_op: OperatorSum,
+                         anorm: float, lambda_base: float,
+                         nu_min: nonnegint, nu_max: nonnegint,
+                         v_min: nonnegint, v_max: nonnegint,
+                         L_min: nonnegint, L_max: nonnegint,
+                         workers: Optional[int], pool: str,
+                         eig_num: Optional[int] = None, sparse: bool = False,
+                         session: Optional[EigenSession] = None
+                         ) -> tuple[EigenValues, EigenBases, XParams, LValues]:
+    if pool not in ('thread', 'process'):
+        raise ValueError(f'Unknown pool {pool}: must be thread or process')
+
+    if pool == 'process' and session is not None:
+        raise ValueError('An EigenSession cannot be shared with a process pool.')
+
+    Xparams: XParams = anorm, lambda_base, nu_min, nu_max, v_min, v_max
+    Lvals: LValues = [LL for LL in range(L_min, L_max + 1) if dimSO5r3_rngV(v_min, v_max, LL) > 0]
+    Ldims: list[int] = [dimXspace(nu_min, nu_max, v_min, v_max, LL) for LL in Lvals]
+    order: list[int] = sorted(range(len(Lvals)), key=lambda i: -Ldims[i])
+
+    n: int = worker_count(workers, len(Lvals))
+    blas: int = blas_threads_per_worker(n)
+    futures: dict[int, Future]
+
+    if Op_Tame(ham_op):
+        args: tuple[OperatorSum, float, float, nonnegint, nonnegint, nonnegint, nonnegint] = \
+            (ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max)
+        if pool == 'process':
+            context: Optional[BaseContext] = fork_context()
+            if context is None:
+                raise ValueError('A process pool requires the fork start method.')
+            with ProcessPoolExecutor(max_workers=n, mp_context=context,
+                                     initializer=init_worker, initargs=(blas,)) as executor:
+                futures = {i: executor.submit(DigXspace_L, *args, Lvals[i], eig_num, sparse, session) for i in order}
+        else:
+            with blas_threads(blas), ThreadPoolExecutor(max_workers=n) as executor:
+                futures = {i: executor.submit(DigXspace_L_context, copy_context(), *args, Lvals[i], eig_num, sparse,
+                                              session)
+                           for i in order}
+    else:
+        rep_matrix: XspaceMatrix = RepXspace(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max,
+                                             L_min, L_max, sparse=sparse)
+        rep_matrix_np: Union[NDArrayFloat, sp.csr_matrix] = \
+            rep_matrix if isinstance(rep_matrix, np.ndarray) else rep_matrix.tocsr()
+        Lends: list[int] = np.cumsum(Ldims).tolist()
+        with blas_threads(blas), ThreadPoolExecutor(max_workers=n) as executor:
+            futures = {i: executor.submit(Eigenfiddle_session, rep_matrix_np[(Lends[i] - Ldims[i]):Lends[i],
+                                                                             (Lends[i] - Ldims[i]):Lends[i]],
+                                          Lvals[i], eig_num, session)
+                       for i in order}
+
+    results: list[tuple[NDArrayFloat, NDArrayFloat]] = [futures[i].result() for i in range(len(Lvals))]
+    eigen_vals: EigenValues = [eigen_vals_result for eigen_vals_result, _ in results]
+    eigen_bases: EigenBases = [eigen_bases_result for _, eigen_bases_result in results]
 
     return eigen_vals, eigen_bases, Xparams, Lvals
 
@@ -315,6 +451,29 @@ class LBlockFullSpace:
         return self.Lblocks[L]
 
 
+class LBlockEigenSpace(LBlockFullSpace):
+    """This class models the subspace of the full space spanned by the eigenvectors that were obtained for each L.
+
+    If only the lowest eigenvectors of each L were obtained, the subspace for that L has their number as dimension.
+    """
+
+    eig_dims: dict[nonnegint, nonnegint]
+
+    def __init__(self,
+                 nu_min: nonnegint, nu_max: nonnegint,
+                 v_min: nonnegint, v_max: nonnegint,
+                 Lvals: LValues, eig_dims: list[nonnegint]) -> None:
+        if len(eig_dims) != len(Lvals):
+            raise ValueError(f'Expected {len(Lvals)} dimensions, got {len(eig_dims)}')
+
+        self.eig_dims = dict(zip(Lvals, eig_dims))
+        super().__init__(nu_min, nu_max, v_min, v_max, Lvals)
+
+    def dimL(self, L: nonnegint) -> nonnegint:
+        """Return the number of eigenvectors with angular momentum L."""
+        return self.eig_dims.get(L, 0)
+
+
 class LBlockNDFloatArray:
     """This class models a matrix partitioned into blocks that have well-defined angular momentum L.
 
@@ -353,28 +512,100 @@ class LBlockNDFloatArray:
         self.mat[r0:r1, c0:c1] = mat
 
 
-def AmpXspeig(tran_op: OperatorSum, eigen_bases: EigenBases, Xparams: XParams, Lvals: LValues
+# # The optional arguments have no Maple counterpart.
+# # Blocks of angular momenta that differ by more than tran_AM, the angular
+# # momentum of tran_op if known, are zero and are not calculated.
+# # Only the first eig_num eigenvectors of each L are transformed to, if given.
+# # The eigenbases obtained by DigXspace have orthonormal columns,
+# # so that the transpose of each is used rather than its inverse.
+def AmpXspeig(tran_op: OperatorSum, eigen_bases: EigenBases, Xparams: XParams, Lvals: LValues,
+              tran_AM: Optional[nonnegint] = None, eig_num: Optional[int] = None
               ) -> LBlockNDFloatArray:
     validate_Lvals(Lvals)
+    if len(eigen_bases) != len(Lvals):
+        raise ValueError(f'Expected {len(Lvals)} eigenbases, got {len(eigen_bases)}')
 
     anorm, lambda_base, nu_min, nu_max, v_min, v_max = Xparams
-    full_space: LBlockFullSpace = LBlockFullSpace(nu_min, nu_max, v_min, v_max, Lvals)
+    tran_mat: NDArrayFloat = RepXspace(tran_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, Lvals[0], Lvals[-1])
+
+    return AmpXspeig_mat(tran_mat, eigen_bases, Xparams, Lvals, tran_AM, eig_num)
+
 
-    L_min: nonnegint = Lvals[0]
-    L_max: nonnegint = Lvals[-1]
-    tran_mat: NDArrayFloat = RepXspace(tran_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, L_max)
+# # The following procedure has no Maple counterpart.
+# # It is AmpXspeig for the matrix tran_mat of the transition operator on the
+# # angular momenta Lvals[1]..Lvals[-1], which has already been formed.
+def AmpXspeig_mat(tran_mat: NDArrayFloat, eigen_bases: EigenBases, Xparams: XParams, Lvals: LValues,
+                  tran_AM: Optional[nonnegint] = None, eig_num: Optional[int] = None
+                  ) -> LBlockNDFloatArray:
+    validate_Lvals(Lvals)
+    if len(eigen_bases) != len(Lvals):
+        raise ValueError(f'Expected {len(Lvals)} eigenbases, got {len(eigen_bases)}')
+    if tran_AM is not None:
+        require_nonnegint('tran_AM', tran_AM)
+    if eig_num is not None:
+        require_posint('eig_num', eig_num)
+
+    anorm, lambda_base, nu_min, nu_max, v_min, v_max = Xparams
+    full_space: LBlockFullSpace = LBlockFullSpace(nu_min, nu_max, v_min, v_max, Lvals)
     tran: LBlockNDFloatArray = LBlockNDFloatArray(tran_mat, full_space)
 
-    result_mat: NDArrayFloat = np.empty(tran_mat.shape)
-    result: LBlockNDFloatArray = LBlockNDFloatArray(result_mat, full_space)
-    eigen_invs: list[NDArrayFloat] = [np.linalg.inv(P) for P in eigen_bases]
-    for P_inv, L_row in zip(eigen_invs, Lvals):
-        for P, L_col in zip(eigen_bases, Lvals):
-            result.set_block(L_row, L_col, P_inv @ tran.get_block(L_row, L_col) @ P)
+    bases: EigenBases = eigen_bases if eig_num is None else [P[:, :eig_num] for P in eigen_bases]
+    eigen_space: LBlockEigenSpace = LBlockEigenSpace(nu_min, nu_max, v_min, v_max, Lvals,
+                                                     [P.shape[1] for P in bases])
+    result_mat: NDArrayFloat = np.zeros((eigen_space.dim(), eigen_space.dim()))
+    result: LBlockNDFloatArray = LBlockNDFloatArray(result_mat, eigen_space)
+    for P_row, L_row in zip(bases, Lvals):
+        for P_col, L_col in zip(bases, Lvals):
+            if tran_AM is None or abs(L_row - L_col) <= tran_AM:
+                result.set_block(L_row, L_col, P_row.T @ (tran.get_block(L_row, L_col) @ P_col))
 
     return result
 
 
+# # The following procedure has no Maple counterpart.
+# # It returns the number of eigenvalues of each L that are needed by
+# # ACM_Scale (fit_eig=fit_rat=0) or ACM_Adapt (fit_eig=fit_rat=1) to display
+# # glb_eig_num eigenvalues and the transition rates and amplitudes designated
+# # in glb_rat_lst and glb_amp_lst, and to fit the scaling parameters.
+# # Only that many eigenvalues and eigenvectors need be obtained by DigXspace.
+def ACM_eig_num(fit_eig: nonnegint = 0, fit_rat: nonnegint = 0) -> posint:
+    require_nonnegint('fit_eig', fit_eig)
+    require_nonnegint('fit_rat', fit_rat)
+
+    eig_num: int = max(1, g.glb_eig_num)
+
+    if fit_eig > 0 and g.glb_eig_num > 0:
+        eig_num = max(eig_num, g.glb_eig_idx)
+
+    if len(g.glb_rat_lst) > 0 or len(g.glb_amp_lst) > 0:
+        eig_num = max(eig_num,
+                      Designators_eig_num(g.glb_rat_lst, g.glb_rat_num),
+                      Designators_eig_num(g.glb_amp_lst, g.glb_amp_num))
+
+        if fit_rat > 0:
+            eig_num = max(eig_num, g.glb_rat_1dx, g.glb_rat_2dx)
+
+    return eig_num
+
+
+# # The following procedure has no Maple counterpart.
+# # It returns the number of eigenvectors of each L that are needed
+# # to display, using Show_Mels, the matrix elements designated in mel_lst,
+# # with toshow the maximum number of values displayed in a list.
+def Designators_eig_num(mel_lst: Designators, toshow: int) -> nonnegint:
+    eig_num: int = 0
+
+    for rate_ent in mel_lst:
+        if len(rate_ent) in (4, 5):
+            eig_num = max(eig_num, rate_ent[2], rate_ent[3])
+        elif len(rate_ent) == 3:
+            eig_num = max(eig_num, toshow, rate_ent[2])
+        elif len(rate_ent) <= 2:
+            eig_num = max(eig_num, toshow)
+
+    return eig_num
+
+
 # ###########################################################################
 #
 # # The following procedure Show_Eigs displays in a convenient format
@@ -468,9 +699,16 @@ L_MAX_DEFAULT: int = 1000000
 #   eigen_low;   # return smallest eigenvalue (in case it's needed!)
 # end;
 def Show_Eigs(eigen_vals: list[NDArrayFloat], Lvals: LValues,
-              toshow: nonnegint = g.glb_eig_num,
-              L_min: Optional[nonnegint] = None, L_max: Optional[nonnegint] = None
+              toshow: Optional[nonnegint] = None,
+              L_min: Optional[nonnegint] = None, L_max: Optional[nonnegint] = None,
+              context: Optional[ACMContext] = None
               ) -> Optional[float]:
+    if context is not None:
+        with use_context(context):
+            return Show_Eigs(eigen_vals, Lvals, toshow, L_min, L_max)
+
+    if toshow is None:
+        toshow = g.glb_eig_num
     require_nonnegint('toshow', toshow)
 
     if toshow == 0 or len(eigen_vals) == 0:
@@ -762,9 +1000,6 @@ def fsel(nlist: list[float]) -> Optional[float]:
 #   od:
 #   NULL;
 # end;
-glb_mel_f1: str = ''
-glb_mel_f2: str = ''
-glb_item_format: str = ''
 
 
 def Show_Mels(Melements: LBlockNDFloatArray,
@@ -773,10 +1008,14 @@ def Show_Mels(Melements: LBlockNDFloatArray,
               mel_fun: MatrixElementFunction,
               scale: float = 1.0,
               mel_format: str = g.def_mel_format,
-              mel_desg: str = g.def_mel_desg
+              mel_desg: str = g.def_mel_desg,
+              context: Optional[ACMContext] = None
               ) -> None:
+    if context is not None:
+        with use_context(context):
+            return Show_Mels(Melements, mel_lst, toshow, mel_fun, scale, mel_format, mel_desg)
 
-    global glb_mel_f1, glb_mel_f2, glb_item_format
+    ctx: ACMContext = g.current_context()
 
     if len(mel_lst) == 0:
         return
@@ -790,15 +1029,15 @@ def Show_Mels(Melements: LBlockNDFloatArray,
 
     rel_wid: int = g.glb_rel_wid
     rel_pre: int = g.glb_rel_pre
-    glb_item_format = f'{{:{rel_wid}.{rel_pre}f}}'
+    ctx.glb_item_format = f'{{:{rel_wid}.{rel_pre}f}}'
 
     num: str = '{:d}'
     tran_fmat1: str = g.glb_tran_format.format(num, num, num, num)
-    glb_mel_f1 = mel_format.format(tran_fmat1, glb_item_format)
+    ctx.glb_mel_f1 = mel_format.format(tran_fmat1, ctx.glb_item_format)
 
     fill: str = g.glb_tran_fill
     tran_fmat2: str = g.glb_tran_format.format(num, fill, num, num)
-    glb_mel_f2 = mel_format.format(tran_fmat2, '{:s}')
+    ctx.glb_mel_f2 = mel_format.format(tran_fmat2, '{:s}')
 
     for rate_ent in mel_lst:
 
@@ -838,7 +1077,7 @@ def Show_Mels(Melements: LBlockNDFloatArray,
 
                 if 0 < n1 <= TR_cols and 0 < n2 <= TR_rows:
                     mel = mel_fun(L1, L2, TR_matrix[n2 - 1, n1 - 1]) / scale
-                    print(glb_mel_f1.format(L1, n1, L2, n2, mel))
+                    print(ctx.glb_mel_f1.format(L1, n1, L2, n2, mel))
 
         elif len(rate_ent) == 5:
             assert L1 >= 0 and L2 >= 0
@@ -869,7 +1108,7 @@ def Show_Mels(Melements: LBlockNDFloatArray,
                     if n1 <= TR_cols and n2 <= TR_rows:
                         assert n1 > 0 and n2 > 0
                         mel = mel_fun(L1, L2, TR_matrix[n2 - 1, n1 - 1]) / scale
-                        print(glb_mel_f1.format(L1, n1, L2, n2, mel))
+                        print(ctx.glb_mel_f1.format(L1, n1, L2, n2, mel))
 
                 L1 += Lmod
                 L2 += Lmod
@@ -972,9 +1211,9 @@ def Show_Mels_Row(Melements: LBlockNDFloatArray,
 
     col_count: int = min(TR_cols, toshow)
 
-    mels: list[str] = [glb_item_format.format(mel_fun(L1, L2, TR_matrix[n2 - 1, n1 - 1]) / scale)
+    mels: list[str] = [g.glb_item_format.format(mel_fun(L1, L2, TR_matrix[n2 - 1, n1 - 1]) / scale)
                        for n1 in range(1, col_count + 1)]
-    print(glb_mel_f2.format(L1, L2, n2, '[' + ','.join(mels) + ']'))
+    print(g.glb_mel_f2.format(L1, L2, n2, '[' + ','.join(mels) + ']'))
 
     return 1
 
@@ -1024,11 +1263,16 @@ def Show_Mels_Row(Melements: LBlockNDFloatArray,
 # end:
 def Show_Rats(Melements: LBlockNDFloatArray,
               _Lvals: LValues,
-              rat_lst: Designators = g.glb_rat_lst,
-              toshow: int = g.glb_rat_num) -> None:
+              rat_lst: Optional[Designators] = None,
+              toshow: Optional[int] = None,
+              context: Optional[ACMContext] = None) -> None:
+    if context is not None:
+        with use_context(context):
+            return Show_Rats(Melements, _Lvals, rat_lst, toshow)
+
     Show_Mels(Melements,
-              rat_lst,
-              toshow,
+              g.glb_rat_lst if rat_lst is None else rat_lst,
+              g.glb_rat_num if toshow is None else toshow,
               g.glb_rat_fun,
               g.glb_rat_sft,
               g.glb_rat_format,
@@ -1051,17 +1295,123 @@ def Show_Rats(Melements: LBlockNDFloatArray,
 # end:
 def Show_Amps(Melements: LBlockNDFloatArray,
               _Lvals: LValues,
-              amp_lst: Designators = g.glb_amp_lst,
-              toshow: int = g.glb_amp_num) -> None:
+              amp_lst: Optional[Designators] = None,
+              toshow: Optional[int] = None,
+              context: Optional[ACMContext] = None) -> None:
+    if context is not None:
+        with use_context(context):
+            return Show_Amps(Melements, _Lvals, amp_lst, toshow)
+
     Show_Mels(Melements,
-              amp_lst,
-              toshow,
+              g.glb_amp_lst if amp_lst is None else amp_lst,
+              g.glb_amp_num if toshow is None else toshow,
               g.glb_amp_fun,
               g.glb_amp_sft,
               g.glb_amp_format,
               g.glb_amp_desg)
 
 
+# # The following procedure has no Maple counterpart.
+# # It returns the matrix elements designated in mel_lst that Show_Mels displays,
+# # in the same order, each with its designator and the value of mel_fun
+# # before it is divided by the scale factor.
+class SelectedMel(NamedTuple):
+    """A matrix element designated by designator, with the value of mel_fun for the transition (L1, n1) -> (L2, n2)."""
+    designator: Designator
+    L1: nonnegint
+    L2: nonnegint
+    n1: posint
+    n2: posint
+    value: float
+
+
+def Select_Mels(Melements: LBlockNDFloatArray,
+                mel_lst: Designators,
+                toshow: int,
+                mel_fun: MatrixElementFunction) -> list[SelectedMel]:
+    if len(mel_lst) == 0:
+        return []
+
+    if Melements.mat.shape[0] == 0:
+        raise ValueError('No matrix elements available!')
+
+    selected: list[SelectedMel] = []
+    Lvals: LValues = Melements.full_space.Lvals
+
+    def select(rate_ent: Designator, L1: int, L2: int, n1: int, n2: int) -> bool:
+        # adds the matrix element if it is available, returning whether it is
+        if L1 not in Lvals or L2 not in Lvals:
+            return False
+        TR_matrix: NDArrayFloat = Melements.get_block(L2, L1)
+        TR_rows, TR_cols = TR_matrix.shape
+        if not (0 < n1 <= TR_cols and 0 < n2 <= TR_rows):
+            return False
+        selected.append(SelectedMel(rate_ent, L1, L2, n1, n2, float(mel_fun(L1, L2, TR_matrix[n2 - 1, n1 - 1]))))
+        return True
+
+    def select_row(rate_ent: Designator, L1: int, L2: int, n2: int) -> bool:
+        # adds the row of Show_Mels_Row, returning whether it is available
+        found: bool = False
+        for n1 in range(1, toshow + 1):
+            if not select(rate_ent, L1, L2, n1, n2):
+                break
+            found = True
+        return found
+
+    def select_rows(rate_ent: Designator, L2: int) -> None:
+        # adds the rows of Show_Mels_Rows
+        for L1 in range(max(0, L2 - g.glb_rat_TRopAM), L2 + g.glb_rat_TRopAM + 1):
+            for n2 in range(1, toshow + 1):
+                if not select_row(rate_ent, L1, L2, n2):
+                    break
+
+    for rate_ent in mel_lst:
+        if len(rate_ent) > 5 or (len(rate_ent) > 1 and (rate_ent[0] < 0 or rate_ent[1] < 0)):
+            continue
+
+        if len(rate_ent) == 4:
+            select(rate_ent, *rate_ent)
+
+        elif len(rate_ent) == 5:
+            L1, L2, n1, n2, Lmod = rate_ent
+            if n1 <= 0 or n2 <= 0:
+                continue
+
+            Lcount: int
+            if Lmod > 0:
+                Lcount = iquo(Lvals[-1] - max(L1, L2), Lmod)
+            elif Lmod < 0:
+                Lmod = -Lmod
+                Lcount = iquo(min(L1, L2), Lmod)
+                L1 -= Lcount * Lmod
+                L2 -= Lcount * Lmod
+            else:
+                Lcount = 0
+
+            for _ in range(Lcount + 1):
+                select(rate_ent, L1, L2, n1, n2)
+                L1 += Lmod
+                L2 += Lmod
+
+        elif len(rate_ent) == 3:
+            select_row(rate_ent, *rate_ent)
+
+        elif len(rate_ent) == 2:
+            for n2 in range(1, toshow + 1):
+                if not select_row(rate_ent, rate_ent[0], rate_ent[1], n2):
+                    break
+
+        elif len(rate_ent) == 1:
+            if rate_ent[0] >= 0:
+                select_rows(rate_ent, rate_ent[0])
+
+        else:
+            for L2 in Lvals:
+                select_rows(rate_ent, L2)
+
+    return selected
+
+
 # ###########################################################################
 #
 # # The following procedure ACM_ScaleOrAdapt combines many of those
@@ -1266,8 +1616,56 @@ def ACM_ScaleOrAdapt(fit_eig: nonnegint, fit_rat: nonnegint,
                      anorm: float, lambda_base: float,
                      nu_min: nonnegint, nu_max: nonnegint,
                      v_min: nonnegint, v_max: nonnegint,
-                     L_min: nonnegint, L_max: Optional[nonnegint] = None
+                     L_min: nonnegint, L_max: Optional[nonnegint] = None,
+                     partial: bool = False, context: Optional[ACMContext] = None,
+                     quiet: bool = False
                      ) -> EigAmpL:
+    # the results are calculated by ACM_Result and, unless quiet, displayed by Show_Result
+    with use_context(context):
+        result: ACMResult = ACM_Result(fit_eig, fit_rat, ham_op, anorm, lambda_base,
+                                       nu_min, nu_max, v_min, v_max, L_min, L_max, partial)
+        if not quiet:
+            Show_Result(result)
+
+    return result.eigen_vals, result.Melements, result.Lvals
+
+
+# # The following procedure has no Maple counterpart.
+# # It calculates what ACM_ScaleOrAdapt displays, without displaying it,
+# # and returns it as an ACMResult. The scale factors are fitted and set
+# # in the current context as for ACM_ScaleOrAdapt; the result is displayed
+# # separately, if at all, by Show_Result.
+class ACMResult(NamedTuple):
+    """
+    The results of ACM_ScaleOrAdapt: the eigenvalues of each L of Lvals,
+    the matrix elements of glb_rat_TRop (None if no rates or amplitudes are designated),
+    the scale factors glb_eig_sft, glb_rat_sft and glb_amp_sft that were in effect,
+    and the transition rates and amplitudes designated by glb_rat_lst and glb_amp_lst,
+    whose values are not divided by the scale factors.
+    """
+    eigen_vals: EigenValues
+    Melements: Optional[LBlockNDFloatArray]
+    Lvals: LValues
+    eig_sft: float
+    rat_sft: float
+    amp_sft: float
+    rates: list[SelectedMel]
+    amps: list[SelectedMel]
+
+
+def ACM_Result(fit_eig: nonnegint, fit_rat: nonnegint,
+               ham_op: OperatorSum,
+               anorm: float, lambda_base: float,
+               nu_min: nonnegint, nu_max: nonnegint,
+               v_min: nonnegint, v_max: nonnegint,
+               L_min: nonnegint, L_max: Optional[nonnegint] = None,
+               partial: bool = False, context: Optional[ACMContext] = None
+               ) -> ACMResult:
+    if context is not None:
+        with use_context(context):
+            return ACM_Result(fit_eig, fit_rat, ham_op, anorm, lambda_base,
+                              nu_min, nu_max, v_min, v_max, L_min, L_max, partial)
+
     require_nonnegint('fit_eig', fit_eig)
     require_nonnegint('fit_rat', fit_rat)
     require_nonnegint_range('nu', nu_min, nu_max)
@@ -1290,36 +1688,33 @@ def ACM_ScaleOrAdapt(fit_eig: nonnegint, fit_rat: nonnegint,
                 g.glb_rat_2dx > dimXspace(nu_min, nu_max, v_min, v_max, g.glb_rat_L2):
             raise ValueError(f'Reference state {g.glb_rat_L2}({g.glb_rat_2dx}) not available')
 
+    # In the partial mode, only the eigenvalues and eigenvectors that are displayed or fitted are obtained.
+    eig_num: Optional[int] = ACM_eig_num(fit_eig, fit_rat) if partial else None
     eigen_tuple: tuple[EigenValues, EigenBases, XParams, LValues] = \
-        DigXspace(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, L_max)
+        DigXspace(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, L_max, eig_num=eig_num)
     eigen_vals: EigenValues = eigen_tuple[0]
     eigen_bases: EigenBases = eigen_tuple[1]
     Xparams: XParams = eigen_tuple[2]
     Lvals: LValues = eigen_tuple[3]
 
-    if g.glb_eig_num > 0:
-
-        if fit_eig > 0:
+    if g.glb_eig_num > 0 and fit_eig > 0:
 
-            eigen_low: float = min_head(eigen_vals) if g.glb_eig_rel else 0
+        eigen_low: float = min_head(eigen_vals) if g.glb_eig_rel else 0
 
-            if g.glb_eig_L not in Lvals:
-                raise ValueError(f'glb_eig_L ({g.glb_eig_L}) is not in list of L values.')
-            LL: int = Lvals.index(g.glb_eig_L)
-            g.glb_eig_sft = (eigen_vals[LL][g.glb_eig_idx - 1] - eigen_low) / g.glb_eig_fit
+        if g.glb_eig_L not in Lvals:
+            raise ValueError(f'glb_eig_L ({g.glb_eig_L}) is not in list of L values.')
+        LL: int = Lvals.index(g.glb_eig_L)
+        g.current_context().glb_eig_sft = (eigen_vals[LL][g.glb_eig_idx - 1] - eigen_low) / g.glb_eig_fit
 
-            if g.glb_eig_sft == 0:
-                raise ValueError(f'Cannot scale: reference state {g.glb_eig_L}({g.glb_eig_idx}) has lowest energy')
-
-        Show_Eigs(eigen_vals, Lvals, g.glb_eig_num)
+        if g.glb_eig_sft == 0:
+            raise ValueError(f'Cannot scale: reference state {g.glb_eig_L}({g.glb_eig_idx}) has lowest energy')
 
     trans: Optional[LBlockNDFloatArray]
-    trans_mat: NDArrayFloat
-    full_space: LBlockFullSpace
-    Lblocks: LBlocks
+    rates: list[SelectedMel] = []
+    amps: list[SelectedMel] = []
     if len(g.glb_rat_lst) > 0 or len(g.glb_amp_lst) > 0:
 
-        trans = AmpXspeig(g.glb_rat_TRop, eigen_bases, Xparams, Lvals)
+        trans = AmpXspeig(g.glb_rat_TRop, eigen_bases, Xparams, Lvals, g.glb_rat_TRopAM)
 
         if fit_rat > 0:
             L1: int = g.glb_rat_L1
@@ -1335,21 +1730,38 @@ def ACM_ScaleOrAdapt(fit_eig: nonnegint, fit_rat: nonnegint,
 
             trans_block: NDArrayFloat = trans.get_block(L2, L1)
             mel: float = trans_block[i2 - 1, i1 - 1]
-            g.glb_rat_sft = abs(g.glb_rat_fun(L1, L2, mel)) / g.glb_rat_fit
+            g.current_context().glb_rat_sft = abs(g.glb_rat_fun(L1, L2, mel)) / g.glb_rat_fit
 
             if g.glb_rat_sft == 0:
                 raise ValueError(f'Cannot scale zero transition rate B(E2: {L1}({i1}) -> {L2}({i2}))')
 
-            g.glb_amp_sft = g.glb_amp_sft_fun(g.glb_rat_sft)
+            g.current_context().glb_amp_sft = g.glb_amp_sft_fun(g.glb_rat_sft)
 
-        Show_Rats(trans, Lvals, g.glb_rat_lst, g.glb_rat_num)
-        Show_Amps(trans, Lvals, g.glb_amp_lst, g.glb_amp_num)
+        rates = Select_Mels(trans, g.glb_rat_lst, g.glb_rat_num, g.glb_rat_fun)
+        amps = Select_Mels(trans, g.glb_amp_lst, g.glb_amp_num, g.glb_amp_fun)
 
     else:
 
         trans = None
 
-    return eigen_vals, trans, Lvals
+    return ACMResult(eigen_vals, trans, Lvals, g.glb_eig_sft, g.glb_rat_sft, g.glb_amp_sft, rates, amps)
+
+
+# # The following procedure has no Maple counterpart.
+# # It displays an ACMResult as ACM_ScaleOrAdapt does, using Show_Eigs, Show_Rats
+# # and Show_Amps with the scale factors of the result.
+def Show_Result(result: ACMResult, context: Optional[ACMContext] = None) -> None:
+    with use_context(context) as ctx:
+        scaled: ACMContext = replace(ctx, glb_eig_sft=result.eig_sft, glb_rat_sft=result.rat_sft,
+                                     glb_amp_sft=result.amp_sft)
+
+    with use_context(scaled):
+        if g.glb_eig_num > 0:
+            Show_Eigs(result.eigen_vals, result.Lvals, g.glb_eig_num)
+
+        if result.Melements is not None:
+            Show_Rats(result.Melements, result.Lvals, g.glb_rat_lst, g.glb_rat_num)
+            Show_Amps(result.Melements, result.Lvals, g.glb_amp_lst, g.glb_amp_num)
 
 
 # # The following procedure ACM_Scale invokes the procedure ACM_ScaleOrAdapt
@@ -1373,10 +1785,12 @@ def ACM_Scale(ham_op: OperatorSum,
               anorm: float, lambda_base: float,
               nu_min: nonnegint, nu_max: nonnegint,
               v_min: nonnegint, v_max: nonnegint,
-              L_min: nonnegint, L_max: Optional[nonnegint] = None
+              L_min: nonnegint, L_max: Optional[nonnegint] = None,
+              partial: bool = False, context: Optional[ACMContext] = None,
+              quiet: bool = False
               ) -> EigAmpL:
     return ACM_ScaleOrAdapt(0, 0, ham_op, anorm, lambda_base,
-                            nu_min, nu_max, v_min, v_max, L_min, L_max)
+                            nu_min, nu_max, v_min, v_max, L_min, L_max, partial, context, quiet)
 
 # # The following procedure ACM_Adapt invokes the procedure ACM_ScaleOrAdapt
 # # above with fit_eig=1 and fit_rat=1 so that the values of the scaling
@@ -1399,7 +1813,9 @@ def ACM_Adapt(ham_op: OperatorSum,
               anorm: float, lambda_base: float,
               nu_min: nonnegint, nu_max: nonnegint,
               v_min: nonnegint, v_max: nonnegint,
-              L_min: nonnegint, L_max: Optional[nonnegint] = None
+              L_min: nonnegint, L_max: Optional[nonnegint] = None,
+              partial: bool = False, context: Optional[ACMContext] = None,
+              quiet: bool = False
               ) -> EigAmpL:
     return ACM_ScaleOrAdapt(1, 1, ham_op, anorm, lambda_base,
-                            nu_min, nu_max, v_min, v_max, L_min, L_max)
+                            nu_min, nu_max, v_min, v_max, L_min, L_max, partial, context, quiet)
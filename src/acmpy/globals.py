@@ -1,12 +1,18 @@
 """1. Specification of global constants, and procedures that can be used to set their values."""
 
 import math
-from typing import Callable, Optional
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Callable, Iterator, Optional, Union
 
 from acmpy.internal_operators import OperatorSum, Op_AM, quad_op
 from acmpy.spherical_space import dimSO3
 from acmpy.so5_so3_cg import CG_SO3
 from acmpy.compat import nonnegint, require_nonnegint, irem, is_odd, posint, require_posint
+from acmpy.cache_manager import CachePolicy, cache_manager
 
 # ###########################################################################
 # ####----------------------- Global Constants --------------------------####
@@ -41,7 +47,7 @@ ACM_version: str = '1.4'
 #   Mel*CG_SO3(Li,Li,glb_rat_TRopAM,Lf-Li,Lf,Lf)
 # end;
 def quad_amp_fun(Li: nonnegint, Lf: nonnegint, Mel: float) -> float:
-    return Mel * float(CG_SO3(Li, Li, glb_rat_TRopAM, Lf - Li, Lf, Lf))
+    return Mel * float(CG_SO3(Li, Li, current_context().glb_rat_TRopAM, Lf - Li, Lf, Lf))
 
 
 # mel_amp_fun:=proc(Li,Lf,Mel)
@@ -86,7 +92,7 @@ def unit_rat_fun(_Li: nonnegint, _Lf: nonnegint, Mel: float) -> float:
 #   Mel*gen_amp_mul(Li,Lf,glb_rat_TRopAM)
 # end;
 def mix_amp_fun(Li: nonnegint, Lf: nonnegint, Mel: float) -> float:
-    return Mel * gen_amp_mul(Li, Lf, glb_rat_TRopAM)
+    return Mel * gen_amp_mul(Li, Lf, current_context().glb_rat_TRopAM)
 
 
 # gen_amp_mul:=proc(Li,Lf,Lt,$)
@@ -247,9 +253,6 @@ def_mel_format: str = "  ME( %{0!s} ) = {1!s}"
 # glb_eig_sft:=1.0:
 # glb_rat_sft:=1.0:
 # glb_amp_sft:=1.0:
-glb_eig_sft: float = 1.0
-glb_rat_sft: float = 1.0
-glb_amp_sft: float = 1.0
 
 
 # # The following store the precision for floating point values that
@@ -260,9 +263,6 @@ glb_amp_sft: float = 1.0
 # glb_rel_pre:=2:
 # glb_rel_wid:=7:
 # glb_low_pre:=4:
-glb_rel_pre: int = 2
-glb_rel_wid: int = 7
-glb_low_pre: int = 4
 
 
 # # The following store the maximal number of entries for horizontal
@@ -274,9 +274,6 @@ glb_low_pre: int = 4
 # glb_eig_num:=4:
 # glb_rat_num:=4:
 # glb_amp_num:=4:
-glb_eig_num: int = 4
-glb_rat_num: int = 4
-glb_amp_num: int = 4
 
 
 # # The following specify how ACM_Adapt() determines the scale factor
@@ -286,9 +283,6 @@ glb_amp_num: int = 4
 # glb_eig_fit:=6.0:
 # glb_eig_L:=2:
 # glb_eig_idx:=1:
-glb_eig_fit: float = 6.0
-glb_eig_L: int = 2
-glb_eig_idx: int = 1
 
 
 # # The following specify how ACM_Adapt() determines the scale factor
@@ -301,18 +295,12 @@ glb_eig_idx: int = 1
 # glb_rat_L2:=0:
 # glb_rat_1dx:=1:
 # glb_rat_2dx:=1:
-glb_rat_fit: float = 100.0
-glb_rat_L1: int = 2
-glb_rat_L2: int = 0
-glb_rat_1dx: int = 1
-glb_rat_2dx: int = 1
 
 
 # # The following specifies a procedure which determines the basis type.
 # # This is a function which gives the value of lambda_v-lambda_0.
 #
 # glb_lam_fun:=lambda_acm_fun:
-glb_lam_fun: LambdaFunction = lambda_acm_fun
 
 
 # # The following store the current transition operator and its
@@ -328,8 +316,6 @@ glb_lam_fun: LambdaFunction = lambda_acm_fun
 #
 # glb_rat_TRop:=quad_op:
 # glb_rat_TRopAM:=2:
-glb_rat_TRop: OperatorSum = quad_op
-glb_rat_TRopAM: nonnegint = 2
 
 
 # # The following determine how "transition rates" are displayed in the
@@ -343,10 +329,6 @@ glb_rat_TRopAM: nonnegint = 2
 # glb_rat_desg:=def_rat_desg:
 MatrixElementFunction = Callable[[nonnegint, nonnegint, float], float]
 
-glb_rat_fun: MatrixElementFunction = quad_rat_fun
-glb_rat_format: str = def_rat_format
-glb_rat_desg: str = def_rat_desg
-
 
 # # The following determine how "transition rates" are displayed in the
 # # procedure Show_Amps (which is called by ACM_Scale and ACM_Adapt).
@@ -357,9 +339,6 @@ glb_rat_desg: str = def_rat_desg
 # glb_amp_fun:=quad_amp_fun:
 # glb_amp_format:=def_amp_format:
 # glb_amp_desg:=def_amp_desg:
-glb_amp_fun: MatrixElementFunction = quad_amp_fun
-glb_amp_format: str = def_amp_format
-glb_amp_desg: str = def_amp_desg
 
 
 # # The following specifies the function by which the scaling factor
@@ -367,15 +346,12 @@ glb_amp_desg: str = def_amp_desg
 # # (glb_rat_sft) for transition rates:
 #
 # glb_amp_sft_fun:=sqrt:
-glb_amp_sft_fun: ScalingFactorFunction = math.sqrt
 
 
 # # The following determines how the matrix element labels are displayed:
 #
 # glb_tran_format:="%s(%s) -> %s(%s)":
 # glb_tran_fill:="#":
-glb_tran_format: str = '{}({}) -> {}({})'
-glb_tran_fill: str = '#'
 
 
 # # The following store the lists of transition rate and transition amplitude
@@ -385,8 +361,6 @@ glb_tran_fill: str = '#'
 # glb_amp_lst:=[]:
 Designator = tuple[int, ...]
 Designators = tuple[Designator, ...]
-glb_rat_lst: Designators = ()
-glb_amp_lst: Designators = ()
 
 
 # # The following flag indicates whether, in ACM_Scale, ACM_Adapt
@@ -394,7 +368,6 @@ glb_amp_lst: Designators = ()
 # # lowest value (true), or absolute (false).
 #
 # glb_eig_rel:=true:
-glb_eig_rel: bool = True
 
 
 # # The following parameter, if positive, specifies a temporary
@@ -404,7 +377,111 @@ glb_eig_rel: bool = True
 # # by RepXspace).
 #
 # glb_nu_lap:=0:
-glb_nu_lap: int = 0
+
+
+# # The following has no Maple counterpart.
+# # Here, the values of the above global parameters are held by an ACMContext object,
+# # with attributes of the same names and initial values, rather than by module variables.
+# # The ACM_set_ procedures below set the values of the current context,
+# # which is default_context unless another is made current with use_context.
+# # Each thread or asyncio task has its own current context, so independent
+# # calculations with different settings may run concurrently in one process.
+# # The values can still be read and written as module attributes, e.g. acmpy.globals.glb_eig_num,
+# # which are those of the current context.
+@dataclass
+class ACMContext:
+    """
+    This class models the settings of the global parameters, which determine the basis,
+    the transition operator, and how ACM_Scale, ACM_Adapt and the Show_ procedures display their results.
+    """
+    glb_eig_sft: float = 1.0
+    glb_rat_sft: float = 1.0
+    glb_amp_sft: float = 1.0
+    glb_rel_pre: int = 2
+    glb_rel_wid: int = 7
+    glb_low_pre: int = 4
+    glb_eig_num: int = 4
+    glb_rat_num: int = 4
+    glb_amp_num: int = 4
+    glb_eig_fit: float = 6.0
+    glb_eig_L: int = 2
+    glb_eig_idx: int = 1
+    glb_rat_fit: float = 100.0
+    glb_rat_L1: int = 2
+    glb_rat_L2: int = 0
+    glb_rat_1dx: int = 1
+    glb_rat_2dx: int = 1
+    glb_lam_fun: LambdaFunction = lambda_acm_fun
+    glb_rat_TRop: OperatorSum = quad_op
+    glb_rat_TRopAM: nonnegint = 2
+    glb_rat_fun: MatrixElementFunction = quad_rat_fun
+    glb_rat_format: str = def_rat_format
+    glb_rat_desg: str = def_rat_desg
+    glb_amp_fun: MatrixElementFunction = quad_amp_fun
+    glb_amp_format: str = def_amp_format
+    glb_amp_desg: str = def_amp_desg
+    glb_amp_sft_fun: ScalingFactorFunction = math.sqrt
+    glb_tran_format: str = '{}({}) -> {}({})'
+    glb_tran_fill: str = '#'
+    glb_rat_lst: Designators = ()
+    glb_amp_lst: Designators = ()
+    glb_eig_rel: bool = True
+    glb_nu_lap: int = 0
+
+    # the formats of matrix elements set by Show_Mels for Show_Mels_Row
+    glb_mel_f1: str = ''
+    glb_mel_f2: str = ''
+    glb_item_format: str = ''
+
+
+default_context: ACMContext = ACMContext()
+"""The context of calculations for which no other context is current."""
+
+active_context: ContextVar[ACMContext] = ContextVar('active_context', default=default_context)
+
+
+def current_context() -> ACMContext:
+    """Return the current context of this thread or task."""
+    return active_context.get()
+
+
+@contextmanager
+def use_context(context: Optional[ACMContext]) -> Iterator[ACMContext]:
+    """Make the context current within the with statement. If it is None, the current context is kept."""
+    if context is None:
+        yield current_context()
+        return
+
+    token: Token = active_context.set(context)
+    try:
+        yield context
+    finally:
+        active_context.reset(token)
+
+
+def __getattr__(name: str) -> Any:
+    # the global parameters are read from the current context
+    if name in ACMContext.__dataclass_fields__:
+        return getattr(current_context(), name)
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(ACMContext.__dataclass_fields__))
+
+
+class GlobalsModule(ModuleType):
+    """This class models this module, whose global parameters are written to the current context."""
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in ACMContext.__dataclass_fields__:
+            setattr(current_context(), name, value)
+        else:
+            super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = GlobalsModule
 
 
 # ###########################################################################
@@ -439,15 +516,15 @@ glb_nu_lap: int = 0
 def ACM_set_scales(eig_sft: Optional[float] = None,
                    rat_sft: Optional[float] = None,
                    show: int = 1) -> None:
-    global glb_eig_sft, glb_rat_sft, glb_amp_sft
+    ctx: ACMContext = current_context()
 
     if eig_sft is not None:
-        glb_eig_sft = eig_sft
+        ctx.glb_eig_sft = eig_sft
 
     if rat_sft is not None:
-        glb_rat_sft = rat_sft
+        ctx.glb_rat_sft = rat_sft
 
-    glb_amp_sft = glb_amp_sft_fun(glb_rat_sft)  # default is square root
+    ctx.glb_amp_sft = ctx.glb_amp_sft_fun(ctx.glb_rat_sft)  # default is square root
 
     ACM_show_scales(show)
 
@@ -471,12 +548,14 @@ def ACM_set_scales(eig_sft: Optional[float] = None,
 #   [glb_eig_sft,glb_rat_sft,glb_amp_sft]:
 # end;
 def ACM_show_scales(show: int) -> tuple[float, float, float]:
+    ctx: ACMContext = current_context()
+
     if show > 0:
-        print(f'Relative eigenenergies to be multiplied by {1 / glb_eig_sft};')
-        print(f'"{glb_rat_desg}" to be multiplied by {1 / glb_rat_sft};')
-        print(f'"{glb_amp_desg}" to be multiplied by {1 / glb_amp_sft}.')
+        print(f'Relative eigenenergies to be multiplied by {1 / ctx.glb_eig_sft};')
+        print(f'"{ctx.glb_rat_desg}" to be multiplied by {1 / ctx.glb_rat_sft};')
+        print(f'"{ctx.glb_amp_desg}" to be multiplied by {1 / ctx.glb_amp_sft}.')
 
-    return glb_eig_sft, glb_rat_sft, glb_amp_sft
+    return ctx.glb_eig_sft, ctx.glb_rat_sft, ctx.glb_amp_sft
 
 
 # # The following sets glb_amp_sft_fun, and returns NULL:
@@ -496,16 +575,16 @@ def ACM_show_scales(show: int) -> tuple[float, float, float]:
 #
 #   glb_amp_sft_fun:
 # end;
-def ACM_set_sft_fun(amp_fun: Callable = glb_amp_sft_fun,
+def ACM_set_sft_fun(amp_fun: Callable = ACMContext.glb_amp_sft_fun,
                     show: int = 1) -> Callable:
-    global glb_amp_sft_fun
+    ctx: ACMContext = current_context()
 
-    glb_amp_sft_fun = amp_fun
+    ctx.glb_amp_sft_fun = amp_fun
     if show > 0:
-        print(f'"{glb_amp_desg}" scaling factor calculated' +
-              f' using the procedure: {glb_amp_sft_fun.__name__}.')
+        print(f'"{ctx.glb_amp_desg}" scaling factor calculated' +
+              f' using the procedure: {ctx.glb_amp_sft_fun.__name__}.')
 
-    return glb_amp_sft_fun
+    return ctx.glb_amp_sft_fun
 
 
 # # The following sets the values of glb_rel_pre, glb_rel_wid, and glb_low_pre
@@ -537,26 +616,26 @@ def ACM_set_output(rel_pre: Optional[nonnegint] = None,
                    rel_wid: Optional[nonnegint] = None,
                    low_pre: Optional[nonnegint] = None,
                    show: int = 1) -> tuple[nonnegint, nonnegint, nonnegint]:
-    global glb_low_pre, glb_rel_wid, glb_rel_pre
+    ctx: ACMContext = current_context()
 
     if rel_pre is not None:
         require_nonnegint('rel_pre', rel_pre)
-        glb_rel_pre = rel_pre
+        ctx.glb_rel_pre = rel_pre
 
     if rel_wid is not None:
         require_nonnegint('rel_wid', rel_wid)
-        glb_rel_wid = rel_wid
+        ctx.glb_rel_wid = rel_wid
 
     if low_pre is not None:
         require_nonnegint('low_pre', low_pre)
-        glb_low_pre = low_pre
+        ctx.glb_low_pre = low_pre
 
     if show > 0:
-        print(f'{glb_rel_pre} decimal places for each displayed value,')
-        print(f'{glb_rel_wid} total digits for each displayed value,')
-        print(f'except {glb_low_pre} decimal places for lowest (absolute) eigenvalue.')
+        print(f'{ctx.glb_rel_pre} decimal places for each displayed value,')
+        print(f'{ctx.glb_rel_wid} total digits for each displayed value,')
+        print(f'except {ctx.glb_low_pre} decimal places for lowest (absolute) eigenvalue.')
 
-    return glb_rel_pre, glb_rel_wid, glb_low_pre
+    return ctx.glb_rel_pre, ctx.glb_rel_wid, ctx.glb_low_pre
 
 
 # # The following sets the values of glb_eig_num, glb_rat_num, and
@@ -584,22 +663,22 @@ def ACM_set_output(rel_pre: Optional[nonnegint] = None,
 def ACM_set_listln(eig_num: Optional[nonnegint] = None,
                    rat_num: Optional[nonnegint] = None,
                    show: int = 1) -> tuple[nonnegint, nonnegint, nonnegint]:
-    global glb_eig_num, glb_rat_num, glb_amp_num
+    ctx: ACMContext = current_context()
 
     if eig_num is not None:
         require_nonnegint('eig_num', eig_num)
-        glb_eig_num = eig_num
+        ctx.glb_eig_num = eig_num
 
     if rat_num is not None:
         require_nonnegint('rat_num', rat_num)
-        glb_rat_num = rat_num
-        glb_amp_num = rat_num
+        ctx.glb_rat_num = rat_num
+        ctx.glb_amp_num = rat_num
 
     if show > 0:
-        print(f'Display lowest {glb_eig_num} eigenvalue(s) at each L.')
-        print(f'Display lowest {glb_rat_num} rate/amplitude(s) in each list.')
+        print(f'Display lowest {ctx.glb_eig_num} eigenvalue(s) at each L.')
+        print(f'Display lowest {ctx.glb_rat_num} rate/amplitude(s) in each list.')
 
-    return glb_eig_num, glb_rat_num, glb_amp_num
+    return ctx.glb_eig_num, ctx.glb_rat_num, ctx.glb_amp_num
 
 
 # # The following sets the boolean value of glb_eig_rel.
@@ -622,18 +701,18 @@ def ACM_set_listln(eig_num: Optional[nonnegint] = None,
 # end;
 def ACM_set_datum(datflag: nonnegint = 1,
                   show: int = 1) -> bool:
-    global glb_eig_rel
+    ctx: ACMContext = current_context()
 
     require_nonnegint('datflag', datflag)
-    glb_eig_rel = datflag > 0
+    ctx.glb_eig_rel = datflag > 0
 
     if show > 0:
-        if glb_eig_rel:
+        if ctx.glb_eig_rel:
             print('Eigenvalues displayed relative to minimal value.')
         else:
             print('Absolute eigenvalues displayed.')
 
-    return glb_eig_rel
+    return ctx.glb_eig_rel
 
 
 # # The following sets the values of glb_eig_fit, glb_eig_L, glb_eig_idx,
@@ -656,24 +735,24 @@ def ACM_set_datum(datflag: nonnegint = 1,
 #
 #   [glb_eig_fit, glb_eig_L, glb_eig_idx]:
 # end;
-def ACM_set_eig_fit(eig_fit: float = glb_eig_fit,
-                    eig_L: nonnegint = glb_eig_L,
+def ACM_set_eig_fit(eig_fit: float = ACMContext.glb_eig_fit,
+                    eig_L: nonnegint = ACMContext.glb_eig_L,
                     eig_idx: posint = 1,
                     show: int = 1) -> tuple[float, nonnegint, posint]:
-    global glb_eig_fit, glb_eig_L, glb_eig_idx
+    ctx: ACMContext = current_context()
 
     require_nonnegint('eig_L', eig_L)
     require_posint('eig_idx', eig_idx)
 
-    glb_eig_fit = eig_fit
-    glb_eig_L = eig_L
-    glb_eig_idx = eig_idx
+    ctx.glb_eig_fit = eig_fit
+    ctx.glb_eig_L = eig_L
+    ctx.glb_eig_idx = eig_idx
 
     if show > 0:
         print('In ACM_Adapt, the scaling factor for relative eigenvalues ' +
-              f'is chosen such that\nthat for the {glb_eig_L}({glb_eig_idx}) state is {glb_eig_fit:f}')
+              f'is chosen such that\nthat for the {ctx.glb_eig_L}({ctx.glb_eig_idx}) state is {ctx.glb_eig_fit:f}')
 
-    return glb_eig_fit, glb_eig_L, glb_eig_idx
+    return ctx.glb_eig_fit, ctx.glb_eig_L, ctx.glb_eig_idx
 
 
 # # Similarly, the following sets the values of
@@ -713,35 +792,35 @@ def ACM_set_eig_fit(eig_fit: float = glb_eig_fit,
 #
 #   [glb_rat_fit, glb_rat_L1, glb_rat_L2, glb_rat_1dx, glb_rat_2dx]:
 # end;
-def ACM_set_rat_fit(rat_fit: float = glb_rat_fit,
-                    rat_L1: nonnegint = glb_rat_L1,
-                    rat_L2: nonnegint = glb_rat_L2,
+def ACM_set_rat_fit(rat_fit: float = ACMContext.glb_rat_fit,
+                    rat_L1: nonnegint = ACMContext.glb_rat_L1,
+                    rat_L2: nonnegint = ACMContext.glb_rat_L2,
                     rat_1dx: posint = 1,
                     rat_2dx: posint = 1,
                     show: int = 1) -> tuple[float, nonnegint, nonnegint, posint, posint]:
-    global glb_rat_fit, glb_rat_L1, glb_rat_L2, glb_rat_1dx, glb_rat_2dx
+    ctx: ACMContext = current_context()
 
     require_nonnegint('rat_L1', rat_L1)
     require_nonnegint('rat_L2', rat_L2)
     require_posint('rat_1dx', rat_1dx)
     require_posint('rat_2dx', rat_2dx)
 
-    glb_rat_fit = rat_fit
-    glb_rat_L1 = rat_L1
-    glb_rat_L2 = rat_L2
-    glb_rat_1dx = rat_1dx
-    glb_rat_2dx = rat_2dx
+    ctx.glb_rat_fit = rat_fit
+    ctx.glb_rat_L1 = rat_L1
+    ctx.glb_rat_L2 = rat_L2
+    ctx.glb_rat_1dx = rat_1dx
+    ctx.glb_rat_2dx = rat_2dx
 
     if show > 0:
-        tran_fmat: str = glb_tran_format.format('{:d}', '{:d}', '{:d}', '{:d}')
-        rat_fmt: str = glb_rat_format.format(tran_fmat, '{:f}')
-        rat_this: str = rat_fmt.format(glb_rat_L1, glb_rat_1dx,
-                                       glb_rat_L2, glb_rat_2dx, glb_rat_fit)
+        tran_fmat: str = ctx.glb_tran_format.format('{:d}', '{:d}', '{:d}', '{:d}')
+        rat_fmt: str = ctx.glb_rat_format.format(tran_fmat, '{:f}')
+        rat_this: str = rat_fmt.format(ctx.glb_rat_L1, ctx.glb_rat_1dx,
+                                       ctx.glb_rat_L2, ctx.glb_rat_2dx, ctx.glb_rat_fit)
 
-        print(f'In ACM_Adapt, the scaling factor for "{glb_rat_desg}" ' +
+        print(f'In ACM_Adapt, the scaling factor for "{ctx.glb_rat_desg}" ' +
               f'is chosen such that\n{rat_this}')
 
-    return glb_rat_fit, glb_rat_L1, glb_rat_L2, glb_rat_1dx, glb_rat_2dx
+    return ctx.glb_rat_fit, ctx.glb_rat_L1, ctx.glb_rat_L2, ctx.glb_rat_1dx, ctx.glb_rat_2dx
 
 
 # # The following three functions respectively set, augment or display the
@@ -756,9 +835,9 @@ def ACM_set_rat_fit(rat_fit: float = glb_rat_fit,
 #   ACM_add_rat_lst(rat_lst):
 # end;
 def ACM_set_rat_lst(rat_lst: Designators = ()) -> int:
-    global glb_rat_lst
+    ctx: ACMContext = current_context()
 
-    glb_rat_lst = ()
+    ctx.glb_rat_lst = ()
     return ACM_add_rat_lst(rat_lst)
 
 
@@ -777,15 +856,15 @@ def ACM_set_rat_lst(rat_lst: Designators = ()) -> int:
 #   return nops(glb_rat_lst);
 # end;
 def ACM_add_rat_lst(rat_lst: Designators) -> int:
-    global glb_rat_lst
+    ctx: ACMContext = current_context()
 
     for rat_ent in rat_lst:
         if len(rat_ent) > 5:
             print(f'  Bad transition rate specification: {rat_ent}')
         else:
-            glb_rat_lst = glb_rat_lst + (rat_ent,)
+            ctx.glb_rat_lst = ctx.glb_rat_lst + (rat_ent,)
 
-    return len(glb_rat_lst)
+    return len(ctx.glb_rat_lst)
 
 
 # ACM_show_rat_lst:=proc(show::integer:=1,$)
@@ -841,15 +920,17 @@ def ACM_add_rat_lst(rat_lst: Designators) -> int:
 #   return glb_rat_lst;
 # end;
 def ACM_show_lst(lst: Designators, desg: str, show: int = 1) -> Designators:
+    ctx: ACMContext = current_context()
+
     if show > 0:
 
         if len(lst) > 0:
-            format5: str = glb_tran_format.format('{:d}{:+d}k', '{:d}', '{:d}{:+d}k', '{:d}')
-            format4: str = glb_tran_format.format('{:d}', '{:d}', '{:d}', '{:d}')
-            format3: str = glb_tran_format.format('{:d}', 'j_i', '{:d}', '{:d}')
-            format2: str = glb_tran_format.format('{:d}', 'j_i', '{:d}', 'j_f')
-            format1: str = glb_tran_format.format('L_i', 'j_i', '{:d}', 'j_f')
-            format0: str = glb_tran_format.format('L_i', 'j_i', 'L_f', 'j_f')
+            format5: str = ctx.glb_tran_format.format('{:d}{:+d}k', '{:d}', '{:d}{:+d}k', '{:d}')
+            format4: str = ctx.glb_tran_format.format('{:d}', '{:d}', '{:d}', '{:d}')
+            format3: str = ctx.glb_tran_format.format('{:d}', 'j_i', '{:d}', '{:d}')
+            format2: str = ctx.glb_tran_format.format('{:d}', 'j_i', '{:d}', 'j_f')
+            format1: str = ctx.glb_tran_format.format('L_i', 'j_i', '{:d}', 'j_f')
+            format0: str = ctx.glb_tran_format.format('L_i', 'j_i', 'L_f', 'j_f')
 
             print(f'Following "{desg}" are set to be displayed:')
             for ent in lst:
@@ -878,7 +959,9 @@ def ACM_show_lst(lst: Designators, desg: str, show: int = 1) -> Designators:
 
 
 def ACM_show_rat_lst(show: int = 1) -> Designators:
-    return ACM_show_lst(glb_rat_lst, glb_rat_desg, show)
+    ctx: ACMContext = current_context()
+
+    return ACM_show_lst(ctx.glb_rat_lst, ctx.glb_rat_desg, show)
 
 
 # # The following three functions respectively set, augment or display the
@@ -893,9 +976,9 @@ def ACM_show_rat_lst(show: int = 1) -> Designators:
 #   ACM_add_amp_lst(amp_lst):
 # end;
 def ACM_set_amp_lst(amp_list: Designators = ()) -> int:
-    global glb_amp_lst
+    ctx: ACMContext = current_context()
 
-    glb_amp_lst = ()
+    ctx.glb_amp_lst = ()
     return ACM_add_amp_lst(amp_list)
 
 
@@ -914,15 +997,15 @@ def ACM_set_amp_lst(amp_list: Designators = ()) -> int:
 #   return nops(glb_amp_lst);
 # end;
 def ACM_add_amp_lst(amp_lst: Designators = ()) -> int:
-    global glb_amp_lst
+    ctx: ACMContext = current_context()
 
     for amp_ent in amp_lst:
         if len(amp_ent) > 5:
             print(f'  Bad amplitude specification: {amp_ent}')
         else:
-            glb_amp_lst = glb_amp_lst + (amp_ent,)
+            ctx.glb_amp_lst = ctx.glb_amp_lst + (amp_ent,)
 
-    return len(glb_amp_lst)
+    return len(ctx.glb_amp_lst)
 
 
 # ACM_show_amp_lst:=proc(show::integer:=1,$)
@@ -981,7 +1064,9 @@ def ACM_add_amp_lst(amp_lst: Designators = ()) -> int:
 #   return glb_amp_lst;
 # end;
 def ACM_show_amp_lst(show: int = 1) -> Designators:
-    return ACM_show_lst(glb_amp_lst, glb_amp_desg, show)
+    ctx: ACMContext = current_context()
+
+    return ACM_show_lst(ctx.glb_amp_lst, ctx.glb_amp_desg, show)
 
 
 # # The following specifies the transition rate operator glb_rat_TRop.
@@ -1012,25 +1097,25 @@ def ACM_show_amp_lst(show: int = 1) -> Designators:
 #
 #   [glb_rat_TRop,glb_rat_TRopAM]:
 # end;
-def ACM_set_transition(TR_op: OperatorSum = glb_rat_TRop,
+def ACM_set_transition(TR_op: OperatorSum = ACMContext.glb_rat_TRop,
                        show: int = 1) -> tuple[OperatorSum, int]:
-    global glb_rat_TRop, glb_rat_TRopAM
+    ctx: ACMContext = current_context()
 
-    glb_rat_TRop = TR_op
+    ctx.glb_rat_TRop = TR_op
     rat_AM: int = Op_AM(TR_op)
-    glb_rat_TRopAM = abs(rat_AM)
+    ctx.glb_rat_TRopAM = abs(rat_AM)
 
     if show > 0:
         print('In ACM_Scale and ACM_Adapt, transition matrix elements ' +
-              'now calculated for the operator:\n' + glb_rat_desg, end='')
-        print(glb_rat_TRop)
+              'now calculated for the operator:\n' + ctx.glb_rat_desg, end='')
+        print(ctx.glb_rat_TRop)
 
         if rat_AM >= 0:
             print(f'(This has angular momentum {rat_AM}).\n')
         else:
             print(f'(This has indeterminate angular momentum: maximum {-rat_AM}).\n')
 
-    return glb_rat_TRop, glb_rat_TRopAM
+    return ctx.glb_rat_TRop, ctx.glb_rat_TRopAM
 
 
 # # The following sets glb_rat_fun, glb_rat_format, and glb_rat_desg
@@ -1065,25 +1150,25 @@ def ACM_set_transition(TR_op: OperatorSum = glb_rat_TRop,
 #
 #   [glb_rat_fun,glb_rat_format,glb_rat_desg]:
 # end;
-def ACM_set_rat_form(rat_fun: Callable = glb_rat_fun,
-                     rat_format: str = glb_rat_format,
-                     rat_desg: str = glb_rat_desg,
+def ACM_set_rat_form(rat_fun: Callable = ACMContext.glb_rat_fun,
+                     rat_format: str = ACMContext.glb_rat_format,
+                     rat_desg: str = ACMContext.glb_rat_desg,
                      show: int = 1) -> tuple[Callable, str, str]:
-    global glb_rat_fun, glb_rat_format, glb_rat_desg
+    ctx: ACMContext = current_context()
 
-    glb_rat_fun = rat_fun
-    glb_rat_format = rat_format
-    glb_rat_desg = rat_desg
+    ctx.glb_rat_fun = rat_fun
+    ctx.glb_rat_format = rat_format
+    ctx.glb_rat_desg = rat_desg
 
     if show > 0:
         print('These are calculated from the (alternative reduced) transition' +
-              f' matrix elements\nusing the procedure: "{glb_rat_fun}"')
+              f' matrix elements\nusing the procedure: "{ctx.glb_rat_fun}"')
 
-        tran_fmat1: str = glb_tran_format.format('L_i', 'j_i', 'L_f', 'j_f')
+        tran_fmat1: str = ctx.glb_tran_format.format('L_i', 'j_i', 'L_f', 'j_f')
         print('Each will be output using the format:\n  ', end='')
-        print(glb_rat_format, tran_fmat1, '*')
+        print(ctx.glb_rat_format, tran_fmat1, '*')
 
-    return glb_rat_fun, glb_rat_format, glb_rat_desg
+    return ctx.glb_rat_fun, ctx.glb_rat_format, ctx.glb_rat_desg
 
 
 # # The following sets glb_amp_fun, glb_amp_format, and glb_amp_desg
@@ -1118,26 +1203,26 @@ def ACM_set_rat_form(rat_fun: Callable = glb_rat_fun,
 #
 #   [glb_amp_fun,glb_amp_format,glb_amp_desg]:
 # end;
-def ACM_set_amp_form(amp_fun: Callable = glb_amp_fun,
-                     amp_format: str = glb_amp_format,
-                     amp_desg: str = glb_amp_desg,
+def ACM_set_amp_form(amp_fun: Callable = ACMContext.glb_amp_fun,
+                     amp_format: str = ACMContext.glb_amp_format,
+                     amp_desg: str = ACMContext.glb_amp_desg,
                      show: int = 1) -> tuple[Callable, str, str]:
-    global glb_amp_fun, glb_amp_format, glb_amp_desg
+    ctx: ACMContext = current_context()
 
-    glb_amp_fun = amp_fun
-    glb_amp_format = amp_format
-    glb_amp_desg = amp_desg
+    ctx.glb_amp_fun = amp_fun
+    ctx.glb_amp_format = amp_format
+    ctx.glb_amp_desg = amp_desg
 
     if show > 0:
-        print(f'ACM_Scale and ACM_Adapt now set to display "{glb_amp_desg}" second.')
+        print(f'ACM_Scale and ACM_Adapt now set to display "{ctx.glb_amp_desg}" second.')
         print('These are calculated from the (alternative reduced) transition' +
-              f' matrix elements\nusing the procedure: "{glb_amp_fun}".')
+              f' matrix elements\nusing the procedure: "{ctx.glb_amp_fun}".')
 
-        tran_fmat1: str = glb_tran_format.format('L_i', 'j_i', 'L_f', 'j_f')
+        tran_fmat1: str = ctx.glb_tran_format.format('L_i', 'j_i', 'L_f', 'j_f')
         print('Each will be output using the format:\n  ', end='')
-        print(glb_amp_format, tran_fmat1, '*')
+        print(ctx.glb_amp_format, tran_fmat1, '*')
 
-    return glb_amp_fun, glb_amp_format, glb_amp_desg
+    return ctx.glb_amp_fun, ctx.glb_amp_format, ctx.glb_amp_desg
 
 
 # # The following specifies the "basis type" procedure glb_lam_fun.
@@ -1155,15 +1240,36 @@ def ACM_set_amp_form(amp_fun: Callable = glb_amp_fun,
 #   glb_lam_fun:
 # end;
 def ACM_set_lambda_fun(lambda_fun: Callable, show: int = 1) -> Callable:
-    global glb_lam_fun
+    ctx: ACMContext = current_context()
+
+    ctx.glb_lam_fun = lambda_fun
 
-    glb_lam_fun = lambda_fun
+    # the cached Xspace matrices depend on glb_lam_fun
+    cache_manager.clear()
 
     if show > 0:
         print('lambda values calculated from v using the ' +
-              f'procedure: "{glb_lam_fun}",')
+              f'procedure: "{ctx.glb_lam_fun}",')
+
+    return ctx.glb_lam_fun
 
-    return glb_lam_fun
+
+# # The following has no Maple counterpart.
+# # It specifies whether the matrices remembered by the Rep* procedures are
+# # forgotten at the end of each call (as in Maple), kept across calls,
+# # or kept within a budget of max_bytes bytes per procedure.
+def ACM_set_cache_policy(policy: Union[CachePolicy, str] = CachePolicy.CLEAR_PER_CALL,
+                         max_bytes: Optional[nonnegint] = None,
+                         show: int = 1) -> CachePolicy:
+    cache_manager.set_policy(policy, max_bytes)
+
+    if show > 0:
+        print(f'Representation matrices are cached using the policy: "{cache_manager.policy.value}"', end='')
+        if cache_manager.policy is CachePolicy.BOUNDED:
+            print(f', with at most {cache_manager.default_max_bytes} bytes per procedure', end='')
+        print(',')
+
+    return cache_manager.policy
 
 
 # # The following uses the above procedure to set glb_lam_fun to one of
@@ -1236,7 +1342,7 @@ def ACM_set_basis_type(choice: nonnegint,
     else:
         raise ValueError(f'There is no basis {choice} defined!')
 
-    return glb_lam_fun
+    return current_context().glb_lam_fun
 
 
 # # For the currently defined basis stored in glb_lam_fun, the following
@@ -1250,12 +1356,13 @@ def ACM_show_lambda_fun(vmin: nonnegint = 0, vmax: nonnegint = 10) -> tuple[int,
     require_nonnegint('vmin', vmin)
     require_nonnegint('vmax', vmax)
 
-    return tuple(glb_lam_fun(v) for v in range(vmin, vmax + 1))
+    lambda_fun: LambdaFunction = current_context().glb_lam_fun
+    return tuple(lambda_fun(v) for v in range(vmin, vmax + 1))
 
 
 def ACM_eval_lambda_fun(v: nonnegint) -> nonnegint:
     """Evaluates the global lambda function for a given seniority v."""
-    return glb_lam_fun(v)
+    return current_context().glb_lam_fun(v)
 
 # # Following tests that lambda only shifts by +/-1 as we change v,
 # # returning boolean true if so, false if not.
@@ -1280,10 +1387,10 @@ def ACM_test_lambda_fun(vmin: nonnegint, vmax: nonnegint) -> bool:
     require_nonnegint('vmin', vmin)
     require_nonnegint('vmax', vmax)
 
-    global glb_lam_fun
-    lam: nonnegint = glb_lam_fun(vmin)
+    ctx: ACMContext = current_context()
+    lam: nonnegint = ctx.glb_lam_fun(vmin)
     for v in range(vmin + 1, vmax + 1):
-        lamv: nonnegint = glb_lam_fun(v)
+        lamv: nonnegint = ctx.glb_lam_fun(v)
         if lamv - lam == 1 or lamv - lam == -1:
             lam = lamv
         else:
@@ -1342,3 +1449,28 @@ def ACM_set_defaults(show: int = 1) -> None:
 
     if show > 0:
         print()
+
+
+# # The following has no Maple counterpart.
+# # The global parameters are exported by from acmpy.globals import *,
+# # together with the procedures and constants of this module.
+__all__: list[str] = [  # noqa: F822
+    'ACMContext', 'ACM_add_amp_lst', 'ACM_add_rat_lst', 'ACM_eval_lambda_fun', 'ACM_set_amp_form',
+    'ACM_set_amp_lst', 'ACM_set_basis_type', 'ACM_set_cache_policy', 'ACM_set_datum', 'ACM_set_defaults',
+    'ACM_set_eig_fit', 'ACM_set_lambda_fun', 'ACM_set_listln', 'ACM_set_output', 'ACM_set_rat_fit',
+    'ACM_set_rat_form', 'ACM_set_rat_lst', 'ACM_set_scales', 'ACM_set_sft_fun', 'ACM_set_transition',
+    'ACM_show_amp_lst', 'ACM_show_lambda_fun', 'ACM_show_lst', 'ACM_show_rat_lst', 'ACM_show_scales',
+    'ACM_test_lambda_fun', 'ACM_version', 'Designator', 'Designators', 'GlobalsModule', 'LambdaFunction',
+    'MatrixElementFunction', 'ScalingFactorFunction', 'active_context', 'current_context', 'def_amp_desg',
+    'def_amp_format', 'def_mel_desg', 'def_mel_format', 'def_rat_desg', 'def_rat_format', 'default_context',
+    'gen_amp_mul', 'lambda_acm_fun', 'lambda_davi_fun', 'lambda_fix_fun', 'lambda_jig_fun', 'lambda_sho_fun',
+    'mel_amp_fun', 'mel_rat_fun', 'mix_amp_fun', 'quad_amp_fun', 'quad_rat_fun', 'sqrt_fun', 'unit_amp_fun',
+    'unit_rat_fun', 'use_context',
+    # the global parameters, which are attributes of the current context
+    'glb_amp_desg', 'glb_amp_format', 'glb_amp_fun', 'glb_amp_lst', 'glb_amp_num', 'glb_amp_sft',
+    'glb_amp_sft_fun', 'glb_eig_L', 'glb_eig_fit', 'glb_eig_idx', 'glb_eig_num', 'glb_eig_rel', 'glb_eig_sft',
+    'glb_item_format', 'glb_lam_fun', 'glb_low_pre', 'glb_mel_f1', 'glb_mel_f2', 'glb_nu_lap', 'glb_rat_1dx',
+    'glb_rat_2dx', 'glb_rat_L1', 'glb_rat_L2', 'glb_rat_TRop', 'glb_rat_TRopAM', 'glb_rat_desg', 'glb_rat_fit',
+    'glb_rat_format', 'glb_rat_fun', 'glb_rat_lst', 'glb_rat_num', 'glb_rat_sft', 'glb_rel_pre', 'glb_rel_wid',
+    'glb_tran_fill', 'glb_tran_format'
+]
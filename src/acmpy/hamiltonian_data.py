@@ -35,6 +35,18 @@ def RWC_Ham(B: IntFloatExpr, c1: IntFloatExpr, c2: IntFloatExpr, chi: IntFloatEx
     return ACM_Hamiltonian(-1 / (2 * B), 0, B * c1 / 2, B * c2 / 2, 0, -chi, 0, 0, 0, kappa)
 
 
+# # The following procedure has no Maple counterpart.
+# # It returns the nonzero coefficients of ACM_Hamiltonian, by name,
+# # that give the RWC_Ham Hamiltonian above, as floats.
+# # They may be used with the term matrices of ACM_Hamiltonian_terms
+# # (see term_matrices.py) to scan over the parameters without rebuilding the matrices.
+def RWC_Ham_coeffs(B: float, c1: float, c2: float, chi: float, kappa: float) -> dict[str, float]:
+    if B == 0:
+        raise ValueError('B must not equal 0.')
+
+    return {'c11': -1 / (2 * B), 'c21': B * c1 / 2, 'c22': B * c2 / 2, 'c30': -chi, 'c40': kappa}
+
+
 # # The following procedure RWC_expt gives the expectation value of the above
 # # Hamiltonian on the |(anorm,lambda0)0;0100> basis state, given by (B16).
 # # (Note that (76) of [RWC2009] contains typos.)
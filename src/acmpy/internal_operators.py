@@ -2,14 +2,16 @@
 
 import math
 import numpy as np
-from functools import cache
 from typing import Optional
+from functools import cache
 
 from sympy import Symbol, pi, sqrt, Integer, Rational, Expr, \
     S, factorial, Matrix, diag, eye
 
 from acmpy.compat import nonnegint, require_nonnegint, is_odd, IntFloatExpr, NDArrayFloat, ndarray_to_Matrix, Matrix_to_ndarray
-from acmpy.so5_so3_cg import CG_SO5r3
+from acmpy.cache_manager import managed_cache, cache_manager
+from acmpy.so5_so3_cg import CG_SO5r3, CG_SO5r3_block
+from acmpy.spherical_store import SphericalRange, spherical_store
 from acmpy.spherical_space import lbsSO5r3_rngVvarL, dimSO3, dimSO5r3_rngVvarL, SO5SO3Label, \
     SpHarm_Table, SpHarm_Operators, \
     SpHarm_112, \
@@ -110,6 +112,13 @@ def ME_SO5red(u: nonnegint, w: nonnegint, v: nonnegint) -> Expr:
                 factorial(sigma - 2 * v + 1) / factorial(sigma + 3))
 
 
+# # The following procedure has no Maple counterpart.
+# # It returns ME_SO5red(u,w,v) as a float, and remembers it.
+@cache
+def ME_SO5red_float(u: nonnegint, w: nonnegint, v: nonnegint) -> float:
+    return float(ME_SO5red(u, w, v))
+
+
 # # The following nine functions are useful instances of the above,
 # # with different normalisations: they provide SO(5) (doubly) reduced
 # # matrix elements for Q and [QxQ]_(v=2) and [QxQxQ]_(v=3).
@@ -267,19 +276,31 @@ def ME_SO5r3(v_f: int, al_f: int, L_f: int,
 #                  ME_SO5r3(op(states[i]),v,al,L,op(states[j])) )):
 # end:
 """
-The Maple remember option corresponds to the Python @cache decorator.
+The Maple remember option corresponds to the Python @managed_cache decorator.
 To forget the RepSO5_Y_rem cache call: RepSO5_Y_rem.cache_clear().
+The matrices are also kept in the spherical_store, which is not cleared by RepXspace,
+and the matrix for smaller ranges is extracted from a stored matrix for larger ranges.
+To forget them call: spherical_store.clear().
 """
 
 
-@cache
+@managed_cache
 def RepSO5_Y_rem(v: int, al: int, L: int,
                  v_min: int, v_max: int,
                  L_min: int, L_max: int) -> NDArrayFloat:
+    ranges: SphericalRange = (v_min, v_max, L_min, L_max)
+    M: Optional[NDArrayFloat] = spherical_store.get(('Y', v, al, L), ranges, extract=True)
+    if M is not None:
+        return M
+
     states: list[SO5SO3Label] = lbsSO5r3_rngVvarL(v_min, v_max, L_min, L_max)
-    return np.array([[float(ME_SO5r3(*i, v, al, L, *j))
-                    for j in states]
-                   for i in states])
+    seniorities, index = np.unique([u for u, _, _ in states], return_inverse=True)
+    red: NDArrayFloat = np.array([[ME_SO5red_float(v_f, v, v_i)
+                                   for v_i in seniorities.tolist()]
+                                  for v_f in seniorities.tolist()])
+    M = CG_SO5r3_block(states, v, al, L, states) * red[np.ix_(index, index)]
+    spherical_store.put(('Y', v, al, L), ranges, M)
+    return M
 
 
 # # The following procedure RepSO5_Y_alg is the same as RepSO5_Y_rem
@@ -393,7 +414,7 @@ def RepSO5r3_Prod(ys_op: list,
                   L_min: int, L_max: int) -> NDArrayFloat:
     rep: NDArrayFloat = RepSO5r3_Prod_wrk(tuple(ys_op), v_min, v_max, L_min, L_max)
 
-    RepSO5_Y_rem.cache_clear()
+    cache_manager.end_of_call(RepSO5_Y_rem)
     return rep
 
 
@@ -407,11 +428,23 @@ def RepSO5r3_Prod(ys_op: list,
 #
 #   RepSO5r3_Prod_wrk(_passed):
 # end:
-@cache
+@managed_cache
 def RepSO5r3_Prod_rem(ys_op: tuple,
                       v_min: int, v_max: int,
                       L_min: int, L_max: int) -> NDArrayFloat:
-    return RepSO5r3_Prod_wrk(ys_op, v_min, v_max, L_min, L_max)
+    ranges: SphericalRange = (v_min, v_max, L_min, L_max)
+    M: Optional[NDArrayFloat] = spherical_store.get(('Prod', ys_op), ranges)
+    if M is None:
+        if len(ys_op) > 1:
+            # multiply the remembered product of all but the last operator by the last,
+            # so that products with common prefixes, e.g. those of the terms of a Hamiltonian, share them.
+            M = RepSO5r3_Prod_rem(ys_op[:-1], v_min, v_max, L_min, L_max) \
+                @ RepSO5r3_Prod_wrk(ys_op[-1:], v_min, v_max, L_min, L_max)
+        else:
+            M = RepSO5r3_Prod_wrk(ys_op, v_min, v_max, L_min, L_max)
+        spherical_store.put(('Prod', ys_op), ranges, M)
+
+    return M
 
 
 # # The following procedure RepSO5r3_Prod_wrk is as the above two,
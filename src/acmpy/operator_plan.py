@@ -0,0 +1,370 @@
+"""This module defines precompiled plans for the representation of operators on the full Hilbert space.
+
+Explanation
+===========
+
+RepXspace interprets an OperatorSum afresh on each call:
+each product is split into its radial, spherical and Xspace factors,
+the radial factors are parsed and the lambda variations are split among them,
+the spherical matrices are formed, and the coefficients are evaluated on the states.
+None of this depends on the radial parameters anorm and lambda_base,
+so a scan over these parameters repeats it for every point of the scan.
+
+An OperatorPlan does this work once, for an OperatorSum and a truncation of the full Hilbert space.
+It holds the spherical matrices of the factors and the positions of their nonzero elements,
+the parsed radial factors with their lambda shift schedules, the values of the coefficients on the states,
+and the block sparsity pattern of the terms whose products have no Xspace operators.
+Factors shared by several terms are compiled and evaluated once.
+Its evaluate method then does only the numeric work, returning the same matrix as RepXspace::
+
+    plan = OperatorPlan(ham, nu_min, nu_max, v_min, v_max, L, L_max)
+    for anorm in anorms:
+        H = plan.evaluate(anorm, lambda_base)
+
+A plan can also be grown to a larger truncation, e.g. for a convergence study::
+
+    plan = plan.grow(nu_max=nu_max + 2)
+
+The matrix of a product is not a sub-block of its matrix on a larger truncation,
+because the intermediate states of the product are truncated too, so the matrix is not grown element by element.
+Rather, the grown plan keeps what does not depend on the growth:
+the spherical matrices if only nu_max grows, and the radial matrices of each pair of lambdas if only v_max
+or L_max grows, so that only the new spherical or radial matrices are formed.
+"""
+
+import copy
+from typing import Optional, Union
+
+import numpy as np
+import scipy.sparse as sp
+from sympy import Expr, Symbol
+
+from acmpy.compat import nonnegint, require_nonnegint_range, NDArrayFloat, NDArrayInt
+from acmpy.spherical_space import dimSO5r3_rngVvarL, lbsSO5r3_rngVvarL, Spherical_Operators
+from acmpy.radial_bases import dimRadial
+from acmpy.radial_space import KTSOps, RepRadialshfs_Prod, Schedule_RadialOp_List, Radial_Operators
+from acmpy.internal_operators import RepSO5r3_Prod_rem, Convert_red, NumSO5r3_Prod, \
+    Xspace_Pi, Xspace_PiPi2, Xspace_PiPi4, Xspace_PiqPi, OperatorSum
+from acmpy.full_operators import XspaceMatrix, XspaceLabelArrays, lbsXspace_arrays, Xspace_coeff_fun, \
+    RepXspace_Pi, RepXspace_PiPi, RepXspace_PiqPi, RepXspace_remembered
+from acmpy.cache_manager import cache_manager
+import acmpy.globals as g
+from acmpy.globals import ACM_eval_lambda_fun, LambdaFunction
+
+TwinFactor = tuple[tuple[Symbol, ...], tuple[Symbol, ...]]
+"""The radial and spherical operators of a product that are represented together by RepXspace_Twin."""
+
+PlanFactor = Union[TwinFactor, Symbol]
+"""A factor of a product: either a TwinFactor or one of the Xspace operators."""
+
+
+def Split_Xspace_Prod(x_ops: tuple[Symbol, ...]) -> tuple[PlanFactor, ...]:
+    """
+    Split the product x_ops into factors in the way that RepXspace_Prod does.
+    The radial and spherical operators between Xspace operators form a TwinFactor.
+    An empty product is the empty TwinFactor, whose matrix is the identity.
+    """
+    factors: tuple[PlanFactor, ...] = ()
+    nu_ops: tuple[Symbol, ...] = ()
+    sph_ops: tuple[Symbol, ...] = ()
+
+    for this_op in x_ops:
+        if this_op in Radial_Operators:
+            nu_ops += (this_op,)
+        elif this_op in Spherical_Operators:
+            sph_ops += (this_op,)
+        elif this_op in (Xspace_Pi, Xspace_PiPi2, Xspace_PiPi4, Xspace_PiqPi):
+            if nu_ops != () or sph_ops != ():
+                factors += ((nu_ops, sph_ops),)
+                nu_ops = ()
+                sph_ops = ()
+            factors += (this_op,)
+        else:
+            raise ValueError(f'Operator {this_op} undefined.')
+
+    if nu_ops != () or sph_ops != () or factors == ():
+        factors += ((nu_ops, sph_ops),)
+
+    return factors
+
+
+class TwinPlan:
+    """
+    This class models the compiled form of a TwinFactor: the nonzero elements of its spherical matrix,
+    including the 4*Pi factors, and the lambda shift schedules of its radial blocks.
+    """
+
+    rad_ops: tuple[Symbol, ...]
+    sph_ops: tuple[Symbol, ...]
+    i2s: NDArrayInt
+    j2s: NDArrayInt
+    values: NDArrayFloat
+    seniorities: NDArrayInt
+    lambda_fun: Optional[LambdaFunction]
+    lambda_pairs: list[tuple[int, int]]
+    schedules: list[tuple[KTSOps, tuple[int, ...]]]
+    group: NDArrayInt
+    radial_key: Optional[tuple[float, float, nonnegint, nonnegint]]
+    radial_Mats: dict[tuple[int, int], NDArrayFloat]
+
+    def __init__(self, factor: TwinFactor,
+                 v_min: nonnegint, v_max: nonnegint,
+                 L_min: nonnegint, L_max: nonnegint) -> None:
+        self.rad_ops, self.sph_ops = factor
+        self.radial_key = None
+        self.radial_Mats = {}
+
+        sph_Mat: NDArrayFloat = RepSO5r3_Prod_rem(self.sph_ops, v_min, v_max, L_min, L_max)
+        sph_Mat = float(Convert_red ** NumSO5r3_Prod(self.sph_ops)) * sph_Mat
+
+        self.i2s, self.j2s = np.nonzero(sph_Mat)
+        self.values = sph_Mat[self.i2s, self.j2s]
+        self.seniorities = np.array([v for v, _, _ in lbsSO5r3_rngVvarL(v_min, v_max, L_min, L_max)], dtype=np.int_)
+        self.lambda_fun = None
+
+    def schedule(self) -> None:
+        """Group the nonzero elements by their pairs of lambdas, and schedule the radial product of each pair."""
+        lambda_disp: dict[int, int] = {v: ACM_eval_lambda_fun(v) for v in set(self.seniorities.tolist())}
+        lambdas: NDArrayInt = np.array([lambda_disp[v] for v in self.seniorities.tolist()], dtype=np.int_)
+
+        pairs, group = np.unique(np.stack((lambdas[self.j2s], lambdas[self.i2s]), axis=1).reshape((-1, 2)),
+                                 axis=0, return_inverse=True)
+        self.group = group.reshape(-1)
+        self.lambda_pairs = [(init, fin) for init, fin in pairs.tolist()]
+        self.schedules = [Schedule_RadialOp_List(self.rad_ops, lambda_disp_fin - lambda_disp_init)
+                          for lambda_disp_init, lambda_disp_fin in self.lambda_pairs]
+        self.lambda_fun = g.glb_lam_fun
+
+    def blocks(self, anorm: float, lambda_base: float, nu_min: nonnegint, nu_max: nonnegint) -> NDArrayFloat:
+        """
+        Return the blocks of RepXspace_Twin at the positions (i2s, j2s).
+        The radial matrices of the pairs of lambdas are kept until the radial parameters or the range of nu change.
+        """
+        if self.lambda_fun is not g.glb_lam_fun:
+            self.schedule()
+
+        if self.radial_key != (anorm, lambda_base, nu_min, nu_max):
+            self.radial_key = (anorm, lambda_base, nu_min, nu_max)
+            self.radial_Mats = {}
+
+        rad_dim: int = dimRadial(nu_min, nu_max)
+        rad_Mats: NDArrayFloat = np.zeros((len(self.schedules), rad_dim, rad_dim))
+        for k, ((lambda_disp_init, lambda_disp_fin), (parsed_ops, lambda_shfs)) in \
+                enumerate(zip(self.lambda_pairs, self.schedules)):
+            Mat: Optional[NDArrayFloat] = self.radial_Mats.get((lambda_disp_init, lambda_disp_fin))
+            if Mat is None:
+                for lambdaa in (lambda_base + lambda_disp_init, lambda_base + lambda_disp_fin):
+                    if lambdaa <= 0:
+                        raise ValueError(f'Non-positive lambda value {lambdaa}')
+                lambdaa = lambda_base + lambda_disp_init
+                Mat = RepRadialshfs_Prod(parsed_ops, anorm, lambdaa, lambda_shfs, nu_min, nu_max)
+                self.radial_Mats[(lambda_disp_init, lambda_disp_fin)] = Mat
+            rad_Mats[k] = Mat
+
+        return rad_Mats[self.group] * self.values[:, np.newaxis, np.newaxis]
+
+    def shared(self) -> 'TwinPlan':
+        """
+        Return a plan of the same factor on the same spherical space, which shares the spherical matrix of this plan
+        but keeps its own radial matrices, so that evaluating it on another range of nu leaves those of this plan.
+        """
+        twin: TwinPlan = copy.copy(self)
+        twin.inherit(self)
+        return twin
+
+    def inherit(self, other: 'TwinPlan') -> None:
+        """Take over the radial matrices of the pairs of lambdas of other, a plan of the same factor."""
+        self.radial_key = other.radial_key
+        self.radial_Mats = dict(other.radial_Mats)
+
+
+class OperatorPlan:
+    """
+    This class models an OperatorSum compiled for the truncated full Hilbert space
+    with the ranges nu_min,..,nu_max, v_min,..,v_max and L_min,..,L_max.
+    """
+
+    nu_min: nonnegint
+    nu_max: nonnegint
+    v_min: nonnegint
+    v_max: nonnegint
+    L_min: nonnegint
+    L_max: nonnegint
+    sph_dim: int
+    rad_dim: int
+    twins: dict[TwinFactor, TwinPlan]
+    terms: list[tuple[Union[float, NDArrayFloat], tuple[PlanFactor, ...]]]
+    pattern_i2s: NDArrayInt
+    pattern_j2s: NDArrayInt
+    positions: list[NDArrayInt]
+
+    x_oplc: OperatorSum
+
+    def __init__(self, x_oplc: OperatorSum,
+                 nu_min: nonnegint, nu_max: nonnegint,
+                 v_min: nonnegint, v_max: nonnegint,
+                 L: nonnegint, L_max: Optional[nonnegint] = None,
+                 previous: Optional['OperatorPlan'] = None) -> None:
+        require_nonnegint_range('nu', nu_min, nu_max)
+        require_nonnegint_range('v', v_min, v_max)
+        if L_max is None:
+            L_max = L
+        require_nonnegint_range('L', L, L_max)
+
+        self.x_oplc = x_oplc
+        self.nu_min, self.nu_max = nu_min, nu_max
+        self.v_min, self.v_max = v_min, v_max
+        self.L_min, self.L_max = L, L_max
+        self.sph_dim = dimSO5r3_rngVvarL(v_min, v_max, L, L_max)
+        self.rad_dim = dimRadial(nu_min, nu_max)
+
+        Xlabels: XspaceLabelArrays = lbsXspace_arrays(nu_min, nu_max, v_min, v_max, L, L_max)
+
+        # the spherical matrices of the twins of a previous plan on the same spherical space are shared
+        same_sph: bool = previous is not None and \
+            (previous.v_min, previous.v_max, previous.L_min, previous.L_max) == (v_min, v_max, L, L_max)
+
+        self.twins = {}
+        self.terms = []
+        for coeff, x_ops in x_oplc:
+            factors: tuple[PlanFactor, ...] = Split_Xspace_Prod(x_ops)
+            for factor in factors:
+                if isinstance(factor, tuple) and factor not in self.twins:
+                    if same_sph and previous is not None and factor in previous.twins:
+                        self.twins[factor] = previous.twins[factor].shared()
+                    else:
+                        self.twins[factor] = TwinPlan(factor, v_min, v_max, L, L_max)
+                        if previous is not None and factor in previous.twins:
+                            self.twins[factor].inherit(previous.twins[factor])
+            self.terms.append((self.coeff_values(coeff, Xlabels), factors))
+
+        self.compile_pattern()
+
+        cache_manager.end_of_call(*RepXspace_remembered)
+
+    def coeff_values(self, coeff: Expr, Xlabels: XspaceLabelArrays) -> Union[float, NDArrayFloat]:
+        """
+        Return a constant coefficient as a float, and otherwise its values on the states
+        as an array of shape (sph_dim, rad_dim), i.e. the diagonal matrix used by RepXspace_Term.
+        """
+        if coeff.is_constant():
+            return float(coeff)
+
+        diagonal: NDArrayFloat = np.broadcast_to(np.asarray(Xspace_coeff_fun(coeff)(*Xlabels), dtype=np.float64),
+                                                 Xlabels[0].shape)
+        return diagonal.reshape((self.sph_dim, self.rad_dim))
+
+    def compile_pattern(self) -> None:
+        """
+        Form the block sparsity pattern of the terms that are a single TwinFactor,
+        and the positions of the blocks of each of them in that pattern.
+        """
+        pattern: NDArrayInt = np.zeros((self.sph_dim, self.sph_dim), dtype=np.int_)
+        for _, factors in self.terms:
+            if len(factors) == 1:
+                twin: TwinPlan = self.twins[factors[0]]
+                pattern[twin.i2s, twin.j2s] = 1
+
+        self.pattern_i2s, self.pattern_j2s = np.nonzero(pattern)
+        pattern[self.pattern_i2s, self.pattern_j2s] = np.arange(len(self.pattern_i2s))
+
+        self.positions = [pattern[self.twins[factors[0]].i2s, self.twins[factors[0]].j2s]
+                          if len(factors) == 1 else np.zeros(0, dtype=np.int_)
+                          for _, factors in self.terms]
+
+    def dim(self) -> int:
+        return self.sph_dim * self.rad_dim
+
+    def grow(self, nu_max: Optional[nonnegint] = None, v_max: Optional[nonnegint] = None,
+             L_max: Optional[nonnegint] = None) -> 'OperatorPlan':
+        """
+        Return the plan of the same OperatorSum on the truncation with larger nu_max, v_max or L_max,
+        keeping the spherical and radial matrices that do not depend on the growth.
+        """
+        nu_max = self.nu_max if nu_max is None else nu_max
+        v_max = self.v_max if v_max is None else v_max
+        L_max = self.L_max if L_max is None else L_max
+        if nu_max < self.nu_max or v_max < self.v_max or L_max < self.L_max:
+            raise ValueError(f'Cannot shrink the truncation ({self.nu_max}, {self.v_max}, {self.L_max})' +
+                             f' to ({nu_max}, {v_max}, {L_max})')
+
+        return OperatorPlan(self.x_oplc, self.nu_min, nu_max, self.v_min, v_max, self.L_min, L_max, previous=self)
+
+    def evaluate(self, anorm: float, lambda_base: float, sparse: bool = False) -> XspaceMatrix:
+        """
+        Return the matrix of the OperatorSum for the radial parameters anorm and lambda_base,
+        the same as RepXspace does, as a dense array, or as a BSR matrix if sparse is True.
+        """
+        twin_blocks: dict[TwinFactor, NDArrayFloat] = {factor: twin.blocks(anorm, lambda_base,
+                                                                           self.nu_min, self.nu_max)
+                                                       for factor, twin in self.twins.items()}
+
+        d: int = self.dim()
+        blocks: NDArrayFloat = np.zeros((len(self.pattern_i2s), self.rad_dim, self.rad_dim))
+        Rmat: XspaceMatrix = sp.bsr_matrix((d, d), blocksize=(self.rad_dim, self.rad_dim)) \
+            if sparse else np.zeros((d, d))
+
+        for (coeff, factors), positions in zip(self.terms, self.positions):
+            if len(factors) == 1:
+                twin: TwinPlan = self.twins[factors[0]]
+                term_blocks: NDArrayFloat = twin_blocks[factors[0]]
+                if isinstance(coeff, float):
+                    term_blocks = coeff * term_blocks
+                else:
+                    term_blocks = term_blocks * coeff[twin.j2s][:, np.newaxis, :]
+                blocks[positions] += term_blocks
+            else:
+                Pmat: XspaceMatrix = self.product(factors, twin_blocks, anorm, lambda_base, sparse)
+                if isinstance(coeff, float):
+                    Rmat = Rmat + coeff * Pmat
+                elif sparse:
+                    Rmat = Rmat + Pmat @ sp.diags(coeff.reshape(-1))
+                else:
+                    Rmat = Rmat + coeff.reshape(-1) * Pmat
+
+        Rmat = Rmat + self.assemble(self.pattern_i2s, self.pattern_j2s, blocks, sparse)
+        if sparse:
+            Rmat = sp.bsr_matrix(Rmat, blocksize=(self.rad_dim, self.rad_dim))
+
+        cache_manager.end_of_call(*RepXspace_remembered)
+
+        return Rmat
+
+    def assemble(self, i2s: NDArrayInt, j2s: NDArrayInt, blocks: NDArrayFloat, sparse: bool) -> XspaceMatrix:
+        """Return the matrix whose nonzero blocks, listed row by row, are at the positions (i2s, j2s)."""
+        d: int = self.dim()
+        if sparse:
+            indptr: NDArrayInt = np.concatenate(([0], np.cumsum(np.bincount(i2s, minlength=self.sph_dim))))
+            return sp.bsr_matrix((blocks, j2s, indptr), shape=(d, d))
+
+        direct_Mat: NDArrayFloat = np.zeros((d, d))
+        direct_Mat.reshape((self.sph_dim, self.rad_dim, self.sph_dim, self.rad_dim))[i2s, :, j2s, :] = blocks
+        return direct_Mat
+
+    def product(self, factors: tuple[PlanFactor, ...], twin_blocks: dict[TwinFactor, NDArrayFloat],
+                anorm: float, lambda_base: float, sparse: bool) -> XspaceMatrix:
+        """Return the product of the matrices of the factors, as RepXspace_Prod does."""
+        run_Mat: Optional[XspaceMatrix] = None
+        for factor in factors:
+            xsp_Mat: XspaceMatrix
+            if isinstance(factor, tuple):
+                twin: TwinPlan = self.twins[factor]
+                xsp_Mat = self.assemble(twin.i2s, twin.j2s, twin_blocks[factor], sparse)
+            else:
+                ranges: tuple[float, ...] = (anorm, lambda_base, self.nu_min, self.nu_max,
+                                             self.v_min, self.v_max, self.L_min, self.L_max)
+                if factor == Xspace_PiqPi:
+                    xsp_Mat = RepXspace_PiqPi(*ranges)
+                elif factor == Xspace_PiPi2:
+                    xsp_Mat = RepXspace_PiPi(2, *ranges)
+                elif factor == Xspace_PiPi4:
+                    xsp_Mat = RepXspace_PiPi(4, *ranges)
+                else:
+                    xsp_Mat = RepXspace_Pi(*ranges)
+                if sparse:
+                    xsp_Mat = sp.bsr_matrix(xsp_Mat, blocksize=(self.rad_dim, self.rad_dim))
+
+            run_Mat = xsp_Mat if run_Mat is None else run_Mat @ xsp_Mat
+
+        assert run_Mat is not None
+        return run_Mat
@@ -0,0 +1,71 @@
+"""This module defines helpers for running calculations concurrently.
+
+Explanation
+===========
+
+The calculations of acmpy spend most of their time in NumPy and LAPACK,
+which release the GIL and may themselves run on several BLAS threads.
+When calculations run concurrently on a pool of workers,
+the number of BLAS threads of each worker is limited so that the workers
+together use the available cores without oversubscribing them.
+
+The BLAS threads are limited with threadpoolctl, which sets the number of threads
+of the BLAS libraries already loaded, e.g. by the parent of a forked process.
+"""
+
+import os
+import multiprocessing
+from contextlib import contextmanager
+from multiprocessing.context import BaseContext
+from typing import Iterator, Optional
+
+from threadpoolctl import threadpool_limits
+
+
+def available_cores() -> int:
+    """Return the number of cores that this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
+
+
+def worker_count(max_workers: Optional[int], tasks: int) -> int:
+    """Return the number of workers to use for the tasks, by default one per available core."""
+    if max_workers is None:
+        max_workers = available_cores()
+    elif max_workers < 1:
+        raise ValueError(f'max_workers must be positive: {max_workers}')
+
+    return max(1, min(max_workers, tasks))
+
+
+def blas_threads_per_worker(workers: int) -> int:
+    """Return the number of BLAS threads for each of the workers so that together they use the available cores."""
+    return max(1, available_cores() // workers)
+
+
+def fork_context() -> Optional[BaseContext]:
+    """
+    Return the fork multiprocessing context, or None if it is not available.
+    Forked workers inherit the state of the parent, e.g. the loaded SO5CG coefficients and the acmpy globals.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+
+    return None
+
+
+@contextmanager
+def blas_threads(n: int) -> Iterator[None]:
+    """Limit the number of BLAS threads to n within the context."""
+    if n < 1:
+        raise ValueError(f'The number of BLAS threads must be positive: {n}')
+
+    with threadpool_limits(limits=n, user_api='blas'):
+        yield
+
+
+def init_worker(n: int) -> None:
+    """Limit the number of BLAS threads of a worker process to n, for the lifetime of the process."""
+    threadpool_limits(limits=n, user_api='blas')
@@ -0,0 +1,254 @@
+"""This module defines a driver that diagonalises Hamiltonians over a grid of parameters, concurrently.
+
+Explanation
+===========
+
+ACM_Scale and ACM_Adapt diagonalise one Hamiltonian on one truncated Hilbert space and display the results.
+A scan over the parameters of a Hamiltonian, or over the radial parameters anorm and lambda_base,
+is a loop of such calls, one after another.
+
+ACM_Scan runs the points of a grid on a pool of worker processes and returns the lowest eigenvalues
+of each L, and the transition rates of the designators in the form used by ACM_set_rat_lst,
+as a NumPy structured array with one row per point.
+The Hamiltonian of a point is obtained by calling a function, e.g. RWC_Ham, with the parameters of the point,
+other than anorm and lambda_base which specify the radial basis::
+
+    result = ACM_Scan(RWC_Ham, {'B': [1.0], 'c1': [1.0], 'c2': [0.0], 'chi': chis, 'kappa': [0.0],
+                                'anorm': anorms},
+                      nu_min, nu_max, v_min, v_max, L_min, L_max, lambda_base=2.5, eig_num=4,
+                      rat_lst=((2, 0, 1, 1), (4, 2, 1, 1)))
+    result.data['eigenvalues'], result.data['rates']
+
+The first point is calculated in the calling process, which loads the SO5CG coefficients
+and fills the spherical operator store. The workers are then forked, so that they share that data
+and the acmpy globals (e.g. the lambda function and the transition rate function) with the calling process.
+The task of the scan is handed to the workers as an argument of their initializer, which fork does not pickle,
+so that scans called concurrently from several threads each have their own task.
+Where fork is not available, the points are calculated in the calling process.
+Each point is calculated in the ACMContext that is current when ACM_Scan is called.
+The rates are the raw values of glb_rat_fun, not divided by the scale factor glb_rat_sft used for display.
+
+With warm_start=True, the lowest eigenvectors of each point are the starting point of the LOBPCG iteration
+at the next point calculated by the same process, see EigenSession,
+and the field 'iterations' of the result records the number of iterations of each point.
+"""
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from typing import Callable, Mapping, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from acmpy.compat import nonnegint, require_nonnegint_range, NDArrayFloat
+from acmpy.internal_operators import OperatorSum
+from acmpy.spherical_space import dimSO5r3_rngV
+from acmpy.eigenvalues import EigenSession
+from acmpy.full_space import DigXspace, AmpXspeig, Designators_eig_num, LValues, LBlockNDFloatArray
+from acmpy.globals import Designator, Designators, ACMContext, use_context
+from acmpy.parallel import worker_count, blas_threads_per_worker, fork_context, init_worker
+import acmpy.globals as g
+
+ScanGrid = Mapping[str, Sequence[float]]
+"""The values of each parameter of a scan. The points of the scan are all the combinations of these values."""
+
+ScanPoint = dict[str, float]
+
+HamiltonianSpec = Union[OperatorSum, Callable[..., OperatorSum]]
+"""A fixed Hamiltonian, or a function that returns the Hamiltonian for the parameters of a point."""
+
+BASIS_PARAMETERS: tuple[str, ...] = ('anorm', 'lambda_base')
+"""The parameters of a point that specify the radial basis rather than the Hamiltonian."""
+
+
+class ScanResult(NamedTuple):
+    """
+    The result of a scan. The structured array data has one row per point, with a field for each parameter,
+    the field 'eigenvalues' of shape (len(Lvals), eig_num), padded with NaN where an L space has fewer states,
+    and the field 'rates' of shape (len(rat_lst),), NaN where a rate is not available.
+    """
+    data: np.ndarray
+    Lvals: LValues
+    rat_lst: Designators
+
+
+class ScanTask(NamedTuple):
+    """Everything needed to calculate a point of a scan."""
+    ham: HamiltonianSpec
+    points: list[ScanPoint]
+    anorm: Optional[float]
+    lambda_base: Optional[float]
+    nu_min: nonnegint
+    nu_max: nonnegint
+    v_min: nonnegint
+    v_max: nonnegint
+    L_min: nonnegint
+    L_max: nonnegint
+    Lvals: LValues
+    eig_num: int
+    rat_lst: Designators
+    warm_start: bool
+    context: ACMContext
+
+
+# The task of the scan of a worker process, set by init_scan_worker.
+scan_task: Optional[ScanTask] = None
+
+# The eigensolver session of the scan of a worker process, if warm started, set by init_scan_worker.
+# Each worker continues its own copy of the session of the calling process.
+scan_session: Optional[EigenSession] = None
+
+
+def scan_points(grid: ScanGrid) -> list[ScanPoint]:
+    """Return all the combinations of the values of the grid, the last parameter varying quickest."""
+    names: list[str] = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def scan_rate(trans: LBlockNDFloatArray, Lvals: LValues, rate_ent: Designator) -> float:
+    """Return the raw transition rate of the designator (L1, L2, n1, n2), or NaN if it is not available."""
+    L1, L2, n1, n2 = rate_ent
+    if L1 not in Lvals or L2 not in Lvals:
+        return np.nan
+
+    TR_matrix: NDArrayFloat = trans.get_block(L2, L1)
+    TR_rows, TR_cols = TR_matrix.shape
+    if not (0 < n1 <= TR_cols and 0 < n2 <= TR_rows):
+        return np.nan
+
+    return float(g.glb_rat_fun(L1, L2, TR_matrix[n2 - 1, n1 - 1]))
+
+
+def scan_point(task: ScanTask, index: int, session: Optional[EigenSession] = None
+               ) -> tuple[int, NDArrayFloat, NDArrayFloat, int]:
+    """
+    Return the lowest eigenvalues of each L, the transition rates and the number of LOBPCG iterations
+    at a point of the task. If the task is warm started, the session continues from its previous point.
+    """
+    with use_context(task.context):
+        return scan_point_context(task, index, session)
+
+
+def scan_point_context(task: ScanTask, index: int, session: Optional[EigenSession] = None
+                       ) -> tuple[int, NDArrayFloat, NDArrayFloat, int]:
+    """Return the results of scan_point, calculated in the current context."""
+    point: ScanPoint = dict(task.points[index])
+    anorm: Optional[float] = point.pop('anorm', task.anorm)
+    lambda_base: Optional[float] = point.pop('lambda_base', task.lambda_base)
+    if anorm is None or lambda_base is None:
+        raise ValueError('anorm and lambda_base must be given, either as parameters of the grid or as arguments.')
+
+    ham_op: OperatorSum = task.ham(**point) if callable(task.ham) else task.ham
+
+    # only the eigenvectors that are reported or used by the rates are obtained
+    eig_num: int = max(1, task.eig_num, Designators_eig_num(task.rat_lst, 0))
+    if not task.warm_start:
+        session = None
+    iterations: int = 0 if session is None else session.iterations
+    eigen_vals, eigen_bases, Xparams, Lvals = DigXspace(ham_op, anorm, lambda_base,
+                                                        task.nu_min, task.nu_max, task.v_min, task.v_max,
+                                                        task.L_min, task.L_max, eig_num=eig_num, session=session)
+    if session is not None:
+        iterations = session.iterations - iterations
+
+    eigs: NDArrayFloat = np.full((len(task.Lvals), task.eig_num), np.nan)
+    for i, vals in enumerate(eigen_vals):
+        count: int = min(task.eig_num, len(vals))
+        eigs[i, :count] = vals[:count]
+
+    rates: NDArrayFloat = np.full(len(task.rat_lst), np.nan)
+    if len(task.rat_lst) > 0:
+        trans: LBlockNDFloatArray = AmpXspeig(g.glb_rat_TRop, eigen_bases, Xparams, Lvals, g.glb_rat_TRopAM,
+                                              max(1, Designators_eig_num(task.rat_lst, 0)))
+        rates[:] = [scan_rate(trans, Lvals, rate_ent) for rate_ent in task.rat_lst]
+
+    return index, eigs, rates, iterations
+
+
+def init_scan_worker(n: int, task: ScanTask, session: Optional[EigenSession]) -> None:
+    """Initialise a worker process of the scan task, with n BLAS threads."""
+    global scan_task, scan_session
+    init_worker(n)
+    scan_task = task
+    scan_session = session
+
+
+def scan_worker(index: int) -> tuple[int, NDArrayFloat, NDArrayFloat, int]:
+    """Calculate a point of the scan task of the worker process."""
+    assert scan_task is not None
+    return scan_point(scan_task, index, scan_session)
+
+
+def ACM_Scan(ham: HamiltonianSpec, grid: ScanGrid,
+             nu_min: nonnegint, nu_max: nonnegint,
+             v_min: nonnegint, v_max: nonnegint,
+             L_min: nonnegint, L_max: Optional[nonnegint] = None,
+             anorm: Optional[float] = None, lambda_base: Optional[float] = None,
+             eig_num: Optional[int] = None, rat_lst: Optional[Designators] = None,
+             max_workers: Optional[int] = None, warm_start: bool = False
+             ) -> ScanResult:
+    """
+    Diagonalise the Hamiltonian at each point of the grid and return its lowest eigenvalues and transition rates.
+    By default, eig_num is glb_eig_num, the designators of length 4 in glb_rat_lst are used,
+    and there is one worker per available core.
+    """
+    LLM: nonnegint = L_min if L_max is None else L_max
+    require_nonnegint_range('nu', nu_min, nu_max)
+    require_nonnegint_range('v', v_min, v_max)
+    require_nonnegint_range('L', L_min, LLM)
+
+    if eig_num is None:
+        eig_num = g.glb_eig_num
+    if eig_num < 0:
+        raise ValueError(f'eig_num must not be negative: {eig_num}')
+
+    if rat_lst is None:
+        rat_lst = tuple(rate_ent for rate_ent in g.glb_rat_lst if len(rate_ent) == 4)
+    for rate_ent in rat_lst:
+        if len(rate_ent) != 4:
+            raise ValueError(f'Bad transition rate specification: {rate_ent}')
+
+    if not callable(ham):
+        for name in grid:
+            if name not in BASIS_PARAMETERS:
+                raise ValueError(f'Parameter {name} of a fixed Hamiltonian must be one of {BASIS_PARAMETERS}')
+
+    Lvals: LValues = [LL for LL in range(L_min, LLM + 1) if dimSO5r3_rngV(v_min, v_max, LL) > 0]
+    points: list[ScanPoint] = scan_points(grid)
+    task: ScanTask = ScanTask(ham, points, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, LLM,
+                              Lvals, eig_num, tuple(rat_lst), warm_start, g.current_context())
+
+    dtype: np.dtype = np.dtype([(name, np.float64) for name in grid] +
+                               [('eigenvalues', np.float64, (len(Lvals), eig_num)),
+                                ('rates', np.float64, (len(rat_lst),))] +
+                               ([('iterations', np.int64)] if warm_start else []))
+    data: np.ndarray = np.zeros(len(points), dtype=dtype)
+    for name in grid:
+        data[name] = [point[name] for point in points]
+
+    if len(points) == 0:
+        return ScanResult(data, Lvals, task.rat_lst)
+
+    session: Optional[EigenSession] = \
+        EigenSession(max(1, eig_num, Designators_eig_num(task.rat_lst, 0))) if warm_start else None
+
+    results: list[tuple[int, NDArrayFloat, NDArrayFloat, int]] = [scan_point(task, 0, session)]
+
+    workers: int = worker_count(max_workers, len(points) - 1)
+    context: Optional[BaseContext] = fork_context()
+    if workers > 1 and context is not None:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=init_scan_worker,
+                                 initargs=(blas_threads_per_worker(workers), task, session)) as pool:
+            results.extend(pool.map(scan_worker, range(1, len(points)),
+                                    chunksize=max(1, (len(points) - 1) // (4 * workers))))
+    else:
+        results.extend(scan_point(task, index, session) for index in range(1, len(points)))
+
+    for index, eigs, rates, iterations in results:
+        data['eigenvalues'][index] = eigs
+        data['rates'][index] = rates
+        if warm_start:
+            data['iterations'][index] = iterations
+
+    return ScanResult(data, Lvals, task.rat_lst)
@@ -2,9 +2,11 @@
 
 import math
 import numpy as np
+import numpy.typing as npt
 from abc import ABC, abstractmethod
 from acmpy.radial_bases import Nu, RadialBasis, TruncatedRadialSpace
-from acmpy.compat import NDArrayFloat
+from acmpy.compat import NDArrayFloat, NDArrayInt, NDArrayBool
+from acmpy.banded_matrix import BandedMatrix
 
 
 class RadialOperator(ABC):
@@ -53,9 +55,37 @@ def ME_Radial_b2(lambdaa: float, mu_f: Nu, mu_i: Nu) -> float:
     return 0.0
 
 
+def sqrt_where(x: npt.ArrayLike, where: npt.ArrayLike) -> NDArrayFloat:
+    """Return the square root of x where the mask is True, and 0.0 elsewhere."""
+    x_b, where_b = np.broadcast_arrays(np.asarray(x, dtype=np.float64), where)
+    return np.sqrt(x_b, out=np.zeros(x_b.shape), where=where_b)
+
+
+# The following is the array version of ME_Radial_b2.
+# The arguments mu_f and mu_i are integer arrays that are broadcast against each other,
+# e.g. a column and a row of labels give the full matrix in one call.
+def ME_Radial_b2_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt
+                       ) -> NDArrayFloat:
+    return sqrt_where((lambdaa + mu_i - 1) * mu_i, mu_f == mu_i - 1) \
+        + np.where(mu_f == mu_i, lambdaa + 2 * mu_i, 0.0) \
+        + sqrt_where((lambdaa + mu_i) * (mu_i + 1), mu_f == mu_i + 1)
+
+
 class RadialOperator_b2(RadialOperator):
     """This class models the $\beta^2$ operator."""
 
     def matrix_element(self, mu_f: Nu, mu_i: Nu) -> float:
         return ME_Radial_b2(self.basis.lambdaa, mu_f, mu_i)
 
+    def matrix(self, subspace: TruncatedRadialSpace) -> NDArrayFloat:
+        labels: NDArrayInt = np.array(subspace.labels(), dtype=np.int_)
+        return ME_Radial_b2_array(self.basis.lambdaa, labels[:, np.newaxis], labels[np.newaxis, :])
+
+    def band(self, subspace: TruncatedRadialSpace) -> BandedMatrix:
+        """Return the matrix as a tridiagonal BandedMatrix."""
+        labels: NDArrayInt = np.array(subspace.labels(), dtype=np.int_)
+        mu_i: NDArrayInt = labels + np.arange(-1, 2)[:, np.newaxis]
+        inside: NDArrayBool = (subspace.nu_min <= mu_i) & (mu_i <= subspace.nu_max)
+        data: NDArrayFloat = np.where(inside, ME_Radial_b2_array(self.basis.lambdaa, labels, mu_i), 0.0)
+        return BandedMatrix(data, 1, 1)
+
@@ -2,20 +2,26 @@
 
 import math
 import numpy as np
+import scipy.linalg as la
 import scipy.special as sc
-from typing import Callable
 from functools import cache
+from typing import Callable, Union
 from abc import ABC, abstractmethod
 
 from sympy import Expr, S, sqrt, simplify, Symbol, symbols, binomial, RisingFactorial
 
-from acmpy.compat import nonnegint, require_nonnegint, is_even, iquo, is_odd, require_int, irem, NDArrayFloat
+from acmpy.compat import nonnegint, require_nonnegint, is_even, iquo, is_odd, require_int, irem, NDArrayFloat, \
+    NDArrayInt, NDArrayBool
+from acmpy.cache_manager import managed_cache, cache_manager
 from acmpy.eigenvalues import Eigenfiddle
-from acmpy.radial_bases import Nu, RadialBasis, TruncatedRadialSpace
-from acmpy.radial_operators import RadialOperator, RadialOperator_b2, ME_Radial_b2
+from acmpy.radial_bases import Nu, RadialBasis
+from acmpy.banded_matrix import BandedMatrix, RadialMatrix, to_ndarray
+from acmpy.radial_operators import RadialOperator, RadialOperator_b2, ME_Radial_b2, ME_Radial_b2_array, sqrt_where
 
 RadialMatrixElementFunction = Callable[[float, Nu, Nu], float]
 RadialMatrixElementParamFunction = Callable[[float, Nu, Nu, int], float]
+RadialMatrixElementArrayFunction = Callable[[float, NDArrayInt, NDArrayInt], NDArrayFloat]
+RadialMatrixElementParamArrayFunction = Callable[[float, NDArrayInt, NDArrayInt, int], NDArrayFloat]
 
 # # The following is a list containing the symbolic names for ten operators
 # # that are the "basic" radial operators.
@@ -452,8 +458,7 @@ def ME_Radial_id_pl(lambdaa: float, mu_f: Nu, mu_i: Nu, r: nonnegint) -> float:
         raise ValueError('cannot evaluate Gamma function at non-positive integer')
 
     if mu_i <= mu_f + r:
-        poly: Expr = MF_Radial_id_poly(mu_f, mu_i, r)
-        res: float = float(poly.subs(lamvar, lambdaa))
+        res: float = float(MF_Radial_id_poly_eval(lambdaa, mu_f, mu_i, r))
         poch_i: float = sc.poch(mu_i + 1, lambdaa - 1)
         poch_f: float = sc.poch(mu_f + 1, lambdaa + 2 * r - 1)
         return res * math.sqrt(poch_i / poch_f)
@@ -484,8 +489,7 @@ def ME_Radial_id_ml(lambdaa: float, mu_f: Nu, mu_i: Nu, r: nonnegint) -> float:
         raise ValueError('cannot evaluate Gamma function at non-positive integer')
 
     if mu_f <= mu_i + r:
-        poly: Expr = MF_Radial_id_poly(mu_i, mu_f, r)
-        res: float = float(poly.subs(lamvar, lambdaa - 2 * r))
+        res: float = float(MF_Radial_id_poly_eval(lambdaa - 2 * r, mu_i, mu_f, r))
         poch_f: float = sc.poch(mu_f + 1, lambdaa - 1 - 2 * r)
         poch_i: float = sc.poch(mu_i + 1, lambdaa - 1)
         return res * math.sqrt(poch_f / poch_i)
@@ -558,6 +562,165 @@ def MF_Radial_id_pl(lambdaa: Expr, mu: Nu, nu: Nu, r: nonnegint
     return simplify(res) * (-1) ** (mu + nu)
 
 
+# ###########################################################################
+#
+# The following are array versions of the above matrix element procedures.
+# Each takes integer arrays mu_f and mu_i, which are broadcast against each other,
+# and returns the array of matrix elements in a single NumPy evaluation.
+# Passing a column and a row of labels gives a full representation matrix,
+# while passing the labels of a few diagonals gives just the band.
+# They are used by RepRadial and RepRadial_param below in place of
+# calling the scalar procedures once per matrix element.
+
+def sign_array(k: NDArrayInt) -> NDArrayFloat:
+    """Return (-1)**k elementwise as floats."""
+    return np.where(k % 2 == 0, 1.0, -1.0)
+
+
+def ME_Radial_S0_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    return np.where(mu_f == mu_i, lambdaa / 2 + mu_i, 0.0)
+
+
+def ME_Radial_Sp_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    return sqrt_where((lambdaa + mu_i) * (mu_i + 1), mu_f == mu_i + 1)
+
+
+def ME_Radial_Sm_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    return sqrt_where((lambdaa + mu_i - 1) * mu_i, mu_f == mu_i - 1)
+
+
+def ME_Radial_bm2_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    if lambdaa == -1.0:
+        raise ValueError('Singular 1/beta^2 for lambda=1')
+    if float(lambdaa).is_integer() and (lambdaa <= -np.min(mu_i) or lambdaa <= -np.min(mu_f)):
+        raise ValueError('cannot evaluate Gamma function at non-positive integer')
+
+    return ME_Radial_pt_array(lambdaa, np.maximum(mu_f, mu_i), np.minimum(mu_f, mu_i))
+
+
+def ME_Radial_pt_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    if lambdaa == 1.0:
+        raise ValueError(f'lambdaa must not be 1: {lambdaa}')
+
+    poch_i: NDArrayFloat = sc.poch(mu_i + 1, lambdaa - 1)
+    poch_f: NDArrayFloat = sc.poch(mu_f + 1, lambdaa - 1)
+    return sign_array(mu_f - mu_i) * np.sqrt(poch_i / poch_f) / (lambdaa - 1)
+
+
+def ME_Radial_D2b_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    stuff: NDArrayFloat = sqrt_where((lambdaa + mu_i - 1) * mu_i, mu_f == mu_i - 1) \
+        + np.where(mu_f == mu_i, -lambdaa - 2 * mu_i, 0.0) \
+        + sqrt_where((lambdaa + mu_i) * (mu_i + 1), mu_f == mu_i + 1)
+
+    return stuff + (lambdaa - 1.5) * (lambdaa - 0.5) \
+        * ME_Radial_pt_array(lambdaa, np.maximum(mu_f, mu_i), np.minimum(mu_f, mu_i))
+
+
+def ME_Radial_bDb_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    return sqrt_where((lambdaa + mu_i - 1) * mu_i, mu_f == mu_i - 1) \
+        + np.where(mu_f == mu_i, -0.5, 0.0) \
+        - sqrt_where((lambdaa + mu_i) * (mu_i + 1), mu_f == mu_i + 1)
+
+
+def ME_Radial_b_pl_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    return sqrt_where(mu_i, mu_f == mu_i - 1) \
+        + sqrt_where(lambdaa + mu_i, mu_f == mu_i)
+
+
+def ME_Radial_bm_pl_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    if float(lambdaa).is_integer() and lambdaa <= -np.min(mu_i):
+        raise ValueError('cannot evaluate Gamma function at non-positive integer')
+
+    poch_i: NDArrayFloat = sc.poch(mu_i + 1, lambdaa - 1)
+    poch_f: NDArrayFloat = sc.poch(mu_f + 1, lambdaa)
+    return sign_array(mu_f - mu_i) * sqrt_where(poch_i / poch_f, mu_f >= mu_i)
+
+
+def ME_Radial_Db_pl_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    poch_i: NDArrayFloat = sc.poch(mu_i + 1, lambdaa - 1)
+    poch_f: NDArrayFloat = sc.poch(mu_f + 1, lambdaa)
+    return sqrt_where(mu_i, mu_f == mu_i - 1) \
+        - sqrt_where(lambdaa + mu_i, mu_f == mu_i) \
+        + sign_array(mu_f - mu_i) * (lambdaa - 0.5) * sqrt_where(poch_i / poch_f, mu_f >= mu_i)
+
+
+def ME_Radial_b_ml_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    return sqrt_where(mu_f, mu_f == mu_i + 1) \
+        + sqrt_where(lambdaa + mu_i - 1, mu_f == mu_i)
+
+
+def ME_Radial_bm_ml_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    if float(lambdaa).is_integer() and lambdaa <= -np.min(mu_i):
+        raise ValueError('cannot evaluate Gamma function at non-positive integer')
+
+    poch_f: NDArrayFloat = sc.poch(mu_f + 1, lambdaa - 2)
+    poch_i: NDArrayFloat = sc.poch(mu_i + 1, lambdaa - 1)
+    return sign_array(mu_f - mu_i) * sqrt_where(poch_f / poch_i, mu_f <= mu_i)
+
+
+def ME_Radial_Db_ml_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt) -> NDArrayFloat:
+    poch_f: NDArrayFloat = sc.poch(mu_f + 1, lambdaa - 2)
+    poch_i: NDArrayFloat = sc.poch(mu_i + 1, lambdaa - 1)
+    return -sqrt_where(mu_f, mu_f == mu_i + 1) \
+        + sqrt_where(lambdaa + mu_i - 1, mu_f == mu_i) \
+        + sign_array(mu_f - mu_i) * (1.5 - lambdaa) * sqrt_where(poch_f / poch_i, mu_f <= mu_i)
+
+
+# The following evaluates the polynomial MF_Radial_id_poly(mu, nu, r) at lamvar=lambdaa
+# numerically, for integer arrays mu and nu, which are broadcast against each other.
+# It sums the same terms as MF_Radial_id_pl, with binomials and rising factorials
+# evaluated as floats, instead of forming and simplifying a SymPy expression.
+# If log_space is True, the magnitude of each term is formed from the logarithms
+# of its factors, which avoids overflow for large mu and r (this requires
+# lambdaa + mu + r > 0, as holds for all the bases used here).
+# The SymPy procedure MF_Radial_id_poly is kept as the reference for the tests.
+def MF_Radial_id_poly_eval(lambdaa: float, mu: Union[int, NDArrayInt], nu: Union[int, NDArrayInt], r: nonnegint,
+                           log_space: bool = False) -> NDArrayFloat:
+    mu_b, nu_b = np.broadcast_arrays(np.asarray(mu), np.asarray(nu))
+    if r == 0:
+        return np.where(mu_b == nu_b, 1.0, 0.0)
+
+    res: NDArrayFloat = np.zeros(mu_b.shape)
+    for j in range(r + 1):
+        where: NDArrayBool = j >= nu_b - mu_b
+        top: NDArrayInt = np.where(where, r + mu_b - nu_b + j - 1, r - 1)
+        term: NDArrayFloat
+        if log_space:
+            term = np.exp(math.log(math.comb(r, j)) + np.log(sc.comb(top, r - 1))
+                          + sc.gammaln(lambdaa + mu_b + 2 * r) - sc.gammaln(lambdaa + mu_b + r + j)
+                          + sc.gammaln(mu_b + j + 1) - sc.gammaln(mu_b + 1))
+        else:
+            term = math.comb(r, j) * sc.comb(top, r - 1) \
+                * sc.poch(lambdaa + mu_b + r + j, r - j) * sc.poch(mu_b + 1, j)
+        res += np.where(where, (-1) ** j * term, 0.0)
+
+    return sign_array(mu_b + nu_b) * res
+
+
+def ME_Radial_id_pl_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt, r: nonnegint
+                          ) -> NDArrayFloat:
+    if float(lambdaa).is_integer() and lambdaa <= -np.min(mu_i):
+        raise ValueError('cannot evaluate Gamma function at non-positive integer')
+
+    where: NDArrayBool = mu_i <= mu_f + r
+    poly: NDArrayFloat = MF_Radial_id_poly_eval(lambdaa, mu_f, mu_i, r)
+    poch_i: NDArrayFloat = sc.poch(mu_i + 1, lambdaa - 1)
+    poch_f: NDArrayFloat = sc.poch(mu_f + 1, lambdaa + 2 * r - 1)
+    return poly * sqrt_where(poch_i / poch_f, where)
+
+
+def ME_Radial_id_ml_array(lambdaa: float, mu_f: NDArrayInt, mu_i: NDArrayInt, r: nonnegint
+                          ) -> NDArrayFloat:
+    if float(lambdaa).is_integer() and lambdaa <= -np.min(mu_f) + 2 * r:
+        raise ValueError('cannot evaluate Gamma function at non-positive integer')
+
+    where: NDArrayBool = mu_f <= mu_i + r
+    poly: NDArrayFloat = MF_Radial_id_poly_eval(lambdaa - 2 * r, mu_i, mu_f, r)
+    poch_f: NDArrayFloat = sc.poch(mu_f + 1, lambdaa - 1 - 2 * r)
+    poch_i: NDArrayFloat = sc.poch(mu_i + 1, lambdaa - 1)
+    return poly * sqrt_where(poch_f / poch_i, where)
+
+
 # # The following procedure returns a single matrix element
 # #     F^{(anorm)}_{lambda_var,mu_f}{lambda,mu_i}(Op),
 # # for Op one of the operators from Table I with symbolic name radial_op.
@@ -711,10 +874,41 @@ def ME_Radial(radial_op: Symbol, anorm: float,
 #   simplify(Matrix(nu_max-nu_min+1,(i,j)->ME(lambda,nu_min-1+i,nu_min-1+j)),
 #        GAMMA,radical):
 # end:
-@cache
+#
+# The Python implementation evaluates the whole matrix in one call of the array
+# version of ME when one is registered below, and otherwise falls back to calling
+# ME once per matrix element.
+ME_Radial_arrays: dict[RadialMatrixElementFunction, RadialMatrixElementArrayFunction] = {
+    ME_Radial_S0: ME_Radial_S0_array,
+    ME_Radial_Sp: ME_Radial_Sp_array,
+    ME_Radial_Sm: ME_Radial_Sm_array,
+    ME_Radial_b2: ME_Radial_b2_array,
+    ME_Radial_bm2: ME_Radial_bm2_array,
+    ME_Radial_pt: ME_Radial_pt_array,
+    ME_Radial_D2b: ME_Radial_D2b_array,
+    ME_Radial_bDb: ME_Radial_bDb_array,
+    ME_Radial_b_pl: ME_Radial_b_pl_array,
+    ME_Radial_bm_pl: ME_Radial_bm_pl_array,
+    ME_Radial_Db_pl: ME_Radial_Db_pl_array,
+    ME_Radial_b_ml: ME_Radial_b_ml_array,
+    ME_Radial_bm_ml: ME_Radial_bm_ml_array,
+    ME_Radial_Db_ml: ME_Radial_Db_ml_array
+}
+
+ME_Radial_param_arrays: dict[RadialMatrixElementParamFunction, RadialMatrixElementParamArrayFunction] = {
+    ME_Radial_id_pl: ME_Radial_id_pl_array,
+    ME_Radial_id_ml: ME_Radial_id_ml_array
+}
+
+
+@managed_cache
 def RepRadial(ME: RadialMatrixElementFunction, lambdaa: float,
               nu_min: Nu, nu_max: Nu
               ) -> NDArrayFloat:
+    if ME in ME_Radial_arrays:
+        mu: NDArrayInt = np.arange(nu_min, nu_max + 1)
+        return ME_Radial_arrays[ME](lambdaa, mu[:, np.newaxis], mu[np.newaxis, :])
+
     n: int = nu_max - nu_min + 1
     # M: Matrix = Matrix(n, n, lambda i, j: ME(lambdaa, nu_min + int(i), nu_min + int(j)))
     M: NDArrayFloat = np.array([[ME(lambdaa, nu_min + i, nu_min + j)
@@ -738,10 +932,14 @@ def RepRadial(ME: RadialMatrixElementFunction, lambdaa: float,
 #                   (i,j)->ME(lambda,nu_min-1+i,nu_min-1+j,param)),
 #        GAMMA,radical):
 # end:
-@cache
+@managed_cache
 def RepRadial_param(ME: RadialMatrixElementParamFunction, lambdaa: float,
                     nu_min: Nu, nu_max: Nu, param: int
                     ) -> NDArrayFloat:
+    if ME in ME_Radial_param_arrays:
+        mu: NDArrayInt = np.arange(nu_min, nu_max + 1)
+        return ME_Radial_param_arrays[ME](lambdaa, mu[:, np.newaxis], mu[np.newaxis, :], param)
+
     n: int = nu_max - nu_min + 1
     M: NDArrayFloat = np.array([[ME(lambdaa, nu_min + i, nu_min + j, param)
                                  for j in range(n)]
@@ -750,26 +948,82 @@ def RepRadial_param(ME: RadialMatrixElementParamFunction, lambdaa: float,
     return M
 
 
-@cache
+# The following works similarly to RepRadial above, but only for the operators
+# listed below whose matrix elements vanish outside a band of diagonals.
+# It returns a BandedMatrix that holds just the band, given as the numbers of
+# (lower, upper) diagonals below and above the main diagonal.
+ME_Radial_bands: dict[RadialMatrixElementFunction, tuple[nonnegint, nonnegint]] = {
+    ME_Radial_S0: (0, 0),
+    ME_Radial_Sp: (1, 0),
+    ME_Radial_Sm: (0, 1),
+    ME_Radial_b2: (1, 1),
+    ME_Radial_bDb: (1, 1),
+    ME_Radial_b_pl: (0, 1),
+    ME_Radial_b_ml: (1, 0)
+}
+
+
+@managed_cache
+def RepRadial_band(ME: RadialMatrixElementFunction, lambdaa: float,
+                   nu_min: Nu, nu_max: Nu
+                   ) -> BandedMatrix:
+    lower, upper = ME_Radial_bands[ME]
+    mu: NDArrayInt = np.arange(nu_min, nu_max + 1)[np.newaxis, :]
+    mu_i: NDArrayInt = mu + np.arange(-lower, upper + 1)[:, np.newaxis]
+    inside: NDArrayBool = (nu_min <= mu_i) & (mu_i <= nu_max)
+    data: NDArrayFloat = np.where(inside,
+                                  ME_Radial_arrays[ME](lambdaa, mu, np.clip(mu_i, nu_min, nu_max)),
+                                  0.0)
+
+    return BandedMatrix(data, lower, upper)
+
+
+# # The following has no Maple counterpart.
+# # It returns the eigenvalues, in ascending order, and the orthonormal eigenvectors
+# # of the matrix of beta^2, which is symmetric tridiagonal.
+# # The single decomposition is shared by RepRadial_b2_sqrt and
+# # RepRadial_b2_sqrtInv at the same lambda.
+@managed_cache
+def RepRadial_b2_eigen(lambdaa: float,
+                       nu_min: Nu, nu_max: Nu
+                       ) -> tuple[NDArrayFloat, NDArrayFloat]:
+    Mat: BandedMatrix = RepRadial_band(ME_Radial_b2, lambdaa, nu_min, nu_max)
+    return Tridiagonal_eigen(Mat.diagonal(), (Mat.diagonal(-1) + Mat.diagonal(1)) / 2)
+
+
+@managed_cache
 def RepRadial_b2_sqrt(lambdaa: float,
                       nu_min: Nu, nu_max: Nu
                       ) -> NDArrayFloat:
-    basis: RadialBasis = RadialBasis(lambdaa)
-    op: RadialOperator_b2 = RadialOperator_b2(basis)
-    subspace: TruncatedRadialSpace = TruncatedRadialSpace(nu_min, nu_max)
-    # Mat_np: NDArrayFloat = RepRadial(ME_Radial_b2, lambdaa, nu_min, nu_max)
-    Mat_np: NDArrayFloat = op.matrix(subspace)
-    Mat_sqrt_np: NDArrayFloat = Matrix_sqrt(Mat_np)
-    return Mat_sqrt_np
+    eigen_vals, P = RepRadial_b2_eigen(lambdaa, nu_min, nu_max)
+    if not all(eigen_vals >= 0.0):
+        raise ValueError(f'All eigenvalues must be nonnegative: {eigen_vals}')
 
+    return (P * np.sqrt(eigen_vals)) @ P.T
 
-@cache
+
+@managed_cache
 def RepRadial_b2_sqrtInv(lambdaa: float,
                          nu_min: Nu, nu_max: Nu
                          ) -> NDArrayFloat:
-    Mat: NDArrayFloat = RepRadial(ME_Radial_b2, lambdaa, nu_min, nu_max)
-    Mat_sqrtInv: NDArrayFloat = Matrix_sqrtInv(Mat)
-    return Mat_sqrtInv
+    eigen_vals, P = RepRadial_b2_eigen(lambdaa, nu_min, nu_max)
+    if not all(eigen_vals > 0.0):
+        raise ValueError(f'All eigenvalues must be positive: {eigen_vals}')
+
+    return (P / np.sqrt(eigen_vals)) @ P.T
+
+
+# # The following has no Maple counterpart.
+# # It returns the eigenvalues, in ascending order, and the orthonormal eigenvectors
+# # of the symmetric tridiagonal matrix with the diagonal d and the off-diagonal e.
+def Tridiagonal_eigen(d: NDArrayFloat, e: NDArrayFloat) -> tuple[NDArrayFloat, NDArrayFloat]:
+    if len(e) != max(0, len(d) - 1):
+        raise ValueError(f'Off-diagonal of length {len(e)} does not match diagonal of length {len(d)}')
+
+    eigen_vals: NDArrayFloat
+    P: NDArrayFloat
+    eigen_vals, P = la.eigh_tridiagonal(d, e)
+    return eigen_vals, P
 
 
 # # The following returns the positive definite square root of a
@@ -799,8 +1053,8 @@ def Matrix_sqrt(Amatrix: NDArrayFloat) -> NDArrayFloat:
     if not all(eigen_vals >= 0.0):
         raise ValueError(f'All eigenvalues must be nonnegative: {eigen_vals}')
 
-    Diag_sqrt: NDArrayFloat = np.diag(np.sqrt(eigen_vals))
-    return P @ Diag_sqrt @ np.linalg.inv(P)
+    # the eigenvectors are orthonormal, so the inverse of P is its transpose
+    return (P * np.sqrt(eigen_vals)) @ P.T
 
 
 # # The following is similar to the above to produce the inverse of
@@ -829,8 +1083,8 @@ def Matrix_sqrtInv(Amatrix: NDArrayFloat) -> NDArrayFloat:
     if not all(eigen_vals > 0.0):
         raise ValueError(f'All eigenvalues must be positive: {eigen_vals}')
 
-    Diag_sqrtInv: NDArrayFloat = np.diag(1.0 / np.sqrt(eigen_vals))
-    return P @ Diag_sqrtInv @ np.linalg.inv(P)
+    # the eigenvectors are orthonormal, so the inverse of P is its transpose
+    return (P / np.sqrt(eigen_vals)) @ P.T
 
 
 # ###########################################################################
@@ -1074,16 +1328,28 @@ def Matrix_sqrtInv(Amatrix: NDArrayFloat) -> NDArrayFloat:
 #   combine(simplify(Mat_product, sqrt),radical):
 #
 # end:
-@cache
+#
+# The Python implementation is split in two. RepRadial_bS_DS_band forms the product
+# from banded factors wherever the operator allows it, so that the product stays banded
+# until a dense factor such as the square root of beta^2 or 1/beta^2 appears.
+# RepRadial_bS_DS returns the product as a dense matrix.
 def RepRadial_bS_DS(K: int, T: nonnegint, anorm: float,
                     lambdaa: float, R: int,
                     nu_min: Nu, nu_max: Nu
                     ) -> NDArrayFloat:
+    return to_ndarray(RepRadial_bS_DS_band(K, T, anorm, lambdaa, R, nu_min, nu_max))
+
+
+@managed_cache
+def RepRadial_bS_DS_band(K: int, T: nonnegint, anorm: float,
+                         lambdaa: float, R: int,
+                         nu_min: Nu, nu_max: Nu
+                         ) -> RadialMatrix:
     if lambdaa <= 0 or (lambdaa + R) <= 0:
         raise ValueError(f'Non-positive lambda shift for operator [{K},{T}]')
 
-    Mat_product: NDArrayFloat
-    Mat: NDArrayFloat
+    Mat_product: RadialMatrix
+    Mat: RadialMatrix
     if K == 0 and T == 0 and is_odd(R):
         if R < 0:
             Mat_product = RepRadial_b2_sqrt(lambdaa + R, nu_min, nu_max)
@@ -1138,7 +1404,7 @@ def RepRadial_bS_DS(K: int, T: nonnegint, anorm: float,
 
             if i <= K:
                 assert K > 0
-                Mat = RepRadial(ME_Radial_b_pl, lambda_run, nu_min, nu_max)
+                Mat = RepRadial_band(ME_Radial_b_pl, lambda_run, nu_min, nu_max)
                 # Mat *= (1 / anorm) NEVER mutate a cached value!
                 Mat = Mat / anorm
 
@@ -1160,7 +1426,7 @@ def RepRadial_bS_DS(K: int, T: nonnegint, anorm: float,
 
             if i <= K:
                 assert K > 0
-                Mat = RepRadial(ME_Radial_b_ml, lambda_run, nu_min, nu_max)
+                Mat = RepRadial_band(ME_Radial_b_ml, lambda_run, nu_min, nu_max)
                 # Mat *= (1 / anorm) NEVER mutate a cached value!
                 Mat = Mat / anorm
 
@@ -1182,7 +1448,7 @@ def RepRadial_bS_DS(K: int, T: nonnegint, anorm: float,
 
             if i <= K:
                 assert K > 0
-                Mat = RepRadial(ME_Radial_b2, lambda_run, nu_min, nu_max)
+                Mat = RepRadial_band(ME_Radial_b2, lambda_run, nu_min, nu_max)
                 # Mat *= (1 / anorm ** 2) NEVER mutate a cached value!
                 Mat = Mat / anorm ** 2
 
@@ -1194,7 +1460,7 @@ def RepRadial_bS_DS(K: int, T: nonnegint, anorm: float,
 
             elif i == K + 1:
                 assert K > 0
-                Mat = RepRadial(ME_Radial_bDb, lambda_run, nu_min, nu_max)
+                Mat = RepRadial_band(ME_Radial_bDb, lambda_run, nu_min, nu_max)
 
             elif i == -K - 1:
                 raise ValueError("This shouldn't arise!")
@@ -1223,7 +1489,7 @@ def RepRadial_bS_DS(K: int, T: nonnegint, anorm: float,
             else:
                 assert i > abs(K)
                 Mat = RepRadial_b2_sqrtInv(lambda_run, nu_min, nu_max)
-                Mat = Mat @ RepRadial(ME_Radial_bDb, lambda_run, nu_min, nu_max)
+                Mat = Mat @ RepRadial_band(ME_Radial_bDb, lambda_run, nu_min, nu_max)
                 Mat *= anorm # NEVER mutate a cached value!
 
             imm = 1
@@ -1347,7 +1613,7 @@ class KTSOp(ABC):
     def representation(self, anorm: float,
                        lambdaa: float, R: int,
                        nu_min: nonnegint, nu_max: nonnegint
-                       ) -> NDArrayFloat:
+                       ) -> RadialMatrix:
         ...
 
 
@@ -1371,8 +1637,8 @@ class KTOp(KTSOp):
     def representation(self, anorm: float,
                        lambdaa: float, R: int,
                        nu_min: Nu, nu_max: Nu
-                       ) -> NDArrayFloat:
-        return RepRadial_bS_DS(self.K, self.T, anorm, lambdaa, R, nu_min, nu_max)
+                       ) -> RadialMatrix:
+        return RepRadial_bS_DS_band(self.K, self.T, anorm, lambdaa, R, nu_min, nu_max)
 
 
 class SOp(KTSOp):
@@ -1393,12 +1659,12 @@ class SOp(KTSOp):
     def representation(self, anorm: float,
                        lambdaa: float, R: int,
                        nu_min: Nu, nu_max: Nu
-                       ) -> NDArrayFloat:
+                       ) -> RadialMatrix:
         if R != 0:
             raise ValueError("Non-zero lambda shift for S operator (this shouldn't arise!)")
 
         ME: RadialMatrixElementFunction = [ME_Radial_Sm, ME_Radial_S0, ME_Radial_Sp][self.S + 1]
-        return RepRadial(ME, lambdaa, nu_min, nu_max)
+        return RepRadial_band(ME, lambdaa, nu_min, nu_max)
 
 
 KTSOps = tuple[KTSOp, ...]
@@ -1474,34 +1740,37 @@ KTSOps = tuple[KTSOp, ...]
 #   combine(simplify(Mat_product, sqrt),radical):
 #
 # end;
-@cache
+@managed_cache
 def RepRadialshfs_Prod(rps_op: KTSOps, anorm: float,
                        lambdaa: float, lambda_shfs: tuple[int, ...],
                        nu_min: Nu, nu_max: Nu
                        ) -> NDArrayFloat:
+    return to_ndarray(RepRadialshfs_Prod_band(rps_op, anorm, lambdaa, lambda_shfs, nu_min, nu_max))
+
+
+# # The following procedure has no Maple counterpart.
+# # It forms the product of RepRadialshfs_Prod, multiplying from the right
+# # as that does, but as the product of the leftmost operator with the
+# # remembered product of the remaining ones. Products that end with the
+# # same operators and lambda shifts, such as those of the terms of a
+# # Hamiltonian, thus share the matrices of their common suffixes.
+# # Banded factors give banded products while the band is narrower than the matrix.
+@managed_cache
+def RepRadialshfs_Prod_band(rps_op: KTSOps, anorm: float,
+                            lambdaa: float, lambda_shfs: tuple[int, ...],
+                            nu_min: Nu, nu_max: Nu
+                            ) -> RadialMatrix:
     n: int = len(rps_op)
 
-    Mat_product: NDArrayFloat
-    Mat: NDArrayFloat
     if n == 0:
-        Mat_product = np.eye(nu_max - nu_min + 1, dtype=np.float64)
+        return np.eye(nu_max - nu_min + 1, dtype=np.float64)
 
-    else:
-        lambda_run: float = lambdaa
+    lambda_run: float = lambdaa + sum(lambda_shfs[1:])
+    Mat: RadialMatrix = rps_op[0].representation(anorm, lambda_run, lambda_shfs[0], nu_min, nu_max)
+    if n == 1:
+        return Mat
 
-        for i in range(n, 0, -1):
-
-            r_op: KTSOp = rps_op[i - 1]
-            R: int = lambda_shfs[i - 1]
-            Mat = r_op.representation(anorm, lambda_run, R, nu_min, nu_max)
-            lambda_run += R
-
-            if i == n:
-                Mat_product = Mat
-            else:
-                Mat_product = Mat @ Mat_product
-
-    return Mat_product
+    return Mat @ RepRadialshfs_Prod_band(rps_op[1:], anorm, lambdaa, lambda_shfs[1:], nu_min, nu_max)
 
 
 # # The following represents a product Op of radial operators, specified by a
@@ -1620,12 +1889,15 @@ def RepRadial_Prod(rbs_op: tuple[Symbol, ...], anorm: float,
                    ) -> NDArrayFloat:
     rep: NDArrayFloat = RepRadial_Prod_common(rbs_op, anorm, lambdaa, lambda_var, nu_min, nu_max, nu_lap)
 
-    RepRadial.cache_clear()
-    RepRadial_param.cache_clear()
-    RepRadialshfs_Prod.cache_clear()
-    RepRadial_bS_DS.cache_clear()
-    RepRadial_b2_sqrt.cache_clear()
-    RepRadial_b2_sqrtInv.cache_clear()
+    cache_manager.end_of_call(RepRadial,
+                              RepRadial_band,
+                              RepRadial_param,
+                              RepRadialshfs_Prod,
+                              RepRadialshfs_Prod_band,
+                              RepRadial_bS_DS_band,
+                              RepRadial_b2_eigen,
+                              RepRadial_b2_sqrt,
+                              RepRadial_b2_sqrtInv)
 
     return rep
 
@@ -1640,16 +1912,7 @@ def RepRadial_Prod_common(rbs_op: tuple[Symbol, ...], anorm: float,
     elif (lambdaa + lambda_var) <= 0:
         raise ValueError(f'Non-positive lambda value {lambdaa + lambda_var}')
 
-    parsed_ops: KTSOps = Parse_RadialOp_List(rbs_op)
-
-    lambda_shfs: tuple[int, ...] = Lambda_RadialOp_List(parsed_ops, lambda_var)
-
-    if len(lambda_shfs) > len(parsed_ops):
-        if lambda_shfs[0] > 0:
-            parsed_ops = (KTOp(0, 0),) + parsed_ops
-        else:
-            parsed_ops += (KTOp(0, 0),)
-            lambda_shfs = lambda_shfs[1:] + (lambda_shfs[0],)
+    parsed_ops, lambda_shfs = Schedule_RadialOp_List(rbs_op, lambda_var)
 
     nu_min_shift: int = min(nu_lap, nu_min)
 
@@ -1663,6 +1926,28 @@ def RepRadial_Prod_common(rbs_op: tuple[Symbol, ...], anorm: float,
                    nu_min_shift:(1 + nu_max - nu_min + nu_min_shift)]
 
 
+# # The following procedure has no Maple counterpart.
+# # It parses the list rbs_op and splits the lambda variation lambda_var
+# # among the parsed operators, as RepRadial_Prod does, returning the
+# # parsed operators and their lambda shifts for RepRadialshfs_Prod.
+# # The result depends only on rbs_op and lambda_var, so it is remembered.
+@cache
+def Schedule_RadialOp_List(rbs_op: tuple[Symbol, ...], lambda_var: int
+                           ) -> tuple[KTSOps, tuple[int, ...]]:
+    parsed_ops: KTSOps = Parse_RadialOp_List(rbs_op)
+
+    lambda_shfs: tuple[int, ...] = Lambda_RadialOp_List(parsed_ops, lambda_var)
+
+    if len(lambda_shfs) > len(parsed_ops):
+        if lambda_shfs[0] > 0:
+            parsed_ops = (KTOp(0, 0),) + parsed_ops
+        else:
+            parsed_ops += (KTOp(0, 0),)
+            lambda_shfs = lambda_shfs[1:] + (lambda_shfs[0],)
+
+    return parsed_ops, lambda_shfs
+
+
 # # As above, but continues to remember everything.
 #
 # RepRadial_Prod_rem:=proc(rbs_op::list, anorm::algebraic,
@@ -1716,7 +2001,7 @@ def RepRadial_Prod_common(rbs_op: tuple[Symbol, ...], anorm: float,
 #     fi:
 #
 # end;
-@cache
+@managed_cache
 def RepRadial_Prod_rem(rbs_op: tuple[Symbol, ...], anorm: float,
                        lambdaa: float, lambda_var: int,
                        nu_min: Nu, nu_max: Nu,
@@ -2093,12 +2378,15 @@ def RepRadial_LC(rlc_op: list[tuple[Expr, KTSOps]], anorm: float,
                  ) -> NDArrayFloat:
     M: NDArrayFloat = RepRadial_LC_common(rlc_op, anorm, lambdaa, lambda_var, nu_min, nu_max, nu_lap)
 
-    RepRadial_Prod_rem.cache_clear()
-    RepRadialshfs_Prod.cache_clear()
-    RepRadial.cache_clear()
-    RepRadial_param.cache_clear()
-    RepRadial_b2_sqrt.cache_clear()
-    RepRadial_b2_sqrtInv.cache_clear()
+    cache_manager.end_of_call(RepRadial_Prod_rem,
+                              RepRadialshfs_Prod,
+                              RepRadialshfs_Prod_band,
+                              RepRadial,
+                              RepRadial_band,
+                              RepRadial_param,
+                              RepRadial_b2_eigen,
+                              RepRadial_b2_sqrt,
+                              RepRadial_b2_sqrtInv)
 
     return M
 
@@ -2152,7 +2440,7 @@ def RepRadial_LC_common(rlc_op: list[tuple[Expr, KTSOps]], anorm: float,
 #
 #   Mat;
 # end:
-@cache
+@managed_cache
 def RepRadial_LC_rem(rlc_op: list[tuple[Expr, KTSOps]], anorm: float,
                      lambdaa: float, lambda_var: int,
                      nu_min: Nu, nu_max: Nu,
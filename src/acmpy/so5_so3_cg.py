@@ -1,14 +1,20 @@
 """3. Procedures that access the SO(5)>SO(3) Clebsch-Gordon coefficients."""
 
+import itertools
+from functools import cache
 from typing import ClassVar, Optional
 
-from os.path import expanduser
+import numpy as np
+
+from os.path import expanduser, isfile, join
 
 from sympy import S, Expr, Rational, simplify, sqrt, factorial
 
 from acmpy.compat import nonnegint, posint, require_nonnegint, require_posint, \
-    is_odd, readdata_float
-from acmpy.spherical_space import dimSO5r3, dimSO5, dimSO3
+    is_odd, readdata_float, NDArrayFloat, NDArrayInt
+from acmpy.spherical_space import dimSO5r3, dimSO5, SO5SO3Label
+from acmpy.so5cg_binary import SO5CGBinary, default_binary_name
+from acmpy.cache_manager import cache_manager
 
 
 # ###########################################################################
@@ -71,10 +77,22 @@ class SO5CGConfig:
     default_base_directory: ClassVar[str] = '~/so5cg-data/'
     """The default base directory to use when none is currently configured."""
 
+    binary: ClassVar[Optional[SO5CGBinary]] = None
+    """The memory-mapped binary database in the base directory, if any."""
+
+    binary_loaded: ClassVar[bool] = False
+    """Whether the base directory has been searched for a binary database."""
+
     @staticmethod
     def set_base_directory(directory: str) -> None:
-        """Set the base directory."""
+        """
+        Set the base directory and forget the binary database of the previous one,
+        and the matrices built from it that are held by the cache manager, e.g. in the spherical_store.
+        """
         SO5CGConfig.base_directory = directory
+        SO5CGConfig.binary = None
+        SO5CGConfig.binary_loaded = False
+        cache_manager.clear()
 
     @staticmethod
     def get_base_directory() -> str:
@@ -83,6 +101,16 @@ class SO5CGConfig:
             if SO5CGConfig.base_directory is not None \
             else expanduser(SO5CGConfig.default_base_directory)
 
+    @staticmethod
+    def get_binary() -> Optional[SO5CGBinary]:
+        """Return the binary database in the base directory, or None if there is none."""
+        if not SO5CGConfig.binary_loaded:
+            path: str = join(SO5CGConfig.get_base_directory(), default_binary_name)
+            SO5CGConfig.binary = SO5CGBinary(path) if isfile(path) else None
+            SO5CGConfig.binary_loaded = True
+
+        return SO5CGConfig.binary
+
 
 # # The following procedure SO5CG_filename returns the full pathname of the
 # # file that contains the SO(5)>SO(3) CG coefficients
@@ -249,7 +277,65 @@ def show_CG_file(v1: nonnegint,
 # # CG_coeffs[v1,v2,a2,L2,v3][a1,L1,a3,L3].
 #
 # CG_coeffs:=table():
-CG_coeffs: dict[SO5Quintet, dict[SO5Quartet, float]] = {}
+"""
+Here, CG_coeffs[v1, v2, a2, L2, v3] is a dense array indexed by the positions
+SO5r3_index(v1, a1, L1) and SO5r3_index(v3, a3, L3) of the labels in their SO(5) irreps,
+so CG_coeffs[v1, v2, a2, L2, v3][SO5r3_index(v1, a1, L1), SO5r3_index(v3, a3, L3)] is the coefficient.
+The coefficients that are not in the data file are 0.
+"""
+CG_coeffs: dict[SO5Quintet, NDArrayFloat] = {}
+
+
+# # The following procedures have no Maple counterpart.
+# # They enumerate the labels (a,L) of the SO(5) irrep of seniority v,
+# # with L varying slowest, as in CG_labels.
+@cache
+def SO5r3_offsets(v: nonnegint) -> tuple[int, ...]:
+    """Return the positions of the first label (1, L) for L = 0, ..., 2v + 1 in the irrep v."""
+    require_nonnegint('v', v)
+
+    return tuple(itertools.accumulate((dimSO5r3(v, L) for L in range(2 * v + 1)), initial=0))
+
+
+def SO5r3_index(v: nonnegint, a: posint, L: nonnegint) -> int:
+    """Return the position of the label (a, L) in the irrep v."""
+    return SO5r3_offsets(v)[L] + a - 1
+
+
+def SO5r3_count(v: nonnegint) -> int:
+    """Return the number of labels (a, L) in the irrep v."""
+    return SO5r3_offsets(v)[-1]
+
+
+@cache
+def SO5r3_L_array(v: nonnegint) -> NDArrayInt:
+    """Return the value of L of each label (a, L) in the irrep v."""
+    offsets: tuple[int, ...] = SO5r3_offsets(v)
+    return np.repeat(np.arange(2 * v + 1), np.diff(offsets))
+
+
+@cache
+def CG_label_indices(v1: nonnegint, L2: nonnegint, v3: nonnegint) -> tuple[NDArrayInt, NDArrayInt]:
+    """Return the positions in the irreps v1 and v3 of the labels returned by CG_labels."""
+    CG_list: CGLabelList = CG_labels(v1, L2, v3)
+    rows: NDArrayInt = np.array([SO5r3_index(v1, a1, L1) for a1, L1, _, _ in CG_list], dtype=np.int_)
+    cols: NDArrayInt = np.array([SO5r3_index(v3, a3, L3) for _, _, a3, L3 in CG_list], dtype=np.int_)
+    return rows, cols
+
+
+# # The following procedure has no Maple counterpart.
+# # It returns the SO(5)>SO(3) CG coefficients for (v1,v2,a2,L2,v3)
+# # from the binary database SO5CG.bin in the base directory, if present,
+# # else from the data file SO5CG_v1_v2-a2-L2_v3 .
+def read_CG_data(v1: nonnegint,
+                 v2: nonnegint, a2: posint, L2: nonnegint,
+                 v3: nonnegint) -> NDArrayFloat:
+    binary: Optional[SO5CGBinary] = SO5CGConfig.get_binary()
+    coeffs: Optional[NDArrayFloat] = None if binary is None else binary.get((v1, v2, a2, L2, v3))
+    if coeffs is not None:
+        return coeffs
+
+    return np.array(readdata_float(SO5CG_filename(v1, v2, a2, L2, v3)))
 
 
 # # The following procedure load_CG_table loads all the
@@ -310,10 +396,39 @@ def load_CG_table(v1: nonnegint,
     if key in CG_coeffs:
         return
 
-    CG_list: CGLabelList = CG_labels(v1, L2, v3)
-    CG_data: list[float] = readdata_float(SO5CG_filename(*key)) if v2 > 0 else [1.0] * len(CG_list)
+    rows, cols = CG_label_indices(v1, L2, v3)
+    CG_data: NDArrayFloat = read_CG_data(*key) if v2 > 0 else np.ones(len(rows))
+    n: int = min(len(rows), len(CG_data))
+
+    table: NDArrayFloat = np.zeros((SO5r3_count(v1), SO5r3_count(v3)))
+    table[rows[:n], cols[:n]] = CG_data[:n]
+    CG_coeffs[key] = table
+
+
+# # The following procedure has no Maple counterpart.
+# # It returns the table of SO(5)>SO(3) CG coefficients for (v1,v2,a2,L2,v3),
+# # indexed like CG_coeffs, for v1>v3 as well as v1<=v3.
+# # For v1>v3 the table is obtained from that of (v3,v2,a2,L2,v1)
+# # using (4.164) of [RowanWood], and is kept in CG_coeffs_swapped.
+CG_coeffs_swapped: dict[SO5Quintet, NDArrayFloat] = {}
+
+
+def CG_table(v1: nonnegint,
+             v2: nonnegint, a2: posint, L2: nonnegint,
+             v3: nonnegint) -> NDArrayFloat:
+    load_CG_table(v1, v2, a2, L2, v3)
+    if v1 <= v3:
+        return CG_coeffs[(v1, v2, a2, L2, v3)]
+
+    key: SO5Quintet = (v1, v2, a2, L2, v3)
+    if key not in CG_coeffs_swapped:
+        L1: NDArrayInt = SO5r3_L_array(v1)[:, np.newaxis]
+        L3: NDArrayInt = SO5r3_L_array(v3)[np.newaxis, :]
+        phase: NDArrayFloat = np.where((L3 + L2 - L1) % 2 == 0, 1.0, -1.0)
+        factor: NDArrayFloat = np.sqrt(dimSO5(v3) * (2 * L1 + 1) / dimSO5(v1) / (2 * L3 + 1))
+        CG_coeffs_swapped[key] = CG_coeffs[(v3, v2, a2, L2, v1)].T * phase * factor
 
-    CG_coeffs[key] = {label: data for label, data in zip(CG_list, CG_data)}
+    return CG_coeffs_swapped[key]
 
 
 # # The following procedure CG_SO5r3 returns the SO(5)>SO(3) CG coefficient
@@ -358,13 +473,49 @@ def CG_SO5r3(v1: nonnegint, a1: posint, L1: nonnegint,
             is_odd(v1 + v2 + v3):
         return 0.0
     else:
-        load_CG_table(v1, v2, a2, L2, v3)
-        if v1 <= v3:
-            return CG_coeffs[(v1, v2, a2, L2, v3)][(a1, L1, a3, L3)]
-        else:
-            return CG_coeffs[(v3, v2, a2, L2, v1)][(a3, L3, a1, L1)] \
-                   * (-1) ** (L3 + L2 - L1) \
-                   * sqrt(dimSO5(v3) * dimSO3(L1) / dimSO5(v1) / dimSO3(L3))
+        return float(CG_table(v1, v2, a2, L2, v3)[SO5r3_index(v1, a1, L1), SO5r3_index(v3, a3, L3)])
+
+
+# # The following procedure has no Maple counterpart.
+# # It returns the Matrix whose [f,i] element is the SO(5)>SO(3) CG coefficient
+# # (v_i,al_i,L_i;v,al,L||v_f,al_f,L_f) for the lists of labels
+# # states_f and states_i, e.g. those given by lbsSO5r3_rngVvarL.
+# # It is equivalent to calling CG_SO5r3 for every pair of states,
+# # but obtains the coefficients block by block for each pair (v_f,v_i).
+def CG_SO5r3_block(states_f: list[SO5SO3Label],
+                   v: nonnegint, al: posint, L: nonnegint,
+                   states_i: list[SO5SO3Label]) -> NDArrayFloat:
+    require_SO5Triple(v, al, L)
+
+    block: NDArrayFloat = np.zeros((len(states_f), len(states_i)))
+    if al > dimSO5r3(v, L):
+        return block
+
+    groups_f: dict[nonnegint, tuple[list[int], list[int]]] = SO5r3_groups(states_f)
+    groups_i: dict[nonnegint, tuple[list[int], list[int]]] = SO5r3_groups(states_i)
+    Ls_f: dict[nonnegint, set[nonnegint]] = {v_f: {L_f for u, _, L_f in states_f if u == v_f} for v_f in groups_f}
+    Ls_i: dict[nonnegint, set[nonnegint]] = {v_i: {L_i for u, _, L_i in states_i if u == v_i} for v_i in groups_i}
+    for v_f, (rows_f, index_f) in groups_f.items():
+        for v_i, (rows_i, index_i) in groups_i.items():
+            if v_i + v < v_f or v_i + v_f < v or v + v_f < v_i or is_odd(v_i + v + v_f):
+                continue
+            if not any(abs(L_i - L_f) <= L <= L_i + L_f for L_f in Ls_f[v_f] for L_i in Ls_i[v_i]):
+                continue
+            table: NDArrayFloat = CG_table(v_i, v, al, L, v_f)
+            block[np.ix_(rows_f, rows_i)] = table[np.ix_(index_i, index_f)].T
+
+    return block
+
+
+def SO5r3_groups(states: list[SO5SO3Label]) -> dict[nonnegint, tuple[list[int], list[int]]]:
+    """Group the positions of the states in the list, and in their irreps, by seniority."""
+    groups: dict[nonnegint, tuple[list[int], list[int]]] = {}
+    for row, (v, a, L) in enumerate(states):
+        rows, index = groups.setdefault(v, ([], []))
+        rows.append(row)
+        index.append(SO5r3_index(v, a, L))
+
+    return groups
 
 
 # ###########################################################################
@@ -0,0 +1,145 @@
+"""A binary, memory-mapped form of the SO5CG database.
+
+Explanation
+===========
+
+The SO5CG database, see so5cg.py, is a tree of text files, one for each quintet (v1, v2, a2, L2, v3).
+For large seniorities there are thousands of files and each one is parsed line by line when it is first used.
+
+This module packs the whole tree into a single binary file, and maps that file into memory
+so that the coefficients of a quintet are a slice of the mapped file, obtained without copying or parsing.
+The file has the following layout, in native byte order:
+
+- header: the 8 byte magic string ``SO5CGBIN`` followed by the int64 values
+  version, the number of quintets n, and the byte offset of the payload
+- index: an (n, 7) int64 array whose rows are (v1, v2, a2, L2, v3, start, length),
+  where start is the position in the payload of the first coefficient of the quintet
+- payload: a float64 array of all the coefficients, in the order of the lines of each file
+
+The binary file is generated by running this module, e.g.::
+
+    python -m acmpy.so5cg_binary ~/so5cg-data/
+
+which writes ``~/so5cg-data/SO5CG.bin``.
+"""
+
+import argparse
+from os.path import expanduser, join
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from acmpy.compat import NDArrayFloat, NDArrayInt, readdata_float
+from acmpy.so5cg import base_dict
+
+SO5CGQuintet = tuple[int, int, int, int, int]
+"""The label (v1, v2, a2, L2, v3) of an SO5CG data file."""
+
+MAGIC: bytes = b'SO5CGBIN'
+VERSION: int = 1
+HEADER_BYTES: int = len(MAGIC) + 3 * 8
+INDEX_COLUMNS: int = 7
+
+default_binary_name: str = 'SO5CG.bin'
+"""The name of the binary file in the base directory of the SO5CG database."""
+
+
+def datafile_paths(base_path: Path) -> dict[SO5CGQuintet, Path]:
+    """Return the paths of all the SO5CG data files below the base directory, sorted by quintet."""
+    paths: dict[SO5CGQuintet, Path] = {quintet: path
+                                       for dir1 in base_dict(base_path).values()
+                                       for dir2 in dir1.values()
+                                       for quintet, path in dir2.items()}
+    return dict(sorted(paths.items()))
+
+
+def write_SO5CG_binary(path: str, tables: dict[SO5CGQuintet, list[float]]) -> None:
+    """Write the coefficients of each quintet to the binary file."""
+    n: int = len(tables)
+    index: NDArrayInt = np.zeros((n, INDEX_COLUMNS), dtype=np.int64)
+    start: int = 0
+    for i, (quintet, coeffs) in enumerate(tables.items()):
+        index[i] = (*quintet, start, len(coeffs))
+        start += len(coeffs)
+
+    payload: NDArrayFloat = np.fromiter((c for coeffs in tables.values() for c in coeffs),
+                                        dtype=np.float64, count=start)
+    payload_offset: int = HEADER_BYTES + index.nbytes
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.array([VERSION, n, payload_offset], dtype=np.int64).tobytes())
+        f.write(index.tobytes())
+        f.write(payload.tobytes())
+
+
+def convert_SO5CG_database(base_directory: str, path: Optional[str] = None) -> int:
+    """
+    Pack the SO5CG text files below the base directory into a binary file,
+    by default SO5CG.bin in the base directory, and return the number of quintets.
+    """
+    base_directory = expanduser(base_directory)
+    if path is None:
+        path = join(base_directory, default_binary_name)
+
+    tables: dict[SO5CGQuintet, list[float]] = {quintet: readdata_float(str(file))
+                                               for quintet, file in datafile_paths(Path(base_directory)).items()}
+    write_SO5CG_binary(path, tables)
+
+    return len(tables)
+
+
+class SO5CGBinary:
+    """This class models a memory-mapped binary SO5CG database."""
+
+    path: str
+    index: dict[SO5CGQuintet, tuple[int, int]]
+    payload: NDArrayFloat
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+        with open(path, 'rb') as f:
+            magic: bytes = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f'Not a binary SO5CG database: {path}')
+            version, n, payload_offset = (int(x) for x in np.frombuffer(f.read(3 * 8), dtype=np.int64))
+            if version != VERSION:
+                raise ValueError(f'Unsupported binary SO5CG database version {version}: {path}')
+
+        rows: NDArrayInt = np.memmap(path, dtype=np.int64, mode='r',
+                                     offset=HEADER_BYTES, shape=(n, INDEX_COLUMNS))
+        self.index = {(v1, v2, a2, L2, v3): (start, length)
+                      for v1, v2, a2, L2, v3, start, length in rows.tolist()}
+
+        payload_length: int = sum(length for _, length in self.index.values())
+        self.payload = np.memmap(path, dtype=np.float64, mode='r',
+                                 offset=payload_offset, shape=(payload_length,)) \
+            if payload_length > 0 else np.zeros(0)
+
+    def __contains__(self, quintet: SO5CGQuintet) -> bool:
+        return quintet in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get(self, quintet: SO5CGQuintet) -> Optional[NDArrayFloat]:
+        """Return the read-only coefficients of the quintet, or None if the quintet is not in the database."""
+        entry: Optional[tuple[int, int]] = self.index.get(quintet)
+        if entry is None:
+            return None
+
+        start, length = entry
+        return self.payload[start:start + length]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pack an SO5CG database into a binary file.')
+    parser.add_argument('base_directory', help='the base directory of the SO5CG database')
+    parser.add_argument('--path', help=f'the binary file (default: {default_binary_name} in the base directory)')
+    args = parser.parse_args()
+
+    count: int = convert_SO5CG_database(args.base_directory, args.path)
+    print(f'Packed {count} SO5CG data files')
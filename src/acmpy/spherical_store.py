@@ -0,0 +1,133 @@
+"""This module defines a store of spherical operator matrices that is kept across calls.
+
+Explanation
+===========
+
+The matrices of the SO(5) spherical harmonics, see RepSO5_Y_rem, and of their products,
+see RepSO5r3_Prod_rem, act on the states of a seniority range v_min, ..., v_max
+and an angular momentum range L_min, ..., L_max.
+They depend only on these ranges, not on the radial parameters anorm and lambda,
+so a scan over the radial parameters or the Hamiltonian coefficients needs to build them only once.
+However, the caches of RepSO5_Y_rem and RepSO5r3_Prod_rem are cleared at the end of each call of RepXspace.
+
+The store keeps these matrices until it is cleared explicitly, by spherical_store.clear() or cache_manager.clear(),
+or the SO5CG database is changed. It is registered with the cache manager, so under the bounded policy
+it holds at most a budget of bytes, evicting its least recently used matrices.
+The matrix elements of a single spherical harmonic do not depend on the ranges,
+so its matrix for smaller ranges is extracted as a sub-block of a stored matrix for larger ranges.
+The extracted sub-blocks are not stored themselves.
+This is not so for products, because the intermediate states of a product are truncated to the ranges,
+so products are only returned for exactly the stored ranges.
+"""
+
+from typing import Hashable, NamedTuple, Optional
+
+import numpy as np
+
+from acmpy.cache_manager import CacheManager, ManagedStore, cache_manager
+from acmpy.compat import nonnegint, NDArrayFloat, NDArrayInt
+from acmpy.spherical_space import lbsSO5r3_rngVvarL, SO5SO3Label
+
+SphericalRange = tuple[nonnegint, nonnegint, nonnegint, nonnegint]
+"""The ranges (v_min, v_max, L_min, L_max) of a spherical space."""
+
+
+class SphericalStoreInfo(NamedTuple):
+    """The statistics of a spherical operator store."""
+    hits: int
+    extractions: int
+    misses: int
+    currsize: int
+    nbytes: int
+
+
+def range_contains(outer: SphericalRange, inner: SphericalRange) -> bool:
+    """Return True if the states of the inner ranges are states of the outer ranges."""
+    v_min, v_max, L_min, L_max = inner
+    V_min, V_max, LL_min, LL_max = outer
+    return V_min <= v_min and v_max <= V_max and LL_min <= L_min and L_max <= LL_max
+
+
+def sub_block_indices(outer: SphericalRange, inner: SphericalRange) -> NDArrayInt:
+    """Return the positions of the states of the inner ranges in the states of the outer ranges."""
+    position: dict[SO5SO3Label, int] = {label: i for i, label in enumerate(lbsSO5r3_rngVvarL(*outer))}
+    return np.array([position[label] for label in lbsSO5r3_rngVvarL(*inner)], dtype=np.int_)
+
+
+class SphericalOperatorStore(ManagedStore):
+    """
+    This class models a store of spherical operator matrices keyed on the operator and the ranges,
+    whose size is managed by the cache manager.
+    """
+
+    enabled: bool
+    indices: dict[tuple[SphericalRange, SphericalRange], NDArrayInt]
+    extractions: int
+
+    def __init__(self, manager: CacheManager = cache_manager, max_bytes: Optional[int] = None) -> None:
+        super().__init__(manager, max_bytes)
+        self.enabled = True
+        self.indices = {}
+        self.extractions = 0
+
+    def get(self, op: Hashable, ranges: SphericalRange, extract: bool = False) -> Optional[NDArrayFloat]:
+        """
+        Return the stored matrix of op for the ranges, or None if it is not stored.
+        If extract is True and a matrix of op is stored for larger ranges, return its sub-block.
+        The returned matrix must not be mutated.
+        """
+        if not self.enabled:
+            return None
+
+        with self.lock:
+            key: tuple[Hashable, SphericalRange] = (op, ranges)
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+
+            if extract:
+                for stored, (M_outer, _) in self.entries.items():
+                    assert isinstance(stored, tuple)
+                    if stored[0] == op and range_contains(stored[1], ranges):
+                        idx: NDArrayInt = self.sub_block_indices(stored[1], ranges)
+                        self.entries.move_to_end(stored)
+                        self.extractions += 1
+                        return M_outer[np.ix_(idx, idx)]
+
+            self.misses += 1
+            return None
+
+    def put(self, op: Hashable, ranges: SphericalRange, M: NDArrayFloat) -> None:
+        """Store the matrix M of op for the ranges."""
+        if self.enabled:
+            self.insert((op, ranges), M)
+
+    def sub_block_indices(self, outer: SphericalRange, inner: SphericalRange) -> NDArrayInt:
+        key: tuple[SphericalRange, SphericalRange] = (outer, inner)
+        if key not in self.indices:
+            self.indices[key] = sub_block_indices(outer, inner)
+
+        return self.indices[key]
+
+    def cache_clear(self) -> None:
+        """Remove all the stored matrices. The statistics are kept."""
+        with self.lock:
+            super().cache_clear()
+            self.indices.clear()
+
+    def clear(self) -> None:
+        self.cache_clear()
+
+    def info(self) -> SphericalStoreInfo:
+        return SphericalStoreInfo(self.hits, self.extractions, self.misses, len(self.entries), self.nbytes)
+
+    def reset_stats(self) -> None:
+        super().reset_stats()
+        self.extractions = 0
+
+
+spherical_store: SphericalOperatorStore = SphericalOperatorStore()
+"""The store of the matrices of RepSO5_Y_rem and RepSO5r3_Prod_rem."""
+
+cache_manager.register('spherical_store', spherical_store)
@@ -0,0 +1,140 @@
+"""This module defines stores of the matrices of the terms of Hamiltonians that are linear in their coefficients.
+
+Explanation
+===========
+
+The Hamiltonian ACM_Hamiltonian(c11, ..., c50) is a linear combination of fixed operators,
+with the coefficients c11, ..., c50, and so is its matrix on a truncated Hilbert space
+for given radial parameters anorm and lambda_base. RWC_Ham is also of this form, see RWC_Ham_coeffs.
+A scan over the coefficients that calls DigXspace, ACM_Scale or ACM_Adapt for each point
+rebuilds the matrices of all the operators each time.
+
+A TermMatrices object builds the matrix of each operator once for each angular momentum L,
+after which the matrix of the Hamiltonian for any coefficients is a weighted sum of these,
+ready for Eigenfiddle::
+
+    terms = TermMatrices(ACM_Hamiltonian_terms(), anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, L_max)
+    for c1, c2 in grid:
+        eigen_vals, eigen_bases, Xparams, Lvals = terms.diagonalise(RWC_Ham_coeffs(B, c1, c2, chi, kappa))
+"""
+
+from typing import Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from acmpy.compat import nonnegint, require_nonnegint_range, NDArrayFloat
+from acmpy.internal_operators import OperatorSum, Op_Tame, ACM_Hamiltonian
+from acmpy.spherical_space import dimSO5r3_rngV
+from acmpy.full_operators import RepXspace, dimXspace
+from acmpy.full_space import EigenValues, EigenBases, XParams, LValues
+from acmpy.eigenvalues import Eigenfiddle, EigenSession
+
+ACM_Hamiltonian_coeff_names: tuple[str, ...] = ('c11', 'c20', 'c21', 'c22', 'c23',
+                                                'c30', 'c31', 'c32', 'c33',
+                                                'c40', 'c41', 'c42', 'c43',
+                                                'c50')
+"""The names of the coefficients of ACM_Hamiltonian, in order."""
+
+Coefficients = Union[Mapping[str, float], Sequence[float]]
+"""The coefficients of the terms, either by name or in the order of the terms."""
+
+
+def ACM_Hamiltonian_terms(names: Sequence[str] = ACM_Hamiltonian_coeff_names) -> dict[str, OperatorSum]:
+    """
+    Return the operators of ACM_Hamiltonian whose coefficients are named,
+    i.e. the Hamiltonian with that coefficient equal to 1 and all the others 0.
+    """
+    for name in names:
+        if name not in ACM_Hamiltonian_coeff_names:
+            raise ValueError(f'Unknown ACM_Hamiltonian coefficient {name}')
+
+    return {name: ACM_Hamiltonian(**{name: 1}) for name in names}
+
+
+class TermMatrices:
+    """
+    This class models the matrices of a set of named operators on the truncated Hilbert space
+    with the ranges nu_min,..,nu_max, v_min,..,v_max and L_min,..,L_max,
+    for the radial parameters anorm and lambda_base.
+    The matrices of each L are stacked in an array of shape (number of terms, dim, dim).
+    """
+
+    names: list[str]
+    Xparams: XParams
+    Lvals: LValues
+    units: dict[nonnegint, NDArrayFloat]
+
+    def __init__(self, terms: Mapping[str, OperatorSum],
+                 anorm: float, lambda_base: float,
+                 nu_min: nonnegint, nu_max: nonnegint,
+                 v_min: nonnegint, v_max: nonnegint,
+                 L_min: nonnegint, L_max: Optional[nonnegint] = None) -> None:
+        LLM: nonnegint = L_min if L_max is None else L_max
+
+        require_nonnegint_range('nu', nu_min, nu_max)
+        require_nonnegint_range('v', v_min, v_max)
+        require_nonnegint_range('L', L_min, LLM)
+
+        if len(terms) == 0:
+            raise ValueError('There must be at least one term.')
+
+        self.names = list(terms)
+        self.Xparams = anorm, lambda_base, nu_min, nu_max, v_min, v_max
+        self.Lvals = [LL for LL in range(L_min, LLM + 1) if dimSO5r3_rngV(v_min, v_max, LL) > 0]
+
+        ops: list[OperatorSum] = list(terms.values())
+        if all(Op_Tame(op) for op in ops):
+            self.units = {LL: np.stack([RepXspace(op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, LL)
+                                        for op in ops])
+                          for LL in self.Lvals}
+        else:
+            # as in DigXspace, the representation is formed on all the L values and then cut into blocks
+            reps: NDArrayFloat = np.stack([RepXspace(op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, LLM)
+                                           for op in ops])
+            self.units = {}
+            Lstart: int = 0
+            for LL in self.Lvals:
+                Lstop: int = Lstart + dimXspace(nu_min, nu_max, v_min, v_max, LL)
+                self.units[LL] = reps[:, Lstart:Lstop, Lstart:Lstop].copy()
+                Lstart = Lstop
+
+    def coeff_vector(self, coeffs: Coefficients) -> NDArrayFloat:
+        """Return the coefficients of the terms as an array, the missing named ones being 0."""
+        if isinstance(coeffs, Mapping):
+            for name in coeffs:
+                if name not in self.names:
+                    raise ValueError(f'Unknown term {name}')
+            return np.array([float(coeffs.get(name, 0)) for name in self.names])
+
+        if len(coeffs) != len(self.names):
+            raise ValueError(f'Expected {len(self.names)} coefficients, got {len(coeffs)}')
+        return np.array([float(c) for c in coeffs])
+
+    def matrix(self, coeffs: Coefficients, L: nonnegint) -> NDArrayFloat:
+        """Return the matrix of the weighted sum of the terms with the coefficients on the space of L."""
+        if L not in self.units:
+            raise ValueError(f'No states with angular momentum {L}')
+
+        return np.tensordot(self.coeff_vector(coeffs), self.units[L], axes=1)
+
+    def diagonalise(self, coeffs: Coefficients, session: Optional[EigenSession] = None
+                    ) -> tuple[EigenValues, EigenBases, XParams, LValues]:
+        """
+        Diagonalise the weighted sum of the terms with the coefficients, returning the same as DigXspace.
+        With a session, only its lowest eigenvalues are obtained, starting from its previous eigenvectors.
+        """
+        c: NDArrayFloat = self.coeff_vector(coeffs)
+
+        eigen_vals: EigenValues = []
+        eigen_bases: EigenBases = []
+        for LL in self.Lvals:
+            H: NDArrayFloat = np.tensordot(c, self.units[LL], axes=1)
+            eigen_vals_result, eigen_bases_result = Eigenfiddle(H) if session is None else session.solve(LL, H)
+            eigen_vals.append(eigen_vals_result)
+            eigen_bases.append(eigen_bases_result)
+
+        return eigen_vals, eigen_bases, self.Xparams, self.Lvals
+
+    @property
+    def nbytes(self) -> int:
+        return sum(units.nbytes for units in self.units.values())
@@ -0,0 +1,33 @@
+"""This module defines the fixtures shared by several test modules."""
+
+import pytest
+
+from acmpy.so5_so3_cg import CG_coeffs, CG_coeffs_swapped, SO5CGConfig
+from acmpy.spherical_store import spherical_store
+from acmpy.tests.test_so5cg_binary import write_datafile
+
+
+@pytest.fixture
+def fake_database(tmp_path):
+    """Make up an SO5CG database for the harmonic (2, 1, 2) and seniorities up to 3, and use it."""
+    tables: dict = {}
+    for v1 in range(4):
+        for v3 in range(v1, 4):
+            if abs(v1 - v3) <= 2 <= v1 + v3 and (v1 + v3) % 2 == 0:
+                tables[(v1, 2, 1, 2, v3)] = write_datafile(tmp_path, (v1, 2, 1, 2, v3))
+
+    saved: str = SO5CGConfig.base_directory
+    SO5CGConfig.set_base_directory(str(tmp_path) + '/')
+    CG_coeffs.clear()
+    CG_coeffs_swapped.clear()
+    yield tables
+    CG_coeffs.clear()
+    CG_coeffs_swapped.clear()
+    SO5CGConfig.set_base_directory(saved)
+
+
+@pytest.fixture
+def fake_Y_212(fake_database):
+    """Use a made up SO5CG database for the harmonic (2, 1, 2), which empties the caches."""
+    assert spherical_store.info().currsize == 0
+    yield
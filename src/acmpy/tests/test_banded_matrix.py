@@ -0,0 +1,63 @@
+"""This module tests the banded_matrix.py module."""
+
+import pytest
+import numpy as np
+from acmpy.compat import NDArrayFloat
+from acmpy.banded_matrix import BandedMatrix, to_ndarray
+from acmpy.radial_bases import RadialBasis, TruncatedRadialSpace
+from acmpy.radial_operators import RadialOperator_b2
+from acmpy.radial_space import RepRadial, RepRadial_band, ME_Radial_bands
+
+
+def random_band(n: int, lower: int, upper: int, seed: int) -> NDArrayFloat:
+    """Return a random dense n x n matrix that vanishes outside the band."""
+    M: NDArrayFloat = np.random.default_rng(seed).standard_normal((n, n))
+    return np.triu(np.tril(M, upper), -lower)
+
+
+class TestBandedMatrix:
+    """Tests the BandedMatrix class."""
+
+    @pytest.mark.parametrize("lower,upper", [(0, 0), (1, 0), (0, 1), (1, 1), (2, 3)])
+    def test_roundtrip(self, lower, upper, allclose):
+        M: NDArrayFloat = random_band(6, lower, upper, 1)
+        B: BandedMatrix = BandedMatrix.from_ndarray(M, lower, upper)
+        assert B.shape == (6, 6)
+        assert allclose(B.toarray(), M)
+        assert allclose(B.diagonal(-lower), np.diag(M, -lower))
+
+    @pytest.mark.parametrize("lower1,upper1,lower2,upper2", [(1, 1, 1, 1), (0, 1, 1, 0), (2, 0, 1, 3), (4, 4, 4, 4)])
+    def test_matmul(self, lower1, upper1, lower2, upper2, allclose):
+        M1: NDArrayFloat = random_band(7, lower1, upper1, 2)
+        M2: NDArrayFloat = random_band(7, lower2, upper2, 3)
+        B1: BandedMatrix = BandedMatrix.from_ndarray(M1, lower1, upper1)
+        B2: BandedMatrix = BandedMatrix.from_ndarray(M2, lower2, upper2)
+        D: NDArrayFloat = np.random.default_rng(4).standard_normal((7, 7))
+
+        assert allclose(to_ndarray(B1 @ B2), M1 @ M2)
+        assert allclose(B1 @ D, M1 @ D)
+        assert allclose(D @ B1, D @ M1)
+        assert allclose((2.0 * B1 / 4.0).toarray(), M1 / 2.0)
+
+    def test_product_stays_banded(self):
+        B: BandedMatrix = BandedMatrix.from_ndarray(random_band(10, 1, 1, 5), 1, 1)
+        P = B @ B
+        assert isinstance(P, BandedMatrix)
+        assert (P.lower, P.upper) == (2, 2)
+
+    def test_error(self):
+        with pytest.raises(ValueError):
+            BandedMatrix(np.zeros((2, 5)), 1, 1)
+
+
+class TestRepRadial_band:
+    """Tests that RepRadial_band() agrees with RepRadial()."""
+
+    @pytest.mark.parametrize("ME", list(ME_Radial_bands.keys()), ids=lambda ME: ME.__name__)
+    def test_ok(self, ME, allclose):
+        assert allclose(RepRadial_band(ME, 2.5, 1, 7).toarray(), RepRadial(ME, 2.5, 1, 7))
+
+    def test_RadialOperator_b2(self, allclose):
+        op: RadialOperator_b2 = RadialOperator_b2(RadialBasis(2.5))
+        subspace: TruncatedRadialSpace = TruncatedRadialSpace(0, 5)
+        assert allclose(op.band(subspace).toarray(), op.matrix(subspace))
@@ -0,0 +1,135 @@
+"""This module tests the cache_manager.py module."""
+
+import pickle
+import pytest
+import numpy as np
+from acmpy.compat import NDArrayFloat
+from acmpy.cache_manager import CacheManager, CachePolicy, CacheInfo, ManagedCache, cache_manager
+from acmpy.radial_space import RepRadial, RepRadialshfs_Prod, RepRadial_Prod, Radial_b2
+from acmpy.globals import ACM_set_cache_policy
+
+
+@pytest.fixture
+def manager():
+    return CacheManager()
+
+
+def make_cache(manager: CacheManager) -> tuple[ManagedCache, list[int]]:
+    """Return a managed cache of a function that returns 100 floats, and the list of its evaluations."""
+    calls: list[int] = []
+
+    def f(i: int) -> NDArrayFloat:
+        calls.append(i)
+        return np.full(100, float(i))
+
+    return manager.cache(f), calls
+
+
+class TestManagedCache:
+    """Tests the ManagedCache class."""
+
+    def test_hits(self, manager):
+        f, calls = make_cache(manager)
+        assert f(1)[0] == 1.0
+        assert f(1)[0] == 1.0
+        assert f(2)[0] == 2.0
+        assert calls == [1, 2]
+        assert f.cache_info() == CacheInfo(1, 2, 0, 2, 1600, None)
+        assert f.__name__ == 'f'
+
+    def test_cache_clear(self, manager):
+        f, calls = make_cache(manager)
+        f(1)
+        f.cache_clear()
+        f(1)
+        assert calls == [1, 1]
+        assert f.cache_info().currsize == 1
+
+    def test_bounded(self, manager):
+        f, calls = make_cache(manager)
+        manager.set_policy(CachePolicy.BOUNDED, 2000)
+        f(1)
+        f(2)
+        f(1)
+        f(3)
+        assert f.cache_info() == CacheInfo(1, 3, 1, 2, 1600, 2000)
+        f(1)
+        f(2)
+        assert calls == [1, 2, 3, 2]
+
+    def test_context_key(self, manager):
+        setting: list[int] = [1]
+        calls: list[int] = []
+
+        @manager.cache_by(lambda: setting[0])
+        def f(i: int) -> int:
+            calls.append(i)
+            return i * setting[0]
+
+        assert f(2) == 2
+        setting[0] = 3
+        assert f(2) == 6
+        setting[0] = 1
+        assert f(2) == 2
+        assert calls == [2, 2]
+        assert manager.caches['f'] is f
+
+    def test_set_max_bytes(self, manager):
+        f, calls = make_cache(manager)
+        manager.set_policy('bounded')
+        f(1)
+        f(2)
+        manager.set_max_bytes('f', 800)
+        assert f.cache_info().currsize == 1
+        with pytest.raises(ValueError):
+            manager.set_max_bytes(f, -1)
+
+
+class TestCacheManager:
+    """Tests the CacheManager class."""
+
+    @pytest.mark.parametrize("policy,currsize", [
+        (CachePolicy.CLEAR_PER_CALL, 0),
+        (CachePolicy.KEEP_ACROSS_CALLS, 1),
+        (CachePolicy.BOUNDED, 1)
+    ])
+    def test_end_of_call(self, manager, policy, currsize):
+        f, _ = make_cache(manager)
+        manager.set_policy(policy)
+        f(1)
+        manager.end_of_call(f)
+        assert f.cache_info().currsize == currsize
+
+    def test_stats(self, manager):
+        f, _ = make_cache(manager)
+        f(1)
+        f(1)
+        assert manager.stats() == {'f': CacheInfo(1, 1, 0, 1, 800, None)}
+        assert manager.nbytes() == 800
+        manager.reset_stats()
+        manager.clear()
+        assert manager.stats() == {'f': CacheInfo(0, 0, 0, 0, 0, None)}
+
+
+class TestRepCaches:
+    """Tests the caches of the Rep* procedures."""
+
+    def test_pickle(self):
+        assert pickle.loads(pickle.dumps(RepRadial)) is RepRadial
+
+    def test_keep_across_calls(self, allclose):
+        try:
+            ACM_set_cache_policy(CachePolicy.KEEP_ACROSS_CALLS, show=0)
+            cache_manager.clear()
+            cache_manager.reset_stats()
+            M1: NDArrayFloat = RepRadial_Prod((Radial_b2, Radial_b2), 1.0, 2.5, 0, 0, 5, 0)
+            assert RepRadialshfs_Prod.cache_info().currsize > 0
+            M2: NDArrayFloat = RepRadial_Prod((Radial_b2, Radial_b2), 1.0, 2.5, 0, 0, 5, 0)
+            assert RepRadialshfs_Prod.cache_info().hits > 0
+            assert allclose(M1, M2)
+        finally:
+            ACM_set_cache_policy(show=0)
+            cache_manager.clear()
+
+        RepRadial_Prod((Radial_b2, Radial_b2), 1.0, 2.5, 0, 0, 5, 0)
+        assert RepRadialshfs_Prod.cache_info().currsize == 0
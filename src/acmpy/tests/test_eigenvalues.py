@@ -1,10 +1,14 @@
 """This module tests the eignevalues.py module."""
 import pytest
 import numpy as np
+import scipy.linalg as la
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
 from sympy import Matrix, shape
 from acmpy.compat import is_zeros, is_close, is_sorted, ABS_TOL, \
     Matrix_to_ndarray, ndarray_to_Matrix, list_to_ndarray, lists_to_ndarrays, NDArrayFloat
-from acmpy.eigenvalues import Eigenvectors, Eigenfiddle
+from acmpy.eigenvalues import Eigenvectors, Eigenfiddle, Eigenfiddle_lowest, EigenSession, EIGSH_MIN_DIM, \
+    Negative_count
 
 
 def is_solution(M: NDArrayFloat, vals: NDArrayFloat, P: NDArrayFloat, abs_tol: float = ABS_TOL) -> bool:
@@ -107,3 +111,142 @@ class TestEigenfiddle:
 
         expected_eigenvalues: list[float] = c11_010101[1]
         assert is_close(eigenvalues, expected_eigenvalues)
+
+
+@pytest.fixture
+def sparse_symmetric() -> sp.csr_matrix:
+    """Return a sparse symmetric matrix that is too large for LAPACK to be used."""
+    n: int = 2 * EIGSH_MIN_DIM
+    rng: np.random.Generator = np.random.default_rng(1)
+    A: sp.csr_matrix = sp.random(n, n, density=0.02, random_state=rng, format='csr')
+    return (A + A.T + sp.diags(np.arange(n, dtype=np.float64))).tocsr()
+
+
+class TestEigenfiddle_lowest:
+    """Tests the Eigenfiddle_lowest() function."""
+
+    @pytest.mark.parametrize("eig_num", [1, 3, 5])
+    def test_dense(self, eig_num, allclose):
+        M: NDArrayFloat = np.random.default_rng(2).uniform(-1, 1, (8, 8))
+        expected_values, expected_P = Eigenfiddle(M)
+
+        values, P = Eigenfiddle_lowest(M, eig_num)
+        assert P.shape == (8, eig_num)
+        assert allclose(values, expected_values[:eig_num])
+        assert allclose(np.abs(expected_P[:, :eig_num].T @ P), np.eye(eig_num))
+
+    @pytest.mark.parametrize("eig_num", [None, 2, 3])
+    def test_all(self, eig_num, c11_010101, allclose):
+        M: NDArrayFloat = list_to_ndarray(c11_010101[0])
+        values, P = Eigenfiddle_lowest(M, eig_num)
+        assert P.shape == (2, 2)
+        assert is_sorted_solution(M, values, P)
+
+    @pytest.mark.parametrize("eig_num", [1, 4])
+    def test_sparse(self, sparse_symmetric, eig_num, allclose):
+        expected_values, expected_P = Eigenfiddle(sparse_symmetric.toarray())
+
+        values, P = Eigenfiddle_lowest(sparse_symmetric, eig_num)
+        assert P.shape == (sparse_symmetric.shape[0], eig_num)
+        assert allclose(values, expected_values[:eig_num])
+        assert allclose(sparse_symmetric @ P, P * values)
+
+    def test_no_convergence(self, sparse_symmetric, monkeypatch, allclose):
+        # ARPACK does not converge within a single iteration
+        eigsh = spla.eigsh
+        monkeypatch.setattr(spla, 'eigsh', lambda *args, **kwargs: eigsh(*args, maxiter=1, **kwargs))
+        with pytest.raises(spla.ArpackNoConvergence):
+            spla.eigsh(sparse_symmetric, k=4, which='SA')
+
+        values, P = Eigenfiddle_lowest(sparse_symmetric, 4)
+        assert allclose(values, Eigenfiddle(sparse_symmetric.toarray())[0][:4])
+        assert allclose(sparse_symmetric @ P, P * values)
+
+    def test_small_sparse(self, c11_010101, allclose):
+        M: NDArrayFloat = list_to_ndarray(c11_010101[0])
+        values, P = Eigenfiddle_lowest(sp.csr_matrix(M), 1)
+        assert allclose(values, c11_010101[1][:1])
+
+    @pytest.mark.parametrize("M,eig_num", [(np.zeros((2, 3)), 1), (np.eye(2), 0)])
+    def test_bad(self, M, eig_num):
+        with pytest.raises(ValueError):
+            Eigenfiddle_lowest(M, eig_num)
+
+
+class TestNegative_count:
+    """Tests the Negative_count() function."""
+
+    @pytest.mark.parametrize("shift", [-10.0, 0.0, 0.5, 3.0])
+    def test_random(self, shift):
+        M: NDArrayFloat = np.random.default_rng(5).uniform(-1, 1, (12, 12))
+        M = M + M.T - shift * np.eye(12)
+        assert Negative_count(M) == np.count_nonzero(np.linalg.eigvalsh(M) < 0)
+
+    def test_2x2(self):
+        assert Negative_count(np.array([[0.0, 1.0], [1.0, 0.0]])) == 1
+        assert Negative_count(np.array([[0.0, 1.0], [1.0, -3.0]])) == 1
+
+
+class TestEigenSession:
+    """Tests the EigenSession class."""
+
+    @pytest.mark.parametrize("sparse", [False, True])
+    def test_warm_start(self, sparse_symmetric, sparse, allclose):
+        session: EigenSession = EigenSession(3)
+        perturbation: sp.dia_matrix = sp.diags(np.linspace(0, 0.01, sparse_symmetric.shape[0]))
+        for step in range(4):
+            H = sparse_symmetric + step * perturbation
+            if not sparse:
+                H = H.toarray()
+            values, P = session.solve(0, H)
+            expected_values, _ = Eigenfiddle(H.toarray() if sparse else H)
+            assert P.shape == (H.shape[0], 3)
+            assert allclose(values, expected_values[:3])
+            assert allclose(H @ P, P * values, atol=1e-6)
+
+        assert [stat.method for stat in session.stats] == ['eigh', 'lobpcg', 'lobpcg', 'lobpcg']
+        assert session.stats[0].iterations == 0
+        assert session.iterations > 0
+        assert session.count('lobpcg') == 3
+
+    def test_fallback(self, sparse_symmetric, allclose):
+        session: EigenSession = EigenSession(3, maxiter=1)
+        session.solve(0, sparse_symmetric)
+        H: sp.csr_matrix = sparse_symmetric + sp.diags(np.random.default_rng(3).uniform(-50, 50,
+                                                                                      sparse_symmetric.shape[0]))
+        values, P = session.solve(0, H)
+        assert session.stats[-1].method == 'fallback'
+        assert allclose(values, Eigenfiddle(H.toarray())[0][:3])
+
+    def test_level_crossing(self, allclose):
+        rng: np.random.Generator = np.random.default_rng(4)
+        A: NDArrayFloat = rng.uniform(-1, 1, (20, 20))
+        B: NDArrayFloat = rng.uniform(-1, 1, (20, 20))
+        A, B = 5 * (A + A.T), 5 * (B + B.T)
+
+        session: EigenSession = EigenSession(2)
+        for t in np.linspace(50, -20, 8):
+            # the blocks are not mixed by the iteration, so the levels of B are missed as they cross below those of A
+            H: NDArrayFloat = la.block_diag(A, B + t * np.eye(20))
+            values, P = session.solve(0, H)
+            assert allclose(values, Eigenfiddle(H)[0][:2])
+
+        assert session.count('fallback') > 0
+
+    def test_keys(self, sparse_symmetric, c11_010101):
+        session: EigenSession = EigenSession(3)
+        session.solve(0, sparse_symmetric)
+        session.solve(2, sparse_symmetric[:300, :300])
+        session.solve(0, sparse_symmetric[:300, :300])
+        session.solve(1, list_to_ndarray(c11_010101[0]))
+        session.solve(1, list_to_ndarray(c11_010101[0]))
+        assert [stat.method for stat in session.stats] == ['eigh'] * 5
+        assert session.bases[1].shape == (2, 2)
+
+        session.reset()
+        assert len(session.bases) == 0 and len(session.stats) == 0
+
+    @pytest.mark.parametrize("eig_num,tol,maxiter", [(0, 1e-8, 10), (2, 0, 10), (2, 1e-8, 0)])
+    def test_bad(self, eig_num, tol, maxiter):
+        with pytest.raises(ValueError):
+            EigenSession(eig_num, tol, maxiter)
@@ -4,13 +4,16 @@ import os.path
 import pytest
 import math
 import numpy as np
+import scipy.sparse as sp
 from pathlib import Path
-from sympy import shape
+from sympy import shape, S, Rational, sqrt, pi
 from acmpy.compat import NDArrayFloat, list_to_ndarray, is_nd_zeros
-from acmpy.internal_operators import OperatorSum, ACM_Hamiltonian
-from acmpy.full_operators import RepXspace, RepXspace_Prod
-from acmpy.radial_space import Radial_b, Radial_b2, Radial_bm2, Radial_D2b
-from acmpy.spherical_space import SpHarm_310
+from acmpy.internal_operators import OperatorSum, ACM_Hamiltonian, NUMBER, SENIORITY, ALFA, ANGMOM, \
+    Convert_red, RepSO5r3_Prod_rem
+from acmpy.full_operators import RepXspace, RepXspace_Prod, RepXspace_Twin, Xspace_coeff_fun, \
+    lbsXspace, lbsXspace_arrays
+from acmpy.radial_space import Radial_b, Radial_b2, Radial_bm2, Radial_D2b, RepRadial_Prod_rem
+from acmpy.spherical_space import SpHarm_310, SpDiag_sqLdim, lbsSO5r3_rngVvarL
 from acmpy.globals import ACM_set_basis_type, ACM_set_rat_lst, ACM_show_lambda_fun, ACM_eval_lambda_fun
 from acmpy.examples.section_4 import Example_4_1_ham, Example_4_5_c
 
@@ -119,6 +122,66 @@ class TestRepXspace:
 
         assert allclose(L_matrix, L_matrix_expected)
 
+    @pytest.mark.parametrize(
+        "basis_type", [basis_type for basis_type in range(4)]
+    )
+    def test_sparse(self, basis_type, allclose):
+        ACM_set_basis_type(basis_type, 0.0, 0)
+
+        ham: OperatorSum = ((S.One, (Radial_D2b,)),
+                            (SENIORITY + 1, (Radial_b2,)),
+                            (S(2), (Radial_bm2, SpDiag_sqLdim)),
+                            (S(3), ()))
+        dense: NDArrayFloat = RepXspace(ham, 1.5, 2.5, 0, 4, 0, 3, 0, 4)
+        sparse: sp.bsr_matrix = RepXspace(ham, 1.5, 2.5, 0, 4, 0, 3, 0, 4, sparse=True)
+
+        assert sp.isspmatrix_bsr(sparse)
+        assert sparse.blocksize == (5, 5)
+        assert allclose(sparse.toarray(), dense)
+
+
+class TestXspace_coeff_fun:
+    """Tests the Xspace_coeff_fun() function."""
+
+    @pytest.mark.parametrize("coeff", [
+        -3 * (2 + SENIORITY * (SENIORITY + 3)),
+        Rational(1, 2) * NUMBER + sqrt(ANGMOM + 1) / (SENIORITY + 1) ** 2,
+        ALFA * (-1) ** ANGMOM + pi,
+        2 + 0 * NUMBER
+    ])
+    def test_subs(self, coeff, allclose):
+        Xlabels = lbsXspace(0, 3, 0, 3, 0, 4)
+        expected = np.array([float(coeff.subs({NUMBER: nu, SENIORITY: v, ALFA: a, ANGMOM: L}))
+                             for (nu, v, a, L) in Xlabels])
+        values = Xspace_coeff_fun(coeff)(*lbsXspace_arrays(0, 3, 0, 3, 0, 4))
+        assert allclose(np.broadcast_to(values, expected.shape), expected)
+
+
+class TestRepXspace_Twin:
+    """Tests the RepXspace_Twin() function."""
+
+    @pytest.mark.parametrize(
+        "basis_type", [basis_type for basis_type in range(4)]
+    )
+    def test_blocks(self, fake_Y_212, basis_type, allclose):
+        ACM_set_basis_type(basis_type, 0.0, 0)
+        rad_ops = (Radial_b,)
+        sph_ops = ((2, 1, 2),)
+
+        sph_labels = lbsSO5r3_rngVvarL(0, 3, 0, 4)
+        sph_Mat = float(Convert_red) * RepSO5r3_Prod_rem(sph_ops, 0, 3, 0, 4)
+        expected = np.block([[sph_Mat[i2, j2] *
+                              RepRadial_Prod_rem(rad_ops, 1.5,
+                                                 2.5 + ACM_eval_lambda_fun(vj),
+                                                 ACM_eval_lambda_fun(vi) - ACM_eval_lambda_fun(vj),
+                                                 0, 3, 0)
+                              for j2, (vj, _, _) in enumerate(sph_labels)]
+                             for i2, (vi, _, _) in enumerate(sph_labels)])
+
+        assert allclose(RepXspace_Twin(rad_ops, sph_ops, 1.5, 2.5, 0, 3, 0, 3, 0, 4), expected)
+        assert allclose(RepXspace_Twin(rad_ops, sph_ops, 1.5, 2.5, 0, 3, 0, 3, 0, 4, sparse=True).toarray(),
+                        expected)
+
 
 RepXspace_Prod_cases = \
     [((Radial_D2b,), 'radial-d2b'),
@@ -4,14 +4,23 @@ import math
 from math import isclose
 import numpy as np
 import pytest
+from threadpoolctl import threadpool_info, threadpool_limits
 
 from sympy import Matrix, Expr, S, Rational, shape, sqrt
 
 from acmpy.compat import nonnegint, is_close, NDArrayFloat, ndarray_to_list
-from acmpy.full_space import Eigenfiddle, DigXspace, EigenValues, EigenBases, XParams, LValues, \
-    LBlockFullSpace, LBlockNDFloatArray, LBlocks, validate_Lvals
+from acmpy.full_space import Eigenfiddle, DigXspace, AmpXspeig, EigenValues, EigenBases, XParams, LValues, \
+    LBlockFullSpace, LBlockEigenSpace, LBlockNDFloatArray, LBlocks, validate_Lvals, ACM_eig_num, Designators_eig_num, \
+    ACM_Scale, ACM_Adapt, ACMResult, ACM_Result, Show_Result, SelectedMel, Select_Mels, Show_Mels
 from acmpy.internal_operators import OperatorSum, ACM_Hamiltonian
-from acmpy.globals import ACM_set_defaults
+from acmpy.eigenvalues import EigenSession
+from acmpy.radial_space import Radial_b
+from acmpy.full_operators import RepXspace
+from acmpy.spherical_space import SpHarm_212
+from acmpy.globals import ACM_set_defaults, ACM_set_basis_type, ACMContext, lambda_sho_fun
+import acmpy.globals as g
+from acmpy.parallel import fork_context
+import acmpy.full_space as full_space
 
 
 class TestEigenfiddle:
@@ -176,6 +185,312 @@ class TestDigXspace:
         assert is_close(eigenvalues0, expected_eigenvalues0, abs_tol=1e-6)
 
 
+class TestDigXspace_not_tame:
+    """Tests that DigXspace() cuts the representation on all the L values into the same blocks as the tame path."""
+
+    ham_op: OperatorSum = ACM_Hamiltonian(c11=-0.5, c21=1, c22=0.25, c23=0.5)
+
+    @pytest.mark.parametrize("L_min,L_max", [(0, 6), (2, 5), (1, 1)])
+    @pytest.mark.parametrize("sparse", [False, True])
+    def test_same_as_tame(self, L_min, L_max, sparse, monkeypatch, allclose):
+        eigen_vals, eigen_bases, Xparams, Lvals = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, L_min, L_max,
+                                                            sparse=sparse)
+        monkeypatch.setattr(full_space, 'Op_Tame', lambda _: False)
+        actual = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, L_min, L_max, sparse=sparse)
+
+        assert actual[3] == Lvals
+        for vals, actual_vals in zip(eigen_vals, actual[0]):
+            assert allclose(vals, actual_vals)
+
+
+class TestDigXspace_concurrent:
+    """Tests DigXspace() with the L spaces handled concurrently."""
+
+    ham_op: OperatorSum = ACM_Hamiltonian(c11=-0.5, c21=1, c22=0.25, c23=0.5)
+
+    @pytest.mark.parametrize("pool", ['thread', 'process'])
+    @pytest.mark.parametrize("tame", [True, False])
+    def test_same_as_serial(self, pool, tame, monkeypatch, allclose):
+        if not tame:
+            monkeypatch.setattr(full_space, 'Op_Tame', lambda _: False)
+        if pool == 'process' and fork_context() is None:
+            pytest.skip('fork is not available')
+
+        eigen_vals, eigen_bases, Xparams, Lvals = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 6)
+        actual = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 6, workers=3, pool=pool)
+
+        assert actual[2] == Xparams
+        assert actual[3] == Lvals
+        for vals, actual_vals in zip(eigen_vals, actual[0]):
+            assert allclose(vals, actual_vals)
+        for bases, actual_bases in zip(eigen_bases, actual[1]):
+            assert allclose(np.abs(bases.T @ actual_bases), np.eye(len(bases)), atol=1e-8)
+
+    @pytest.mark.parametrize("pool,tame", [('thread', True), ('process', True), ('thread', False)])
+    def test_blas_threads(self, pool, tame, monkeypatch):
+        if not tame:
+            monkeypatch.setattr(full_space, 'Op_Tame', lambda _: False)
+        if pool == 'process' and fork_context() is None:
+            pytest.skip('fork is not available')
+
+        # each diagonalisation checks the number of BLAS threads of its worker
+        Eigenfiddle_session = full_space.Eigenfiddle_session
+
+        def Eigenfiddle_session_checked(*args):
+            assert {info['num_threads'] for info in threadpool_info() if info['user_api'] == 'blas'} == {2}
+            return Eigenfiddle_session(*args)
+
+        monkeypatch.setattr(full_space, 'Eigenfiddle_session', Eigenfiddle_session_checked)
+        monkeypatch.setattr(full_space, 'blas_threads_per_worker', lambda _: 2)
+        with threadpool_limits(limits=3, user_api='blas'):
+            actual = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 6, workers=3, pool=pool)
+            assert {info['num_threads'] for info in threadpool_info() if info['user_api'] == 'blas'} == {3}
+        assert len(actual[0]) == len(actual[3]) == 6
+
+    def test_bad_pool(self):
+        with pytest.raises(ValueError):
+            DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 6, workers=2, pool='gpu')
+
+
+class TestACMContext:
+    """Tests DigXspace(), ACM_Scale() and ACM_Adapt() given an ACMContext."""
+
+    ham_op: OperatorSum = ACM_Hamiltonian(c11=-0.5, c21=1, c22=0.25, c23=0.5)
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_DigXspace(self, workers, allclose):
+        context: ACMContext = ACMContext(glb_lam_fun=lambda_sho_fun)
+        actual = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 6, workers=workers, context=context)
+        default = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 6)
+
+        ACM_set_basis_type(1, 0.0, 0)
+        try:
+            expected = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 6)
+        finally:
+            ACM_set_basis_type(2, 0.0, 0)
+
+        for vals, expected_vals, default_vals in zip(actual[0], expected[0], default[0]):
+            assert allclose(vals, expected_vals)
+            assert not np.allclose(vals, default_vals)
+
+    def test_ACM_Adapt(self, capsys):
+        ACM_set_defaults(0)
+        context: ACMContext = ACMContext(glb_eig_num=2, glb_eig_fit=1.0)
+        eigen_vals, trans, Lvals = ACM_Adapt(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 4, context=context)
+        output: str = capsys.readouterr().out
+
+        assert trans is None
+        assert context.glb_eig_sft == pytest.approx(eigen_vals[Lvals.index(2)][0] - min(v[0] for v in eigen_vals))
+        assert g.default_context.glb_eig_sft == 1.0
+        assert output.count('At L=') == len(Lvals)
+        assert all(line.count(',') == 1 for line in output.splitlines() if 'At L=' in line)
+
+        ACM_Scale(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 4, context=context)
+        assert capsys.readouterr().out == output
+
+
+class TestACM_Result:
+    """Tests the ACM_Result(), Show_Result() and Select_Mels() functions."""
+
+    ham_op: OperatorSum = ACM_Hamiltonian(c11=-0.5, c21=1, c22=0.25, c23=0.5)
+    tran_op: OperatorSum = ((S.One, (Radial_b, SpHarm_212)),)
+
+    @staticmethod
+    def shown_values(output: str) -> list[float]:
+        values: list[float] = []
+        for line in output.splitlines()[1:]:
+            if '[' in line:
+                values.extend(float(item) for item in line[line.index('[') + 1:line.index(']')].split(','))
+            else:
+                values.append(float(line.split()[-1]))
+        return values
+
+    @pytest.mark.parametrize("mel_lst", [
+        ((2, 0, 1, 1),),
+        ((2, 0, 1, 2), (4, 2, 2, 1)),
+        ((2, 0, 1, 1, 2),),
+        ((4, 2, 1, 1, -2),),
+        ((2, 2, 1),),
+        ((2, 2),),
+        ((2,),),
+        ((),),
+        ((-2, 0, 1, 1), (2, 0, 9, 1), (2, 0, 1, 1, 2, 9))
+    ])
+    def test_Select_Mels(self, fake_Y_212, mel_lst, capsys):
+        eigen_vals, eigen_bases, Xparams, Lvals = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 3, 0, 4)
+        trans: LBlockNDFloatArray = AmpXspeig(self.tran_op, eigen_bases, Xparams, Lvals)
+
+        selected: list[SelectedMel] = Select_Mels(trans, mel_lst, 3, g.glb_rat_fun)
+        Show_Mels(trans, mel_lst, 3, g.glb_rat_fun, 2.0)
+        output: str = capsys.readouterr().out.replace('  Bad matrix element specification: (2, 0, 1, 1, 2, 9)\n', '')
+
+        assert all(mel.designator in mel_lst for mel in selected)
+        assert [mel.value / 2.0 for mel in selected] == pytest.approx(self.shown_values(output),
+                                                                      abs=10 ** -g.glb_rel_pre)
+        for mel in selected:
+            assert mel.value == g.glb_rat_fun(mel.L1, mel.L2, trans.get_block(mel.L2, mel.L1)[mel.n2 - 1, mel.n1 - 1])
+
+    def test_ACM_Result(self, fake_Y_212, capsys):
+        context: ACMContext = ACMContext(glb_eig_num=2, glb_eig_fit=1.0, glb_rat_TRop=self.tran_op,
+                                         glb_rat_num=2, glb_amp_num=2, glb_rat_1dx=2,
+                                         glb_rat_lst=((2, 0, 2, 1), (4, 2)), glb_amp_lst=((2, 2, 1, 1),))
+        result: ACMResult = ACM_Result(1, 1, self.ham_op, 1.5, 2.5, 0, 3, 0, 3, 0, 4, context=context)
+        assert capsys.readouterr().out == ''
+
+        assert result.Lvals == [0, 2, 3, 4]
+        assert result.eig_sft == context.glb_eig_sft
+        assert result.rat_sft == context.glb_rat_sft
+        assert result.amp_sft == context.glb_amp_sft == math.sqrt(result.rat_sft)
+        assert [mel[:5] for mel in result.rates] == [((2, 0, 2, 1), 2, 0, 2, 1),
+                                                     ((4, 2), 4, 2, 1, 1), ((4, 2), 4, 2, 2, 1),
+                                                     ((4, 2), 4, 2, 1, 2), ((4, 2), 4, 2, 2, 2)]
+        assert result.rates[0].value / result.rat_sft == pytest.approx(context.glb_rat_fit)
+        assert [mel[:5] for mel in result.amps] == [((2, 2, 1, 1), 2, 2, 1, 1)]
+
+        Show_Result(result, context)
+        output: str = capsys.readouterr().out
+        assert output.count('At L=') == len(result.Lvals)
+
+        assert ACM_Adapt(self.ham_op, 1.5, 2.5, 0, 3, 0, 3, 0, 4, context=context, quiet=True)[2] == result.Lvals
+        assert capsys.readouterr().out == ''
+
+        ACM_Adapt(self.ham_op, 1.5, 2.5, 0, 3, 0, 3, 0, 4, context=context)
+        assert capsys.readouterr().out == output
+
+    def test_Show_Result_scale(self, capsys):
+        context: ACMContext = ACMContext(glb_eig_num=2)
+        result: ACMResult = ACM_Result(0, 0, self.ham_op, 1.5, 2.5, 0, 3, 0, 3, 0, 4, context=context)
+        Show_Result(result._replace(eig_sft=2.0), context)
+        output: str = capsys.readouterr().out
+
+        assert result.Melements is None and result.rates == [] and result.amps == []
+        assert 'divided by 2.000' in output
+        assert context.glb_eig_sft == 1.0
+
+
+class TestDigXspace_partial:
+    """Tests DigXspace() and AmpXspeig() with only the lowest eigenvalues obtained."""
+
+    ham_op: OperatorSum = ACM_Hamiltonian(c11=-0.5, c21=1, c22=0.25, c23=0.5)
+
+    @pytest.mark.parametrize("sparse", [False, True])
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_lowest(self, sparse, workers, allclose):
+        eigen_vals, eigen_bases, Xparams, Lvals = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 4)
+        actual = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 4, workers=workers, eig_num=3, sparse=sparse)
+
+        assert actual[3] == Lvals
+        for vals, bases, actual_vals, actual_bases in zip(eigen_vals, eigen_bases, actual[0], actual[1]):
+            k: int = min(3, len(vals))
+            assert actual_bases.shape == (len(vals), k)
+            assert allclose(actual_vals, vals[:k])
+            assert allclose(np.abs(bases[:, :k].T @ actual_bases), np.eye(k), atol=1e-8)
+
+    def test_bad_eig_num(self):
+        with pytest.raises(ValueError):
+            DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 4, eig_num=0)
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_session(self, workers, allclose):
+        session: EigenSession = EigenSession(2)
+        for c21 in [1.0, 1.01]:
+            ham_op: OperatorSum = ACM_Hamiltonian(c11=-0.5, c21=c21, c22=0.25, c23=0.5)
+            eigen_vals = DigXspace(ham_op, 1.5, 2.5, 0, 12, 0, 4, 0, 4)[0]
+            actual = DigXspace(ham_op, 1.5, 2.5, 0, 12, 0, 4, 0, 4, workers=workers, session=session)
+            for vals, actual_vals in zip(eigen_vals, actual[0]):
+                assert allclose(actual_vals, vals[:2])
+
+        assert sorted(session.bases) == [0, 2, 3, 4]
+        assert session.count('lobpcg') == 4
+
+    def test_session_process_pool(self):
+        with pytest.raises(ValueError):
+            DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 4, 0, 4, workers=2, pool='process', session=EigenSession(2))
+
+    def test_AmpXspeig(self, fake_Y_212, allclose):
+        tran_op: OperatorSum = ((S.One, (Radial_b, SpHarm_212)),)
+        eigen_vals, eigen_bases, Xparams, Lvals = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 3, 0, 4)
+        partial = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 3, 0, 4, eig_num=2)
+
+        trans: LBlockNDFloatArray = AmpXspeig(tran_op, eigen_bases, Xparams, Lvals)
+        actual: LBlockNDFloatArray = AmpXspeig(tran_op, partial[1], Xparams, Lvals)
+        assert isinstance(actual.full_space, LBlockEigenSpace)
+
+        for L_row in Lvals:
+            for L_col in Lvals:
+                block: NDArrayFloat = actual.get_block(L_row, L_col)
+                assert block.shape == (2, 2)
+                assert allclose(np.abs(block), np.abs(trans.get_block(L_row, L_col)[:2, :2]), atol=1e-8)
+
+
+class TestAmpXspeig:
+    """Tests the AmpXspeig() function."""
+
+    ham_op: OperatorSum = ACM_Hamiltonian(c11=-0.5, c21=1, c22=0.25, c23=0.5)
+    tran_op: OperatorSum = ((S.One, (Radial_b, SpHarm_212)),)
+
+    @pytest.mark.parametrize("tran_AM", [None, 2])
+    @pytest.mark.parametrize("eig_num", [None, 3])
+    def test_ok(self, fake_Y_212, tran_AM, eig_num, allclose):
+        eigen_vals, eigen_bases, Xparams, Lvals = DigXspace(self.ham_op, 1.5, 2.5, 0, 3, 0, 3, 0, 6)
+        tran_mat: NDArrayFloat = RepXspace(self.tran_op, 1.5, 2.5, 0, 3, 0, 3, 0, 6)
+        full: LBlockFullSpace = LBlockFullSpace(0, 3, 0, 3, Lvals)
+
+        actual: LBlockNDFloatArray = AmpXspeig(self.tran_op, eigen_bases, Xparams, Lvals, tran_AM, eig_num)
+        for P_row, L_row in zip(eigen_bases, Lvals):
+            for P_col, L_col in zip(eigen_bases, Lvals):
+                r0, r1 = full.get_block_for_L(L_row)
+                c0, c1 = full.get_block_for_L(L_col)
+                expected: NDArrayFloat = np.linalg.inv(P_row) @ tran_mat[r0:r1, c0:c1] @ P_col
+                if eig_num is not None:
+                    expected = expected[:eig_num, :eig_num]
+                assert allclose(actual.get_block(L_row, L_col), expected, atol=1e-10)
+
+    def test_skipped(self, allclose):
+        ham_op: OperatorSum = ACM_Hamiltonian(c11=-0.5, c21=1)
+        eigen_vals, eigen_bases, Xparams, Lvals = DigXspace(ham_op, 1.5, 2.5, 0, 2, 0, 3, 0, 4)
+        actual: LBlockNDFloatArray = AmpXspeig(ham_op, eigen_bases, Xparams, Lvals, 0)
+        assert np.all(actual.get_block(0, 2) == 0)
+        assert allclose(actual.get_block(2, 2), np.diag(eigen_vals[1]))
+
+    def test_bad_bases(self):
+        eigen_vals, eigen_bases, Xparams, Lvals = DigXspace(self.ham_op, 1.5, 2.5, 0, 2, 0, 3, 0, 4)
+        with pytest.raises(ValueError):
+            AmpXspeig(self.ham_op, eigen_bases[1:], Xparams, Lvals)
+
+
+class TestACM_eig_num:
+    """Tests the ACM_eig_num() and Designators_eig_num() functions."""
+
+    @pytest.mark.parametrize("mel_lst,toshow,expected", [
+        ((), 4, 0),
+        (((2, 0, 1, 3),), 4, 3),
+        (((2, 0, 5, 1, 2),), 4, 5),
+        (((2, 0, 6),), 4, 6),
+        (((2, 0, 1),), 4, 4),
+        (((2, 0),), 5, 5),
+        (((2,), ()), 3, 3),
+        (((2, 0, 1, 1, 2, 9),), 4, 0)
+    ])
+    def test_designators(self, mel_lst, toshow, expected):
+        assert Designators_eig_num(mel_lst, toshow) == expected
+
+    def test_acm(self, monkeypatch):
+        monkeypatch.setattr(g.default_context, 'glb_eig_num', 3)
+        monkeypatch.setattr(g.default_context, 'glb_eig_idx', 5)
+        monkeypatch.setattr(g.default_context, 'glb_rat_lst', ((2, 0, 1, 2),))
+        monkeypatch.setattr(g.default_context, 'glb_amp_lst', ())
+        monkeypatch.setattr(g.default_context, 'glb_rat_1dx', 1)
+        monkeypatch.setattr(g.default_context, 'glb_rat_2dx', 7)
+        assert ACM_eig_num() == 3
+        assert ACM_eig_num(1, 0) == 5
+        assert ACM_eig_num(1, 1) == 7
+
+        monkeypatch.setattr(g.default_context, 'glb_eig_num', 0)
+        monkeypatch.setattr(g.default_context, 'glb_rat_lst', ())
+        assert ACM_eig_num(1, 1) == 1
+
+
 class TestLBlockFullSpace:
     """Tests the LBlockFullSpace class."""
 
@@ -1,7 +1,13 @@
 """This module tests the globals.py module."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
-from acmpy.globals import ACM_version, ACM_set_basis_type, ACM_show_lambda_fun
+import acmpy.acm1_4
+import acmpy.globals as g
+from acmpy.globals import ACM_version, ACM_set_basis_type, ACM_show_lambda_fun, ACM_set_listln, ACM_set_rat_lst, \
+    ACMContext, current_context, default_context, use_context, lambda_fix_fun, lambda_sho_fun
 
 
 class TestACMVersion:
@@ -25,4 +31,68 @@ class TestACM_show_lambda_fun:
     def test_ok(self, basis_type, expected):
         ACM_set_basis_type(basis_type, 0.0, 0)
         lambda_v = ACM_show_lambda_fun()
-        assert all(x == y for (x, y) in zip(lambda_v, expected))
\ No newline at end of file
+        assert all(x == y for (x, y) in zip(lambda_v, expected))
+
+
+class TestACMContext:
+    """Tests ACMContext, use_context() and the ACM_set_ procedures acting on the current context."""
+
+    def test_default(self):
+        assert current_context() is default_context
+        assert g.glb_eig_num == default_context.glb_eig_num
+
+    def test_use_context(self):
+        saved: tuple = default_context.glb_eig_num, default_context.glb_rat_lst
+        context: ACMContext = ACMContext()
+        with use_context(context) as current:
+            assert current is context
+            ACM_set_listln(7, 2, 0)
+            ACM_set_rat_lst(((2, 0, 1, 1),))
+            assert g.glb_eig_num == 7
+            with use_context(None) as kept:
+                assert kept is context
+
+        assert (context.glb_eig_num, context.glb_rat_num, context.glb_rat_lst) == (7, 2, ((2, 0, 1, 1),))
+        assert (default_context.glb_eig_num, default_context.glb_rat_lst) == saved
+        assert current_context() is default_context
+
+    def test_write(self):
+        context: ACMContext = ACMContext()
+        with use_context(context):
+            g.glb_eig_num = 9
+            assert g.glb_eig_num == 9
+
+        assert context.glb_eig_num == 9
+        assert 'glb_eig_num' not in vars(g)
+        assert g.glb_eig_num == default_context.glb_eig_num
+
+    def test_export(self):
+        assert 'glb_eig_num' in g.__all__ and 'glb_eig_num' in dir(g)
+        assert 'ACM_set_defaults' in g.__all__ and 'current_context' in g.__all__
+        assert acmpy.acm1_4.glb_rat_TRop is default_context.glb_rat_TRop
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError):
+            _ = g.glb_unknown
+
+    def test_threads(self):
+        def show(lambda_fun) -> tuple[int, ...]:
+            with use_context(ACMContext(glb_lam_fun=lambda_fun)):
+                return ACM_show_lambda_fun(0, 4)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(show, [lambda_fix_fun, lambda_sho_fun] * 4))
+
+        assert results == [(0, 0, 0, 0, 0), (0, 1, 2, 3, 4)] * 4
+
+    def test_tasks(self):
+        async def show(eig_num: int) -> int:
+            with use_context(ACMContext()):
+                ACM_set_listln(eig_num, None, 0)
+                await asyncio.sleep(0)
+                return g.glb_eig_num
+
+        async def main() -> list[int]:
+            return list(await asyncio.gather(*(show(eig_num) for eig_num in range(1, 6))))
+
+        assert asyncio.run(main()) == [1, 2, 3, 4, 5]
@@ -2,7 +2,9 @@
 
 import pytest
 from math import isclose
-from acmpy.hamiltonian_data import RWC_alam, RWC_alam_clam, A0_case1, A0_case2_approx, A0_case3_approx
+from acmpy.hamiltonian_data import RWC_alam, RWC_alam_clam, A0_case1, A0_case2_approx, A0_case3_approx, \
+    RWC_Ham, RWC_Ham_coeffs
+from acmpy.internal_operators import ACM_Hamiltonian
 
 
 class TestRWC_alam:
@@ -227,4 +229,16 @@ class TestA0_case3_approx:
     )
     def test_ok(self, B, expected):
         A0: float = A0_case3_approx(B, -3.0, 2.0, 0)
-        assert isclose(A0, expected)
\ No newline at end of file
+        assert isclose(A0, expected)
+
+
+class TestRWC_Ham_coeffs:
+    """Tests the function RWC_Ham_coeffs()."""
+
+    def test_ok(self):
+        B, c1, c2, chi, kappa = 3, 1.5, -0.5, 0.75, 2
+        ham = ACM_Hamiltonian(**RWC_Ham_coeffs(B, c1, c2, chi, kappa))
+        expected = RWC_Ham(B, c1, c2, chi, kappa)
+        assert [ops for _, ops in ham] == [ops for _, ops in expected]
+        for (coeff, _), (expected_coeff, _) in zip(ham, expected):
+            assert float(coeff - expected_coeff) == pytest.approx(0, abs=1e-12)
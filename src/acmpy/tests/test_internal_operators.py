@@ -1,8 +1,12 @@
 """Tests the internal_operators.py module."""
 
+import pytest
 import numpy as np
-from acmpy.internal_operators import RepSO5r3_Prod_rem, SpHarm_310
+from acmpy.internal_operators import RepSO5r3_Prod_rem, RepSO5_Y_rem, RepSO5_sqLdim, ME_SO5r3, SpHarm_310
+from acmpy.spherical_space import SpHarm_212, SpDiag_sqLdim
 from acmpy.compat import Matrix_to_ndarray
+from acmpy.spherical_space import lbsSO5r3_rngVvarL
+from acmpy.spherical_store import spherical_store
 
 
 class TestRepSO5r3_Prod_rem:
@@ -13,3 +17,23 @@ class TestRepSO5r3_Prod_rem:
         expected = np.array([[0.,1.732050807],
                              [1.732050808,0.]])
         assert allclose(rep, expected)
+
+
+class TestRepSO5_Y_rem:
+    """Tests the RepSO5_Y_rem() function."""
+
+    @pytest.mark.parametrize('v_min,v_max,L_min,L_max', [(0, 3, 0, 6), (1, 3, 2, 2), (0, 2, 0, 0)])
+    def test_elementwise(self, fake_Y_212, v_min, v_max, L_min, L_max, allclose):
+        states = lbsSO5r3_rngVvarL(v_min, v_max, L_min, L_max)
+        expected = np.array([[float(ME_SO5r3(*i, 2, 1, 2, *j)) for j in states] for i in states])
+        assert allclose(RepSO5_Y_rem(2, 1, 2, v_min, v_max, L_min, L_max), expected)
+
+
+class TestRepSO5r3_Prod_rem_prefix:
+    """Tests that RepSO5r3_Prod_rem() shares the products of common prefixes."""
+
+    def test_prefix(self, fake_Y_212, allclose):
+        Y = RepSO5_Y_rem(2, 1, 2, 0, 3, 0, 4)
+        assert allclose(RepSO5r3_Prod_rem((SpHarm_212, SpDiag_sqLdim, SpHarm_212), 0, 3, 0, 4),
+                        Y @ RepSO5_sqLdim(0, 3, 0, 4) @ Y)
+        assert spherical_store.get(('Prod', (SpHarm_212, SpDiag_sqLdim)), (0, 3, 0, 4)) is not None
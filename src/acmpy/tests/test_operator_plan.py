@@ -0,0 +1,141 @@
+"""This module tests the operator_plan.py module."""
+
+import pytest
+import scipy.sparse as sp
+from sympy import S
+from acmpy.internal_operators import OperatorSum, NUMBER, SENIORITY, ANGMOM, Xspace_Pi, Xspace_PiqPi
+from acmpy.full_operators import RepXspace
+from acmpy.radial_space import Radial_b, Radial_b2, Radial_bm2, Radial_D2b
+from acmpy.spherical_space import SpDiag_sqLdim, SpHarm_212
+from acmpy.globals import ACM_set_basis_type
+from acmpy.operator_plan import OperatorPlan, Split_Xspace_Prod
+import acmpy.operator_plan as operator_plan
+
+
+class TestSplit_Xspace_Prod:
+    """Tests the Split_Xspace_Prod() function."""
+
+    @pytest.mark.parametrize("x_ops,expected", [
+        ((), (((), ()),)),
+        ((Radial_b2, SpDiag_sqLdim, Radial_bm2), (((Radial_b2, Radial_bm2), (SpDiag_sqLdim,)),)),
+        ((Radial_b, Xspace_Pi, SpDiag_sqLdim), (((Radial_b,), ()), Xspace_Pi, ((), (SpDiag_sqLdim,)))),
+        ((Xspace_PiqPi,), (Xspace_PiqPi,))
+    ])
+    def test_split(self, x_ops, expected):
+        assert Split_Xspace_Prod(x_ops) == expected
+
+
+class TestOperatorPlan:
+    """Tests that OperatorPlan.evaluate() agrees with RepXspace()."""
+
+    @pytest.mark.parametrize("basis_type", range(4))
+    def test_radial(self, basis_type, allclose):
+        ACM_set_basis_type(basis_type, 0.0, 0)
+        ham: OperatorSum = ((S.One, (Radial_D2b,)),
+                            (SENIORITY + 1, (Radial_b2,)),
+                            (S(2), (Radial_bm2, SpDiag_sqLdim)),
+                            (S(3), ()))
+        plan: OperatorPlan = OperatorPlan(ham, 0, 4, 0, 3, 0, 4)
+
+        for anorm, lambda_base in [(1.5, 2.5), (1.0, 3.5)]:
+            expected = RepXspace(ham, anorm, lambda_base, 0, 4, 0, 3, 0, 4)
+            assert allclose(plan.evaluate(anorm, lambda_base), expected)
+
+            sparse: sp.bsr_matrix = plan.evaluate(anorm, lambda_base, sparse=True)
+            assert sp.isspmatrix_bsr(sparse)
+            assert sparse.blocksize == (5, 5)
+            assert allclose(sparse.toarray(), expected)
+
+    @pytest.mark.parametrize("basis_type", range(4))
+    def test_spherical(self, fake_Y_212, basis_type, allclose):
+        ACM_set_basis_type(basis_type, 0.0, 0)
+        ham: OperatorSum = ((S(-2), (Radial_b, SpHarm_212)),
+                            (NUMBER + ANGMOM, (Radial_b, SpHarm_212, SpHarm_212)),
+                            (S.Half, (Radial_b2, Radial_b, SpHarm_212)),
+                            (S.One, (SpHarm_212, SpHarm_212)))
+        plan: OperatorPlan = OperatorPlan(ham, 0, 3, 0, 3, 0, 4)
+        assert len(plan.twins) == 4
+
+        expected = RepXspace(ham, 1.5, 2.5, 0, 3, 0, 3, 0, 4)
+        assert allclose(plan.evaluate(1.5, 2.5), expected)
+        assert allclose(plan.evaluate(1.5, 2.5, sparse=True).toarray(), expected)
+
+    def test_lambda_fun(self, allclose):
+        ham: OperatorSum = ((S.One, (Radial_b2, SpDiag_sqLdim)),)
+        ACM_set_basis_type(0, 0.0, 0)
+        plan: OperatorPlan = OperatorPlan(ham, 0, 3, 0, 3, 0, 2)
+        plan.evaluate(1.0, 2.5)
+
+        ACM_set_basis_type(2, 0.0, 0)
+        assert allclose(plan.evaluate(1.0, 2.5), RepXspace(ham, 1.0, 2.5, 0, 3, 0, 3, 0, 2))
+
+    def test_nonpositive_lambda(self):
+        ACM_set_basis_type(0, 0.0, 0)
+        plan: OperatorPlan = OperatorPlan(((S.One, (Radial_b2,)),), 0, 2, 0, 1, 0)
+        with pytest.raises(ValueError):
+            plan.evaluate(1.0, -0.5)
+
+
+class TestOperatorPlan_grow:
+    """Tests that the grown OperatorPlan agrees with RepXspace() on the larger truncation."""
+
+    @pytest.mark.parametrize("nu_max,v_max,L_max", [
+        (6, 2, 4),
+        (4, 3, 4),
+        (4, 2, 6),
+        (6, 3, 6)
+    ])
+    def test_grow(self, fake_Y_212, nu_max, v_max, L_max, allclose):
+        ACM_set_basis_type(0, 0.0, 0)
+        ham: OperatorSum = ((S.One, (Radial_D2b,)),
+                            (SENIORITY + 1, (Radial_b2,)),
+                            (S(-2), (Radial_b, SpHarm_212)),
+                            (S.Half, (Radial_b2, Radial_b, SpHarm_212)))
+        plan: OperatorPlan = OperatorPlan(ham, 0, 4, 0, 2, 0, 4)
+        plan.evaluate(1.5, 2.5)
+
+        grown: OperatorPlan = plan.grow(nu_max, v_max, L_max)
+        assert allclose(grown.evaluate(1.5, 2.5), RepXspace(ham, 1.5, 2.5, 0, nu_max, 0, v_max, 0, L_max))
+        assert allclose(plan.evaluate(1.5, 2.5), RepXspace(ham, 1.5, 2.5, 0, 4, 0, 2, 0, 4))
+
+    def test_reuse(self, fake_Y_212):
+        ham: OperatorSum = ((S.One, (Radial_b, SpHarm_212)),)
+        plan: OperatorPlan = OperatorPlan(ham, 0, 4, 0, 2, 0, 4)
+        plan.evaluate(1.5, 2.5)
+
+        nu_grown: OperatorPlan = plan.grow(nu_max=6)
+        for factor, twin in plan.twins.items():
+            assert nu_grown.twins[factor] is not twin
+            assert nu_grown.twins[factor].values is twin.values
+
+        v_grown: OperatorPlan = plan.grow(v_max=3)
+        for factor, twin in plan.twins.items():
+            assert v_grown.twins[factor] is not twin
+            assert v_grown.twins[factor].radial_Mats.keys() == twin.radial_Mats.keys()
+
+    @pytest.mark.parametrize("nu_first", [False, True])
+    def test_radial_count(self, fake_Y_212, nu_first, monkeypatch):
+        ACM_set_basis_type(1, 0.0, 0)
+        ham: OperatorSum = ((S.One, (Radial_b, SpHarm_212)), (S.Half, (Radial_b2, Radial_b, SpHarm_212)))
+        plan: OperatorPlan = OperatorPlan(ham, 0, 4, 0, 2, 0, 4)
+        plan.evaluate(1.5, 2.5)
+        if nu_first:
+            plan.grow(nu_max=6).evaluate(1.5, 2.5)
+
+        # whether or not a nu growth was evaluated, the v growth only forms the radial matrices of its new lambdas
+        calls: list[tuple] = []
+        RepRadialshfs_Prod = operator_plan.RepRadialshfs_Prod
+
+        def RepRadialshfs_Prod_counted(*args):
+            calls.append(args)
+            return RepRadialshfs_Prod(*args)
+
+        monkeypatch.setattr(operator_plan, 'RepRadialshfs_Prod', RepRadialshfs_Prod_counted)
+        plan.grow(v_max=3).evaluate(1.5, 2.5)
+        assert all(args[-2:] == (0, 4) for args in calls)
+        assert len(calls) == 6
+
+    def test_shrink(self):
+        plan: OperatorPlan = OperatorPlan(((S.One, (Radial_b2,)),), 0, 4, 0, 3, 0, 4)
+        with pytest.raises(ValueError):
+            plan.grow(nu_max=2)
@@ -0,0 +1,59 @@
+"""This module tests the parallel.py module."""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from threadpoolctl import threadpool_info, threadpool_limits
+from acmpy.parallel import worker_count, blas_threads_per_worker, blas_threads, available_cores, fork_context, \
+    init_worker
+
+
+def blas_thread_counts() -> list[int]:
+    """Return the numbers of threads of the BLAS libraries loaded by this process, e.g. that of NumPy."""
+    np.dot(np.ones((2, 2)), np.ones((2, 2)))
+    return [info['num_threads'] for info in threadpool_info() if info['user_api'] == 'blas']
+
+
+class TestWorkers:
+    """Tests the worker counts."""
+
+    @pytest.mark.parametrize("max_workers,tasks,expected", [(4, 10, 4), (4, 2, 2), (3, 0, 1)])
+    def test_worker_count(self, max_workers, tasks, expected):
+        assert worker_count(max_workers, tasks) == expected
+
+    def test_default(self):
+        assert worker_count(None, 1000) == available_cores()
+        with pytest.raises(ValueError):
+            worker_count(0, 10)
+
+    def test_blas_threads_per_worker(self):
+        assert blas_threads_per_worker(1) == available_cores()
+        assert blas_threads_per_worker(10 * available_cores()) == 1
+
+
+class TestBlasThreads:
+    """Tests the blas_threads() context manager and init_worker()."""
+
+    def test_limit(self):
+        with threadpool_limits(limits=3, user_api='blas'):
+            assert set(blas_thread_counts()) == {3}
+            with blas_threads(2):
+                assert set(blas_thread_counts()) == {2}
+            assert set(blas_thread_counts()) == {3}
+
+    def test_init_worker(self):
+        context = fork_context()
+        if context is None:
+            pytest.skip('The fork start method is not available.')
+
+        # the BLAS library of a forked worker is already loaded by the parent
+        with threadpool_limits(limits=3, user_api='blas'), \
+                ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=init_worker,
+                                    initargs=(2,)) as executor:
+            assert set(executor.submit(blas_thread_counts).result()) == {2}
+
+    def test_bad(self):
+        with pytest.raises(ValueError):
+            with blas_threads(0):
+                pass
@@ -0,0 +1,96 @@
+"""This module tests the parameter_scan.py module."""
+
+import pytest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from sympy import S
+from acmpy.internal_operators import ACM_Hamiltonian
+from acmpy.radial_space import Radial_b2
+from acmpy.full_space import DigXspace
+from acmpy.parameter_scan import ACM_Scan, scan_points
+import acmpy.globals as g
+
+
+def radial_ham(c21: float, c22: float):
+    return ACM_Hamiltonian(c11=-0.5, c21=c21, c22=c22)
+
+
+grid = {'c21': [0.5, 1.0, 1.5], 'c22': [0.0, 0.25], 'anorm': [1.0, 1.5]}
+
+
+class TestScanPoints:
+    """Tests the scan_points() function."""
+
+    def test_ok(self):
+        points = scan_points({'a': [1, 2], 'b': [3.0, 4.0, 5.0]})
+        assert len(points) == 6
+        assert points[0] == {'a': 1, 'b': 3.0}
+        assert points[1] == {'a': 1, 'b': 4.0}
+
+
+class TestACM_Scan:
+    """Tests the ACM_Scan() function."""
+
+    @pytest.mark.parametrize("max_workers", [1, 3])
+    def test_eigenvalues(self, max_workers, allclose):
+        result = ACM_Scan(radial_ham, grid, 0, 4, 0, 2, 0, 2, lambda_base=2.5, eig_num=3, rat_lst=(),
+                          max_workers=max_workers)
+        assert result.Lvals == [0, 2]
+        assert result.data.shape == (12,)
+        assert result.data['eigenvalues'].shape == (12, 2, 3)
+
+        for row in result.data:
+            eigen_vals, _, _, _ = DigXspace(radial_ham(row['c21'], row['c22']), row['anorm'], 2.5, 0, 4, 0, 2, 0, 2)
+            for L_index, vals in enumerate(eigen_vals):
+                assert allclose(row['eigenvalues'][L_index], vals[:3])
+
+    def test_padding(self):
+        result = ACM_Scan(ACM_Hamiltonian(c11=-0.5, c21=1), {'anorm': [1.0]}, 0, 1, 0, 2, 0, 2,
+                          lambda_base=2.5, eig_num=4, rat_lst=())
+        assert np.isnan(result.data['eigenvalues'][0, 0, 2:]).all()
+        assert not np.isnan(result.data['eigenvalues'][0, 1]).any()
+
+    def test_rates(self, monkeypatch, allclose):
+        monkeypatch.setattr(g.default_context, 'glb_rat_TRop', ((S.One, (Radial_b2,)),))
+        monkeypatch.setattr(g.default_context, 'glb_rat_fun', lambda L1, L2, mel: mel ** 2)
+        rat_lst = ((0, 0, 1, 2), (2, 2, 1, 1), (2, 2, 1, 11))
+        serial = ACM_Scan(radial_ham, grid, 0, 4, 0, 2, 0, 2, lambda_base=2.5, eig_num=2, rat_lst=rat_lst,
+                          max_workers=1)
+        parallel = ACM_Scan(radial_ham, grid, 0, 4, 0, 2, 0, 2, lambda_base=2.5, eig_num=2, rat_lst=rat_lst,
+                            max_workers=2)
+        assert np.isnan(serial.data['rates'][:, 2]).all()
+        assert not np.isnan(serial.data['rates'][:, :2]).any()
+        assert allclose(serial.data['rates'][:, :2], parallel.data['rates'][:, :2])
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_warm_start(self, max_workers, allclose):
+        scan_grid = {'c22': [0.25], 'c21': np.linspace(1.0, 1.1, 6)}
+        cold = ACM_Scan(radial_ham, scan_grid, 0, 12, 0, 4, 0, 4, anorm=1.5, lambda_base=2.5, eig_num=2, rat_lst=())
+        warm = ACM_Scan(radial_ham, scan_grid, 0, 12, 0, 4, 0, 4, anorm=1.5, lambda_base=2.5, eig_num=2, rat_lst=(),
+                        max_workers=max_workers, warm_start=True)
+        assert 'iterations' not in cold.data.dtype.names
+        assert allclose(warm.data['eigenvalues'], cold.data['eigenvalues'])
+        assert warm.data['iterations'][0] == 0
+        assert (warm.data['iterations'][1:] > 0).all()
+
+    def test_threads(self, allclose):
+        def scan(c22: float):
+            return ACM_Scan(lambda c21: radial_ham(c21, c22), {'c21': [0.5, 1.0, 1.5, 2.0]}, 0, 4, 0, 2, 0, 2,
+                            anorm=1.0, lambda_base=2.5, eig_num=2, rat_lst=(), max_workers=2)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(scan, [0.0, 0.5]))
+
+        for c22, result in zip([0.0, 0.5], results):
+            for row in result.data:
+                eigen_vals, _, _, _ = DigXspace(radial_ham(row['c21'], c22), 1.0, 2.5, 0, 4, 0, 2, 0, 2)
+                for L_index, vals in enumerate(eigen_vals):
+                    assert allclose(row['eigenvalues'][L_index], vals[:2])
+
+    def test_bad_args(self):
+        with pytest.raises(ValueError):
+            ACM_Scan(radial_ham, {'c21': [1.0], 'c22': [0.0]}, 0, 4, 0, 2, 0, lambda_base=2.5, rat_lst=())
+        with pytest.raises(ValueError):
+            ACM_Scan(ACM_Hamiltonian(c21=1), {'c21': [1.0]}, 0, 4, 0, 2, 0, anorm=1.0, lambda_base=2.5)
+        with pytest.raises(ValueError):
+            ACM_Scan(radial_ham, grid, 0, 4, 0, 2, 0, lambda_base=2.5, rat_lst=((2, 0),))
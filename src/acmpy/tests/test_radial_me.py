@@ -5,7 +5,8 @@ from sympy import sqrt, Rational, Expr, S, simplify
 from acmpy.radial_space import Nu, ME_Radial_S0, ME_Radial_Sp, ME_Radial_Sm, \
     ME_Radial_b2, ME_Radial_bm2, ME_Radial_pt, ME_Radial_D2b, ME_Radial_bDb, \
     ME_Radial_b_pl, ME_Radial_bm_pl, ME_Radial_Db_pl, ME_Radial_b_ml, ME_Radial_bm_ml, \
-    ME_Radial_Db_ml, ME_Radial_id_pl, ME_Radial_id_ml, MF_Radial_id_poly, MF_Radial_id_pl, lamvar
+    ME_Radial_Db_ml, ME_Radial_id_pl, ME_Radial_id_ml, MF_Radial_id_poly, MF_Radial_id_pl, lamvar, \
+    MF_Radial_id_poly_eval
 
 
 class TestME_Radial_S0:
@@ -544,4 +545,20 @@ class TestMF_Radial_id_pl:
         pl_expr: Expr = MF_Radial_id_pl(lamvar, mu, nu, r)
         pl_val: float = float(pl_expr.subs(lamvar, lambdaa))
         pl_num: float = float(MF_Radial_id_pl(lambdaa, mu, nu, r))
-        assert math.isclose(pl_val, pl_num)
\ No newline at end of file
+        assert math.isclose(pl_val, pl_num)
+
+
+class TestMF_Radial_id_poly_eval:
+    """Test the MF_Radial_id_poly_eval() function against the SymPy reference MF_Radial_id_poly()."""
+
+    @pytest.mark.parametrize(
+        "mu,nu,r", [
+            (mu, nu, r) for mu in range(0, 12, 3) for r in range(4) for nu in range(mu + r + 1)
+        ]
+    )
+    @pytest.mark.parametrize("log_space", [False, True])
+    def test_ok(self, mu, nu, r, log_space):
+        lambdaa: float = 4.5
+        expected: float = float(MF_Radial_id_poly(mu, nu, r).subs(lamvar, lambdaa))
+        value: float = float(MF_Radial_id_poly_eval(lambdaa, mu, nu, r, log_space))
+        assert math.isclose(value, expected, rel_tol=1e-9, abs_tol=1e-6)
@@ -6,7 +6,10 @@ import numpy as np
 from acmpy.compat import NDArrayFloat, list_to_ndarray, is_nd_square
 from acmpy.radial_space import Radial_Operators, Radial_Sm, Parse_RadialOp_List, Radial_D2b, KTSOps, KTSOp, KTOp, \
     RepRadial_bS_DS, Radial_b, Radial_b2, Radial_bm, Radial_bm2, Matrix_sqrt, Matrix_sqrtInv, \
-    RepRadial, ME_Radial_b2, RepRadial_b2_sqrt, RepRadial_b2_sqrtInv
+    RepRadial, ME_Radial_b2, RepRadial_b2_sqrt, RepRadial_b2_sqrtInv, RepRadial_param, \
+    ME_Radial_arrays, ME_Radial_param_arrays, RepRadialshfs_Prod, RepRadialshfs_Prod_band, RepRadial_b2_eigen, \
+    Tridiagonal_eigen
+from acmpy.cache_manager import cache_manager
 
 
 def is_same_shape_and_square(A: NDArrayFloat, B: NDArrayFloat) -> bool:
@@ -227,3 +230,80 @@ class TestRepRadial_b2_sqrtInv:
         M: NDArrayFloat = RepRadial_b2_sqrtInv(lambdaa, 0, 2)
         E: NDArrayFloat = list_to_ndarray(expected)
         assert allclose(M, E, atol=1e-8)
+
+
+class TestRepRadial_b2_eigen:
+    """Tests the function RepRadial_b2_eigen() and the square roots obtained from it."""
+
+    @pytest.mark.parametrize("lambdaa", [1.5, 2.5, 3.5])
+    @pytest.mark.parametrize("nu_min,nu_max", [(0, 0), (0, 6), (2, 9)])
+    def test_ok(self, lambdaa, nu_min, nu_max, allclose):
+        Mat: NDArrayFloat = RepRadial(ME_Radial_b2, lambdaa, nu_min, nu_max)
+        eigen_vals, P = RepRadial_b2_eigen(lambdaa, nu_min, nu_max)
+        assert allclose(P.T @ P, np.eye(len(eigen_vals)))
+        assert allclose(Mat @ P, P * eigen_vals)
+
+        sqrt_Mat: NDArrayFloat = RepRadial_b2_sqrt(lambdaa, nu_min, nu_max)
+        assert allclose(sqrt_Mat, Matrix_sqrt(Mat))
+        assert allclose(sqrt_Mat @ RepRadial_b2_sqrtInv(lambdaa, nu_min, nu_max), np.eye(len(eigen_vals)))
+
+    def test_bad_offdiagonal(self):
+        with pytest.raises(ValueError):
+            Tridiagonal_eigen(np.ones(3), np.ones(3))
+
+
+class TestRepRadial_arrays:
+    """Tests that the array versions of the matrix element functions agree with the scalar versions."""
+
+    @pytest.mark.parametrize("lambdaa", [1.5, 2.5, 3.5])
+    @pytest.mark.parametrize("ME", list(ME_Radial_arrays.keys()), ids=lambda ME: ME.__name__)
+    def test_ok(self, ME, lambdaa, allclose):
+        M: NDArrayFloat = RepRadial(ME, lambdaa, 1, 6)
+        E: NDArrayFloat = np.array([[float(ME(lambdaa, mu_f, mu_i))
+                                     for mu_i in range(1, 7)]
+                                    for mu_f in range(1, 7)])
+        assert allclose(M, E)
+
+    @pytest.mark.parametrize("r", [0, 1, 2])
+    @pytest.mark.parametrize("ME", list(ME_Radial_param_arrays.keys()), ids=lambda ME: ME.__name__)
+    def test_param_ok(self, ME, r, allclose):
+        lambdaa: float = 2.5 + 2 * r
+        M: NDArrayFloat = RepRadial_param(ME, lambdaa, 0, 4, r)
+        E: NDArrayFloat = np.array([[ME(lambdaa, mu_f, mu_i, r)
+                                     for mu_i in range(5)]
+                                    for mu_f in range(5)])
+        assert allclose(M, E)
+
+    def test_band(self, allclose):
+        ME_array = ME_Radial_arrays[ME_Radial_b2]
+        mu: np.ndarray = np.arange(5)
+        diagonal: NDArrayFloat = ME_array(2.5, mu, mu)
+        upper: NDArrayFloat = ME_array(2.5, mu[:-1], mu[1:])
+        assert allclose(diagonal, [2.5, 4.5, 6.5, 8.5, 10.5])
+        assert allclose(upper, [ME_Radial_b2(2.5, i, i + 1) for i in range(4)])
+
+
+class TestRepRadialshfs_Prod:
+    """Tests the RepRadialshfs_Prod() function."""
+
+    @pytest.mark.parametrize("rps_op,lambda_shfs", [
+        ((KTOp(0, 2), KTOp(2, 0)), (0, 0)),
+        ((KTOp(2, 2), KTOp(2, 0), KTOp(-1, 0)), (0, 2, -1)),
+        ((KTOp(0, 1), KTOp(2, 1)), (-1, 1))
+    ])
+    def test_product(self, rps_op, lambda_shfs, allclose):
+        expected: NDArrayFloat = np.eye(6)
+        lambda_run: float = 2.5
+        for r_op, R in reversed(list(zip(rps_op, lambda_shfs))):
+            expected = RepRadial_bS_DS(r_op.K, r_op.T, 1.5, lambda_run, R, 0, 5) @ expected
+            lambda_run += R
+        assert allclose(RepRadialshfs_Prod(rps_op, 1.5, 2.5, lambda_shfs, 0, 5), expected)
+
+    def test_shared_suffix(self):
+        cache_manager.clear()
+        cache_manager.reset_stats()
+        RepRadialshfs_Prod((KTOp(0, 2), KTOp(2, 0)), 1.5, 2.5, (0, 0), 0, 5)
+        RepRadialshfs_Prod((KTOp(2, 0),), 1.5, 2.5, (0,), 0, 5)
+        assert RepRadialshfs_Prod_band.cache_info().hits == 1
+        cache_manager.clear()
+
@@ -1,10 +1,13 @@
 """Tests the so5_so3_cg.py module."""
 
+import math
 import pytest
+import numpy as np
 
 from sympy import Rational, S
 
-from acmpy.so5_so3_cg import CG_SO3, Wigner_3j
+from acmpy.so5_so3_cg import CG_SO3, Wigner_3j, CG_SO5r3, CG_SO5r3_block, CG_labels, SO5r3_index, SO5r3_count
+from acmpy.spherical_space import dimSO3, dimSO5, dimSO5r3, lbsSO5r3_rngVvarL
 
 
 class TestWigner_3j:
@@ -33,3 +36,40 @@ class TestCG_SO3:
     )
     def test_ok(self, j1, m1, j2, m2, j3, m3, expected):
         assert CG_SO3(j1, m1, j2, m2, j3, m3) == expected
+
+
+class TestSO5r3_index:
+    @pytest.mark.parametrize('v', [0, 1, 2, 3, 6])
+    def test_ok(self, v):
+        labels = [(a, L) for L in range(2 * v + 1) for a in range(1, dimSO5r3(v, L) + 1)]
+        assert [SO5r3_index(v, a, L) for a, L in labels] == list(range(len(labels)))
+        assert SO5r3_count(v) == len(labels)
+
+
+class TestCG_SO5r3:
+    def test_table(self, fake_database):
+        for (v1, v2, a2, L2, v3), coeffs in fake_database.items():
+            for (a1, L1, a3, L3), coeff in zip(CG_labels(v1, L2, v3), coeffs):
+                assert CG_SO5r3(v1, a1, L1, v2, a2, L2, v3, a3, L3) == coeff
+
+    def test_swapped(self, fake_database):
+        coeffs = fake_database[(1, 2, 1, 2, 3)]
+        for (a1, L1, a3, L3), coeff in zip(CG_labels(1, 2, 3), coeffs):
+            expected: float = coeff * (-1) ** (L3 + 2 - L1) * math.sqrt(dimSO5(1) * dimSO3(L3) / dimSO5(3) / dimSO3(L1))
+            assert CG_SO5r3(3, a3, L3, 2, 1, 2, 1, a1, L1) == pytest.approx(expected)
+
+    def test_triangle(self, fake_database):
+        assert CG_SO5r3(1, 1, 2, 2, 1, 2, 3, 1, 6) == 0.0
+        assert CG_SO5r3(1, 1, 2, 2, 1, 2, 2, 1, 2) == 0.0
+
+
+class TestCG_SO5r3_block:
+    @pytest.mark.parametrize('v_min,v_max,L_min,L_max', [(0, 3, 0, 6), (1, 3, 2, 2), (2, 3, 0, 4)])
+    def test_ok(self, fake_database, v_min, v_max, L_min, L_max, allclose):
+        states = lbsSO5r3_rngVvarL(v_min, v_max, L_min, L_max)
+        expected = np.array([[CG_SO5r3(*i, 2, 1, 2, *f) for i in states] for f in states])
+        assert allclose(CG_SO5r3_block(states, 2, 1, 2, states), expected)
+
+    def test_not_harmonic(self):
+        states = lbsSO5r3_rngVvarL(0, 3, 0, 6)
+        assert not CG_SO5r3_block(states, 2, 2, 2, states).any()
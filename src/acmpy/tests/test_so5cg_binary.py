@@ -0,0 +1,70 @@
+"""This module tests the so5cg_binary.py module."""
+
+from pathlib import Path
+import pytest
+from acmpy.so5cg_binary import SO5CGBinary, SO5CGQuintet, convert_SO5CG_database, datafile_paths, \
+    default_binary_name
+from acmpy.so5_so3_cg import SO5CGConfig, CG_coeffs, CG_labels, CG_SO5r3, SO5r3_index, load_CG_table
+
+
+def write_datafile(base: Path, quintet: SO5CGQuintet) -> list[float]:
+    """Write an SO5CG data file with made up coefficients for the quintet and return them."""
+    v1, v2, a2, L2, v3 = quintet
+    labels = CG_labels(v1, L2, v3)
+    coeffs: list[float] = [0.125 * (i + 1) * (-1) ** i for i in range(len(labels))]
+
+    path: Path = base / f'v2={v2}' / f'SO5CG_{v1}_{v2}_{v3}' / f'SO5CG_{v1}_{v2}-{a2}-{L2}_{v3}'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(''.join(f'{c:+e}  {v1} {a1} {L1}  {v2} {a2} {L2}  {v3} {a3} {L3}\n'
+                            for c, (a1, L1, a3, L3) in zip(coeffs, labels)))
+    return coeffs
+
+
+@pytest.fixture
+def database(tmp_path):
+    tables: dict[SO5CGQuintet, list[float]] = {quintet: write_datafile(tmp_path, quintet)
+                                               for quintet in [(1, 1, 1, 2, 2), (0, 2, 1, 4, 2), (1, 3, 1, 0, 2)]}
+    return tmp_path, tables
+
+
+class TestSO5CGBinary:
+    """Tests the conversion and loading of a binary SO5CG database."""
+
+    def test_datafile_paths(self, database):
+        base, tables = database
+        assert list(datafile_paths(base)) == sorted(tables)
+
+    def test_roundtrip(self, database, allclose):
+        base, tables = database
+        assert convert_SO5CG_database(str(base)) == 3
+
+        binary: SO5CGBinary = SO5CGBinary(str(base / default_binary_name))
+        assert len(binary) == 3
+        for quintet, coeffs in tables.items():
+            assert quintet in binary
+            assert allclose(binary.get(quintet), coeffs)
+        assert binary.get((2, 2, 1, 2, 2)) is None
+
+    def test_not_binary(self, tmp_path):
+        path: Path = tmp_path / 'bad.bin'
+        path.write_bytes(b'not a database at all')
+        with pytest.raises(ValueError):
+            SO5CGBinary(str(path))
+
+    def test_load_CG_table(self, database):
+        base, tables = database
+        convert_SO5CG_database(str(base))
+        for file in base.glob('v2=*/*/*'):
+            file.unlink()
+
+        saved: str = SO5CGConfig.base_directory
+        try:
+            SO5CGConfig.set_base_directory(str(base) + '/')
+            load_CG_table(1, 1, 1, 2, 2)
+            coeffs: list[float] = tables[(1, 1, 1, 2, 2)]
+            a1, L1, a3, L3 = CG_labels(1, 2, 2)[1]
+            assert CG_SO5r3(1, a1, L1, 1, 1, 2, 2, a3, L3) == coeffs[1]
+            assert CG_coeffs[(1, 1, 1, 2, 2)][SO5r3_index(1, a1, L1), SO5r3_index(2, a3, L3)] == coeffs[1]
+        finally:
+            CG_coeffs.pop((1, 1, 1, 2, 2), None)
+            SO5CGConfig.set_base_directory(saved)
@@ -0,0 +1,116 @@
+"""This module tests the spherical_store.py module."""
+
+import pytest
+import numpy as np
+from acmpy.compat import NDArrayFloat
+from acmpy.cache_manager import CacheManager, CachePolicy, cache_manager
+from acmpy.so5_so3_cg import SO5CGConfig
+from acmpy.spherical_space import lbsSO5r3_rngVvarL, SO5SO3Label
+from acmpy.spherical_store import SphericalOperatorStore, SphericalRange, SphericalStoreInfo, \
+    range_contains, sub_block_indices, spherical_store
+
+
+def label_matrix(ranges: SphericalRange) -> NDArrayFloat:
+    """Return a matrix whose elements depend only on the labels of the states, like a spherical harmonic."""
+    states: list[SO5SO3Label] = lbsSO5r3_rngVvarL(*ranges)
+    return np.array([[100 * vi + 10 * ai + Li + 0.01 * (vj + aj + Lj)
+                      for (vj, aj, Lj) in states]
+                     for (vi, ai, Li) in states])
+
+
+class TestSubBlockIndices:
+    """Tests the sub-block functions."""
+
+    @pytest.mark.parametrize("outer,inner,expected", [
+        ((0, 6, 0, 6), (1, 4, 2, 3), True),
+        ((0, 6, 0, 6), (0, 6, 0, 6), True),
+        ((1, 6, 0, 6), (0, 6, 0, 6), False),
+        ((0, 6, 2, 4), (0, 6, 2, 5), False)
+    ])
+    def test_range_contains(self, outer, inner, expected):
+        assert range_contains(outer, inner) == expected
+
+    @pytest.mark.parametrize("outer,inner", [
+        ((0, 6, 0, 6), (1, 4, 2, 3)),
+        ((0, 6, 0, 6), (0, 6, 0, 6)),
+        ((0, 5, 2, 4), (3, 5, 4, 4))
+    ])
+    def test_sub_block(self, outer, inner, allclose):
+        idx = sub_block_indices(outer, inner)
+        assert allclose(label_matrix(outer)[np.ix_(idx, idx)], label_matrix(inner))
+
+
+class TestSphericalOperatorStore:
+    """Tests the SphericalOperatorStore class."""
+
+    def test_get_put(self):
+        store: SphericalOperatorStore = SphericalOperatorStore()
+        ranges: SphericalRange = (0, 3, 0, 2)
+        M: NDArrayFloat = label_matrix(ranges)
+
+        assert store.get('Y', ranges) is None
+        store.put('Y', ranges, M)
+        assert store.get('Y', ranges) is M
+        assert store.get('Z', ranges) is None
+        assert store.info() == SphericalStoreInfo(1, 0, 2, 1, M.nbytes)
+
+    def test_extract(self, allclose):
+        store: SphericalOperatorStore = SphericalOperatorStore()
+        store.put('Y', (0, 6, 0, 6), label_matrix((0, 6, 0, 6)))
+
+        assert store.get('Y', (1, 4, 2, 3)) is None
+        M: NDArrayFloat = store.get('Y', (1, 4, 2, 3), extract=True)
+        assert allclose(M, label_matrix((1, 4, 2, 3)))
+        assert store.get('Y', (1, 4, 2, 3)) is None
+        assert store.get('Y', (0, 7, 0, 6), extract=True) is None
+        assert store.info() == SphericalStoreInfo(0, 1, 3, 1, label_matrix((0, 6, 0, 6)).nbytes)
+
+    def test_disabled(self):
+        store: SphericalOperatorStore = SphericalOperatorStore()
+        store.enabled = False
+        store.put('Y', (0, 1, 0, 1), label_matrix((0, 1, 0, 1)))
+        assert store.get('Y', (0, 1, 0, 1)) is None
+
+    def test_clear(self):
+        store: SphericalOperatorStore = SphericalOperatorStore()
+        store.put('Y', (0, 1, 0, 1), label_matrix((0, 1, 0, 1)))
+        store.clear()
+        assert store.get('Y', (0, 1, 0, 1)) is None
+        assert store.info().currsize == 0
+
+    def test_bounded(self):
+        manager: CacheManager = CacheManager()
+        store: SphericalOperatorStore = SphericalOperatorStore(manager)
+        M: NDArrayFloat = label_matrix((0, 3, 0, 2))
+        manager.register('store', store)
+        manager.set_policy(CachePolicy.BOUNDED, 2 * M.nbytes)
+
+        for op in ('X', 'Y', 'Z'):
+            store.put(op, (0, 3, 0, 2), M)
+        assert store.get('X', (0, 3, 0, 2)) is None
+        assert store.get('Z', (0, 3, 0, 2)) is M
+        assert store.cache_info().evictions == 1
+        assert store.nbytes == 2 * M.nbytes
+
+        manager.clear()
+        assert store.info().currsize == 0
+
+
+class TestSphericalStoreManager:
+    """Tests that the spherical_store is managed by the cache_manager."""
+
+    def test_registered(self):
+        assert cache_manager.caches['spherical_store'] is spherical_store
+
+    def test_clear(self, tmp_path):
+        spherical_store.put('Y', (0, 1, 0, 1), label_matrix((0, 1, 0, 1)))
+        cache_manager.clear()
+        assert spherical_store.get('Y', (0, 1, 0, 1)) is None
+
+        saved = SO5CGConfig.base_directory
+        spherical_store.put('Y', (0, 1, 0, 1), label_matrix((0, 1, 0, 1)))
+        SO5CGConfig.set_base_directory(str(tmp_path) + '/')
+        try:
+            assert spherical_store.get('Y', (0, 1, 0, 1)) is None
+        finally:
+            SO5CGConfig.set_base_directory(saved)
@@ -0,0 +1,66 @@
+"""This module tests the term_matrices.py module."""
+
+import pytest
+from sympy import S
+from acmpy.internal_operators import ACM_Hamiltonian, SENIORITY
+from acmpy.radial_space import Radial_b2
+from acmpy.full_operators import RepXspace
+from acmpy.full_space import DigXspace
+from acmpy.eigenvalues import EigenSession
+from acmpy.term_matrices import TermMatrices, ACM_Hamiltonian_terms
+
+radial_names = ('c11', 'c20', 'c21', 'c22', 'c23')
+
+
+@pytest.fixture
+def radial_terms():
+    return TermMatrices(ACM_Hamiltonian_terms(radial_names), 1.5, 2.5, 0, 4, 0, 3, 0, 3)
+
+
+class TestTermMatrices:
+    """Tests the TermMatrices class."""
+
+    @pytest.mark.parametrize("coeffs", [
+        {'c11': -0.5, 'c21': 1.25},
+        {'c11': -0.25, 'c20': 3, 'c22': 0.5, 'c23': 2}
+    ])
+    def test_matrix(self, radial_terms, coeffs, allclose):
+        ham = ACM_Hamiltonian(**coeffs)
+        for L in radial_terms.Lvals:
+            assert allclose(radial_terms.matrix(coeffs, L), RepXspace(ham, 1.5, 2.5, 0, 4, 0, 3, L))
+
+    def test_sequence(self, radial_terms, allclose):
+        assert allclose(radial_terms.matrix([1, 0, 2, 0, 0], 2), radial_terms.matrix({'c11': 1, 'c21': 2}, 2))
+
+    def test_diagonalise(self, radial_terms, allclose):
+        coeffs = {'c11': -0.5, 'c21': 1.25, 'c22': 0.25}
+        eigen_vals, _, Xparams, Lvals = radial_terms.diagonalise(coeffs)
+        expected_vals, _, expected_Xparams, expected_Lvals = DigXspace(ACM_Hamiltonian(**coeffs),
+                                                                       1.5, 2.5, 0, 4, 0, 3, 0, 3)
+        assert Lvals == expected_Lvals == [0, 2, 3]
+        assert Xparams == expected_Xparams
+        for vals, expected in zip(eigen_vals, expected_vals):
+            assert allclose(vals, expected)
+
+    def test_session(self, radial_terms, allclose):
+        session = EigenSession(2)
+        for c21 in [1.25, 1.3]:
+            eigen_vals, eigen_bases, _, _ = radial_terms.diagonalise({'c11': -0.5, 'c21': c21}, session)
+            expected_vals = radial_terms.diagonalise({'c11': -0.5, 'c21': c21})[0]
+            for vals, bases, expected in zip(eigen_vals, eigen_bases, expected_vals):
+                assert bases.shape[1] == 2
+                assert allclose(vals, expected[:2])
+        assert len(session.stats) == 6
+
+    def test_state_dependent(self, allclose):
+        terms = TermMatrices({'a': ((SENIORITY + 1, (Radial_b2,)),), 'b': ((S.One, ()),)}, 1.0, 2.5, 0, 2, 0, 2, 2)
+        expected = RepXspace(((2 * SENIORITY + 2, (Radial_b2,)), (S(-1), ())), 1.0, 2.5, 0, 2, 0, 2, 2)
+        assert allclose(terms.matrix({'a': 2, 'b': -1}, 2), expected)
+
+    def test_bad_coeffs(self, radial_terms):
+        with pytest.raises(ValueError):
+            radial_terms.matrix({'c30': 1}, 0)
+        with pytest.raises(ValueError):
+            radial_terms.matrix([1, 2], 0)
+        with pytest.raises(ValueError):
+            radial_terms.matrix({'c11': 1}, 1)
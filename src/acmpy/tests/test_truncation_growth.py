@@ -0,0 +1,153 @@
+"""This module tests the truncation_growth.py module."""
+
+import numpy as np
+import pytest
+from sympy import S
+from acmpy.internal_operators import OperatorSum, ACM_Hamiltonian
+from acmpy.radial_space import Radial_b
+from acmpy.spherical_space import SpHarm_212
+from acmpy.full_space import DigXspace, AmpXspeig
+from acmpy.globals import ACM_set_basis_type
+from acmpy.truncation_growth import GrowingXspace, ACM_Converge, ACM_Truncate, ConvergenceResult, TruncationResult, \
+    relative_change
+
+
+@pytest.fixture
+def radial_ham() -> OperatorSum:
+    ACM_set_basis_type(0, 0.0, 0)
+    return ACM_Hamiltonian(c11=-0.5, c21=1, c22=0.25, c23=0.5)
+
+
+class TestGrowingXspace:
+    """Tests that the eigenvalues of a GrowingXspace agree with DigXspace() as it grows."""
+
+    def test_grow(self, radial_ham, allclose):
+        space: GrowingXspace = GrowingXspace(radial_ham, 1.5, 2.5, 0, 4, 0, 3, 0, 4)
+        for nu_max, v_max, L_max in [(4, 3, 4), (6, 3, 4), (6, 5, 4), (8, 5, 6)]:
+            space.grow(nu_max, v_max, L_max)
+            eigen_vals, eigen_bases, Xparams, Lvals = space.diagonalise(eig_num=3)
+            expected = DigXspace(radial_ham, 1.5, 2.5, 0, nu_max, 0, v_max, 0, L_max)
+            assert Lvals == expected[3]
+            assert Xparams == expected[2]
+            for vals, expected_vals in zip(eigen_vals, expected[0]):
+                assert allclose(vals, expected_vals[:3])
+
+    def test_grown(self, radial_ham, allclose):
+        space: GrowingXspace = GrowingXspace(radial_ham, 1.5, 2.5, 0, 4, 0, 3, 0, 4)
+        grown: GrowingXspace = space.grown(nu_max=6)
+        assert (space.nu_max, grown.nu_max) == (4, 6)
+        for vals, expected_vals in zip(space.diagonalise()[0], DigXspace(radial_ham, 1.5, 2.5, 0, 4, 0, 3, 0, 4)[0]):
+            assert allclose(vals, expected_vals)
+        for vals, expected_vals in zip(grown.diagonalise()[0], DigXspace(radial_ham, 1.5, 2.5, 0, 6, 0, 3, 0, 4)[0]):
+            assert allclose(vals, expected_vals)
+
+    def test_transitions(self, fake_Y_212, radial_ham, allclose):
+        tran_op: OperatorSum = ((S.One, (Radial_b, SpHarm_212)),)
+        space: GrowingXspace = GrowingXspace(radial_ham, 1.5, 2.5, 0, 2, 0, 2, 0, 4, tran_op)
+        space.grow(nu_max=3, v_max=3, L_max=6)
+        eigen_vals, eigen_bases, Xparams, Lvals = space.diagonalise()
+
+        actual = space.transitions(eigen_bases, 2, 3)
+        expected = AmpXspeig(tran_op, eigen_bases, Xparams, Lvals, 2, 3)
+        for L_row in Lvals:
+            for L_col in Lvals:
+                assert allclose(actual.get_block(L_row, L_col), expected.get_block(L_row, L_col))
+
+    def test_shrink(self, radial_ham):
+        space: GrowingXspace = GrowingXspace(radial_ham, 1.5, 2.5, 0, 4, 0, 3, 0, 4)
+        with pytest.raises(ValueError):
+            space.grow(v_max=2)
+
+    def test_no_transitions(self, radial_ham):
+        space: GrowingXspace = GrowingXspace(radial_ham, 1.5, 2.5, 0, 4, 0, 3, 0, 4)
+        with pytest.raises(ValueError):
+            space.transitions(space.diagonalise()[1])
+
+
+class TestACM_Converge:
+    """Tests the ACM_Converge() function."""
+
+    @pytest.mark.parametrize("previous,current,expected", [
+        ([1.0, 2.0], [1.0, 2.0], 0.0),
+        ([1.0, 4.0], [1.0, 5.0], 0.2),
+        ([0.01, np.nan], [0.02, np.nan], 0.01),
+        ([1.0, np.nan], [1.0, 2.0], np.inf),
+        ([np.nan], [np.nan], 0.0)
+    ])
+    def test_relative_change(self, previous, current, expected, allclose):
+        assert allclose(relative_change(np.array(previous), np.array(current)), expected)
+
+    def test_converge(self, radial_ham):
+        result: ConvergenceResult = ACM_Converge(radial_ham, 1.5, 2.5, 0, 0, 0, 4,
+                                                 [(nu_max, 4) for nu_max in range(4, 30, 2)],
+                                                 tol=1e-4, eig_num=3, rat_lst=(), trace_memory=False)
+        assert result.converged
+        assert result.steps[0].change == np.inf
+        assert result.steps[-1].change < 1e-4
+        assert all(step.change >= 1e-4 for step in result.steps[:-1])
+        assert result.nu_max == result.steps[-1].nu_max < 28
+        assert result.steps[-1].eigenvalues.shape == (5, 3)
+        assert np.isnan(result.steps[-1].eigenvalues[1]).all()
+
+    def test_not_converged(self, radial_ham):
+        result: ConvergenceResult = ACM_Converge(radial_ham, 1.5, 2.5, 0, 0, 0, 2, [(2, 2), (4, 2)],
+                                                 tol=1e-12, eig_num=2, rat_lst=())
+        assert not result.converged
+        assert len(result.steps) == 2
+        assert all(step.seconds > 0 and step.peak_bytes > 0 for step in result.steps)
+
+    @pytest.mark.parametrize("truncations,tol,rat_lst", [
+        ([], 1e-4, ()),
+        ([(2, 2)], 0.0, ()),
+        ([(2, 2)], 1e-4, ((2, 0, 1),))
+    ])
+    def test_bad_arguments(self, radial_ham, truncations, tol, rat_lst):
+        with pytest.raises(ValueError):
+            ACM_Converge(radial_ham, 1.5, 2.5, 0, 0, 0, 2, truncations, tol=tol, eig_num=2, rat_lst=rat_lst)
+
+
+class TestACM_Truncate:
+    """Tests the ACM_Truncate() function."""
+
+    def test_truncate(self, radial_ham):
+        result: TruncationResult = ACM_Truncate(radial_ham, 1.5, 2.5, 0, 4, 0, 2, 0, 4, tol=1e-3, eig_num=3, rat_lst=(),
+                                                trace_memory=False)
+        assert result.converged
+        assert (result.nu_max, result.v_max) == (6, 4)
+        assert all(step.peak_bytes is None for step in result.steps)
+        assert result.seconds > 0
+
+        # the last two steps are the growths of the chosen truncation along nu and v
+        assert [(step.nu_max, step.v_max) for step in result.steps[-2:]] == [(8, 4), (6, 5)]
+        assert all(step.change < 1e-3 for step in result.steps[-2:])
+
+        expected: ConvergenceResult = ACM_Converge(radial_ham, 1.5, 2.5, 0, 0, 0, 4, [(6, 4), (8, 4)],
+                                                   tol=1e-3, eig_num=3, rat_lst=())
+        assert np.array_equal(result.steps[-2].eigenvalues, expected.steps[-1].eigenvalues, equal_nan=True)
+
+    def test_limits(self, radial_ham):
+        result: TruncationResult = ACM_Truncate(radial_ham, 1.5, 2.5, 0, 4, 0, 2, 0, 4, tol=1e-12, eig_num=2,
+                                                rat_lst=(), nu_limit=6, v_limit=3, trace_memory=False)
+        assert not result.converged
+        assert (result.nu_max, result.v_max) == (6, 3)
+
+    @pytest.mark.parametrize("nu_limit,v_limit,expected", [(6, 18, (6, 4)), (50, 4, (6, 4)), (50, 2, (6, 2))])
+    def test_one_limit(self, radial_ham, nu_limit, v_limit, expected):
+        result: TruncationResult = ACM_Truncate(radial_ham, 1.5, 2.5, 0, 4, 0, 2, 0, 4, tol=1e-3, eig_num=3, rat_lst=(),
+                                                nu_limit=nu_limit, v_limit=v_limit, trace_memory=False)
+        # the other direction is not grown to its limit, but the limited direction did not meet tol
+        assert not result.converged
+        assert (result.nu_max, result.v_max) == expected
+        assert result.steps[-1].change < 1e-3
+        assert len(result.steps) < 12
+
+    @pytest.mark.parametrize("nu_max,v_max,nu_step,v_step,nu_limit,v_limit", [
+        (4, 2, 0, 1, 50, 18),
+        (4, 2, 2, 0, 50, 18),
+        (4, 2, 2, 1, 2, 18),
+        (4, 2, 2, 1, 50, 1)
+    ])
+    def test_bad_arguments(self, radial_ham, nu_max, v_max, nu_step, v_step, nu_limit, v_limit):
+        with pytest.raises(ValueError):
+            ACM_Truncate(radial_ham, 1.5, 2.5, 0, nu_max, 0, v_max, 0, 2, eig_num=2, rat_lst=(),
+                         nu_step=nu_step, v_step=v_step, nu_limit=nu_limit, v_limit=v_limit)
@@ -0,0 +1,411 @@
+"""This module defines truncated Hilbert spaces that grow, for studies of the convergence of ACM calculations.
+
+Explanation
+===========
+
+The convergence of a calculation with the truncation of the Hilbert space is usually checked
+by repeating it, e.g. with ACM_Adapt, for larger nu_max or v_max until the results stop changing.
+Each of these calculations forms the matrices of the Hamiltonian and the transition operator from scratch.
+
+A GrowingXspace holds these operators as OperatorPlans (see operator_plan.py) and grows them,
+keeping the spherical matrices when only nu_max grows, and the radial matrices when only v_max grows::
+
+    space = GrowingXspace(ham_op, anorm, lambda_base, nu_min, 11, v_min, v_max, L_min, L_max, g.glb_rat_TRop)
+    eigen_vals, eigen_bases, Xparams, Lvals = space.diagonalise(eig_num=4)
+    space.grow(nu_max=13)
+    eigen_vals, eigen_bases, Xparams, Lvals = space.diagonalise(eig_num=4)
+
+ACM_Converge steps through a sequence of truncations with a GrowingXspace
+and stops at the first at which the lowest eigenvalues of each L and the selected transition rates
+have changed by less than a relative tolerance since the previous truncation.
+
+ACM_Truncate chooses the truncation itself. From a starting truncation, it tries growing nu_max and v_max
+in turn and moves to the truncation that changes the results the most, until neither changes them
+by more than the tolerance. It then returns that truncation, the smallest on its path that meets the tolerance::
+
+    result = ACM_Truncate(ham_op, anorm, lambda_base, nu_min, 6, v_min, 6, L_min, L_max, tol=1e-4)
+    ACM_Adapt(ham_op, anorm, lambda_base, nu_min, result.nu_max, v_min, result.v_max, L_min, L_max)
+
+Each step records the time taken and the peak memory allocated, as traced by tracemalloc,
+to form and diagonalise the matrices of its truncation. Tracing slows the Python parts of forming the matrices,
+so it can be turned off with trace_memory=False.
+"""
+
+import copy
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Iterator, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from acmpy.compat import nonnegint, require_nonnegint_range, NDArrayFloat
+from acmpy.internal_operators import OperatorSum, Op_Tame
+from acmpy.spherical_space import dimSO5r3_rngV
+from acmpy.full_operators import dimXspace
+from acmpy.eigenvalues import Eigenfiddle_lowest
+from acmpy.operator_plan import OperatorPlan
+from acmpy.full_space import AmpXspeig_mat, EigenValues, EigenBases, XParams, LValues, LBlockNDFloatArray
+from acmpy.parameter_scan import scan_rate
+from acmpy.globals import Designators
+import acmpy.globals as g
+
+
+class GrowingXspace:
+    """
+    This class models the representations of a Hamiltonian, and optionally a transition operator,
+    on the truncated full Hilbert space with the ranges nu_min,..,nu_max, v_min,..,v_max and L_min,..,L_max,
+    for the radial parameters anorm and lambda_base, which can be grown to larger nu_max, v_max and L_max.
+    As in DigXspace, a tame Hamiltonian is represented on each L space separately.
+    """
+
+    ham_op: OperatorSum
+    tran_op: Optional[OperatorSum]
+    anorm: float
+    lambda_base: float
+    nu_min: nonnegint
+    nu_max: nonnegint
+    v_min: nonnegint
+    v_max: nonnegint
+    L_min: nonnegint
+    L_max: nonnegint
+    Lvals: LValues
+    tame: bool
+    ham_plans: dict[nonnegint, OperatorPlan]
+    ham_plan: Optional[OperatorPlan]
+    tran_plan: Optional[OperatorPlan]
+
+    def __init__(self, ham_op: OperatorSum,
+                 anorm: float, lambda_base: float,
+                 nu_min: nonnegint, nu_max: nonnegint,
+                 v_min: nonnegint, v_max: nonnegint,
+                 L_min: nonnegint, L_max: Optional[nonnegint] = None,
+                 tran_op: Optional[OperatorSum] = None) -> None:
+        LLM: nonnegint = L_min if L_max is None else L_max
+
+        require_nonnegint_range('nu', nu_min, nu_max)
+        require_nonnegint_range('v', v_min, v_max)
+        require_nonnegint_range('L', L_min, LLM)
+
+        self.ham_op = ham_op
+        self.tran_op = tran_op
+        self.anorm = anorm
+        self.lambda_base = lambda_base
+        self.nu_min, self.nu_max = nu_min, nu_max
+        self.v_min, self.v_max = v_min, v_max
+        self.L_min, self.L_max = L_min, LLM
+        self.tame = Op_Tame(ham_op)
+        self.ham_plans = {}
+        self.ham_plan = None
+        self.tran_plan = None
+
+        self.update_plans()
+
+    def update_plans(self) -> None:
+        """Form the plans of the current truncation, growing those of the previous truncation."""
+        self.Lvals = [LL for LL in range(self.L_min, self.L_max + 1) if dimSO5r3_rngV(self.v_min, self.v_max, LL) > 0]
+
+        if self.tame:
+            self.ham_plans = {LL: self.ham_plans[LL].grow(self.nu_max, self.v_max) if LL in self.ham_plans
+                              else OperatorPlan(self.ham_op, self.nu_min, self.nu_max, self.v_min, self.v_max, LL)
+                              for LL in self.Lvals}
+        else:
+            self.ham_plan = self.plan(self.ham_op, self.ham_plan)
+
+        if self.tran_op is not None:
+            self.tran_plan = self.plan(self.tran_op, self.tran_plan)
+
+    def plan(self, x_oplc: OperatorSum, previous: Optional[OperatorPlan]) -> OperatorPlan:
+        """Return the plan of x_oplc on all the L values of the current truncation."""
+        if previous is None:
+            return OperatorPlan(x_oplc, self.nu_min, self.nu_max, self.v_min, self.v_max, self.L_min, self.L_max)
+
+        return previous.grow(self.nu_max, self.v_max, self.L_max)
+
+    def grow(self, nu_max: Optional[nonnegint] = None, v_max: Optional[nonnegint] = None,
+             L_max: Optional[nonnegint] = None) -> None:
+        """Grow the truncation to the larger nu_max, v_max and L_max given."""
+        nu_max = self.nu_max if nu_max is None else nu_max
+        v_max = self.v_max if v_max is None else v_max
+        L_max = self.L_max if L_max is None else L_max
+        if nu_max < self.nu_max or v_max < self.v_max or L_max < self.L_max:
+            raise ValueError(f'Cannot shrink the truncation ({self.nu_max}, {self.v_max}, {self.L_max})' +
+                             f' to ({nu_max}, {v_max}, {L_max})')
+
+        self.nu_max, self.v_max, self.L_max = nu_max, v_max, L_max
+        self.update_plans()
+
+    def grown(self, nu_max: Optional[nonnegint] = None, v_max: Optional[nonnegint] = None,
+              L_max: Optional[nonnegint] = None) -> 'GrowingXspace':
+        """Return the space grown to the larger nu_max, v_max and L_max given, leaving this space unchanged."""
+        space: GrowingXspace = copy.copy(self)
+        space.grow(nu_max, v_max, L_max)
+        return space
+
+    @property
+    def Xparams(self) -> XParams:
+        return self.anorm, self.lambda_base, self.nu_min, self.nu_max, self.v_min, self.v_max
+
+    def dim(self) -> int:
+        """Return the dimension of the truncated full Hilbert space."""
+        return dimXspace(self.nu_min, self.nu_max, self.v_min, self.v_max, self.L_min, self.L_max)
+
+    def diagonalise(self, eig_num: Optional[int] = None) -> tuple[EigenValues, EigenBases, XParams, LValues]:
+        """Diagonalise the Hamiltonian, obtaining the lowest eig_num eigenvalues of each L, returning as DigXspace."""
+        L_matrices: list[NDArrayFloat]
+        if self.tame:
+            L_matrices = [self.ham_plans[LL].evaluate(self.anorm, self.lambda_base) for LL in self.Lvals]
+        else:
+            assert self.ham_plan is not None
+            rep_matrix: NDArrayFloat = self.ham_plan.evaluate(self.anorm, self.lambda_base)
+            Ldims: list[int] = [dimXspace(self.nu_min, self.nu_max, self.v_min, self.v_max, LL) for LL in self.Lvals]
+            Lends: list[int] = np.cumsum(Ldims).tolist()
+            L_matrices = [rep_matrix[(Lend - Ldim):Lend, (Lend - Ldim):Lend] for Ldim, Lend in zip(Ldims, Lends)]
+
+        eigen_vals: EigenValues = []
+        eigen_bases: EigenBases = []
+        for L_matrix in L_matrices:
+            eigen_vals_result, eigen_bases_result = Eigenfiddle_lowest(L_matrix, eig_num)
+            eigen_vals.append(eigen_vals_result)
+            eigen_bases.append(eigen_bases_result)
+
+        return eigen_vals, eigen_bases, self.Xparams, self.Lvals
+
+    def transitions(self, eigen_bases: EigenBases, tran_AM: Optional[nonnegint] = None,
+                    eig_num: Optional[int] = None) -> LBlockNDFloatArray:
+        """Return the matrix elements of the transition operator between the eigenstates, as AmpXspeig does."""
+        if self.tran_plan is None:
+            raise ValueError('No transition operator was given.')
+
+        # the states of the L values below Lvals[0] are the empty L spaces
+        tran_mat: NDArrayFloat = self.tran_plan.evaluate(self.anorm, self.lambda_base)
+        return AmpXspeig_mat(tran_mat, eigen_bases, self.Xparams, self.Lvals, tran_AM, eig_num)
+
+
+class ConvergenceStep(NamedTuple):
+    """
+    The results at a truncation of a convergence study: the lowest eigenvalues of each L of L_min,..,L_max,
+    padded with NaN, the raw transition rates of the designators, NaN where not available,
+    and the largest relative change of these since the previous truncation (infinite at the first).
+    The seconds and the peak bytes allocated are those spent forming and diagonalising the matrices,
+    the peak bytes being None if the memory was not traced.
+    """
+    nu_max: nonnegint
+    v_max: nonnegint
+    dim: int
+    eigenvalues: NDArrayFloat
+    rates: NDArrayFloat
+    change: float
+    seconds: float
+    peak_bytes: Optional[int]
+
+
+class ConvergenceResult(NamedTuple):
+    """The steps of a convergence study, the last of which is the converged truncation if converged is True."""
+    steps: list[ConvergenceStep]
+    converged: bool
+
+    @property
+    def nu_max(self) -> nonnegint:
+        return self.steps[-1].nu_max
+
+    @property
+    def v_max(self) -> nonnegint:
+        return self.steps[-1].v_max
+
+
+class TruncationResult(NamedTuple):
+    """
+    The truncation chosen by ACM_Truncate, whether it meets the tolerance,
+    and all the steps calculated, in order, including those of the rejected growths.
+    """
+    nu_max: nonnegint
+    v_max: nonnegint
+    converged: bool
+    steps: list[ConvergenceStep]
+
+    @property
+    def seconds(self) -> float:
+        return sum(step.seconds for step in self.steps)
+
+
+def relative_change(previous: NDArrayFloat, current: NDArrayFloat) -> float:
+    """
+    Return the largest change of the values relative to their magnitude (or 1 if smaller),
+    which is infinite if a value has become available, and 0 if there are no values.
+    """
+    if np.any(np.isnan(previous) & ~np.isnan(current)):
+        return np.inf
+
+    both: np.ndarray = ~np.isnan(previous) & ~np.isnan(current)
+    if not np.any(both):
+        return 0.0
+
+    return float(np.max(np.abs(current[both] - previous[both]) / np.maximum(1.0, np.abs(current[both]))))
+
+
+@contextmanager
+def tracing_memory(trace_memory: bool) -> Iterator[None]:
+    """Trace the memory allocations within the context if trace_memory, unless they are already traced."""
+    if not trace_memory or tracemalloc.is_tracing():
+        yield
+        return
+
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        tracemalloc.stop()
+
+
+def convergence_step(make_space: Callable[[], GrowingXspace], eig_num: int, rat_lst: Designators,
+                     previous: Optional[ConvergenceStep]) -> tuple[GrowingXspace, ConvergenceStep]:
+    """
+    Return the space made by make_space, its results and their change since the previous step,
+    with the time and the peak memory, if traced, spent making the space and obtaining the results.
+    """
+    tracing: bool = tracemalloc.is_tracing()
+    start_bytes: int = 0
+    if tracing:
+        tracemalloc.reset_peak()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+    start: float = time.perf_counter()
+
+    space: GrowingXspace = make_space()
+    Ls: list[nonnegint] = list(range(space.L_min, space.L_max + 1))
+
+    rat_num: int = max([eig_num] + [max(rate_ent[2], rate_ent[3]) for rate_ent in rat_lst])
+    eigen_vals, eigen_bases, Xparams, Lvals = space.diagonalise(rat_num)
+
+    eigs: NDArrayFloat = np.full((len(Ls), eig_num), np.nan)
+    for LL, vals in zip(Lvals, eigen_vals):
+        count: int = min(eig_num, len(vals))
+        eigs[Ls.index(LL), :count] = vals[:count]
+
+    rates: NDArrayFloat = np.full(len(rat_lst), np.nan)
+    if len(rat_lst) > 0:
+        trans: LBlockNDFloatArray = space.transitions(eigen_bases, g.glb_rat_TRopAM, rat_num)
+        rates[:] = [scan_rate(trans, Lvals, rate_ent) for rate_ent in rat_lst]
+
+    seconds: float = time.perf_counter() - start
+    peak_bytes: Optional[int] = max(0, tracemalloc.get_traced_memory()[1] - start_bytes) if tracing else None
+
+    change: float = np.inf
+    if previous is not None:
+        change = max(relative_change(previous.eigenvalues, eigs), relative_change(previous.rates, rates))
+
+    return space, ConvergenceStep(space.nu_max, space.v_max, space.dim(), eigs, rates, change, seconds, peak_bytes)
+
+
+def convergence_arguments(tol: float, eig_num: Optional[int], rat_lst: Optional[Designators]
+                          ) -> tuple[int, Designators]:
+    """Check the tolerance, and return eig_num and rat_lst, by default from the globals."""
+    if tol <= 0:
+        raise ValueError(f'tol must be positive: {tol}')
+
+    if eig_num is None:
+        eig_num = g.glb_eig_num
+    if eig_num < 1:
+        raise ValueError(f'eig_num must be positive: {eig_num}')
+
+    if rat_lst is None:
+        rat_lst = tuple(rate_ent for rate_ent in g.glb_rat_lst if len(rate_ent) == 4)
+    for rate_ent in rat_lst:
+        if len(rate_ent) != 4 or rate_ent[2] < 1 or rate_ent[3] < 1:
+            raise ValueError(f'Bad transition rate specification: {rate_ent}')
+
+    return eig_num, tuple(rat_lst)
+
+
+def ACM_Converge(ham_op: OperatorSum,
+                 anorm: float, lambda_base: float,
+                 nu_min: nonnegint, v_min: nonnegint,
+                 L_min: nonnegint, L_max: Optional[nonnegint],
+                 truncations: Sequence[tuple[nonnegint, nonnegint]],
+                 tol: float = 1e-4,
+                 eig_num: Optional[int] = None, rat_lst: Optional[Designators] = None,
+                 trace_memory: bool = True
+                 ) -> ConvergenceResult:
+    """
+    Diagonalise the Hamiltonian on the truncations (nu_max, v_max) in turn, which must grow,
+    until the lowest eig_num eigenvalues of each L and the transition rates of rat_lst
+    change by less than tol relative to their magnitude (or 1 if smaller).
+    By default, eig_num is glb_eig_num and the designators of length 4 in glb_rat_lst are used.
+    """
+    if len(truncations) == 0:
+        raise ValueError('There must be at least one truncation.')
+    eig_num, rat_lst = convergence_arguments(tol, eig_num, rat_lst)
+    tran_op: Optional[OperatorSum] = g.glb_rat_TRop if len(rat_lst) > 0 else None
+
+    with tracing_memory(trace_memory):
+        nu_max, v_max = truncations[0]
+        space, step = convergence_step(
+            lambda: GrowingXspace(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, L_max, tran_op),
+            eig_num, rat_lst, None)
+
+        steps: list[ConvergenceStep] = [step]
+        for nu_max, v_max in truncations[1:]:
+            space, step = convergence_step(lambda: space.grown(nu_max, v_max), eig_num, rat_lst, steps[-1])
+            steps.append(step)
+            if step.change < tol:
+                return ConvergenceResult(steps, True)
+
+    return ConvergenceResult(steps, False)
+
+
+def ACM_Truncate(ham_op: OperatorSum,
+                 anorm: float, lambda_base: float,
+                 nu_min: nonnegint, nu_max: nonnegint,
+                 v_min: nonnegint, v_max: nonnegint,
+                 L_min: nonnegint, L_max: Optional[nonnegint] = None,
+                 tol: float = 1e-4,
+                 eig_num: Optional[int] = None, rat_lst: Optional[Designators] = None,
+                 nu_step: nonnegint = 2, v_step: nonnegint = 1,
+                 nu_limit: nonnegint = 50, v_limit: nonnegint = 18,
+                 trace_memory: bool = True
+                 ) -> TruncationResult:
+    """
+    Starting from the truncation nu_max, v_max, return the smallest truncation found at which growing
+    nu_max by nu_step or v_max by v_step changes the lowest eig_num eigenvalues of each L
+    and the transition rates of rat_lst by less than tol relative to their magnitude (or 1 if smaller).
+    At each step, both growths are tried and the one with the larger change is made.
+    Once nu_limit or v_limit is reached, only the other growth is tried, and the truncation is returned
+    when that meets tol, with converged False, since the growth along the limited direction did not.
+    If both limits are reached first, the largest truncation is returned, with converged False.
+    By default, eig_num is glb_eig_num and the designators of length 4 in glb_rat_lst are used.
+    """
+    require_nonnegint_range('nu', nu_min, nu_max)
+    require_nonnegint_range('v', v_min, v_max)
+    if nu_step < 1 or v_step < 1:
+        raise ValueError(f'The steps must be positive: {nu_step}, {v_step}')
+    if nu_limit < nu_max or v_limit < v_max:
+        raise ValueError(f'The limits ({nu_limit}, {v_limit}) are below the truncation ({nu_max}, {v_max})')
+    eig_num, rat_lst = convergence_arguments(tol, eig_num, rat_lst)
+    tran_op: Optional[OperatorSum] = g.glb_rat_TRop if len(rat_lst) > 0 else None
+
+    with tracing_memory(trace_memory):
+        space, step = convergence_step(
+            lambda: GrowingXspace(ham_op, anorm, lambda_base, nu_min, nu_max, v_min, v_max, L_min, L_max, tran_op),
+            eig_num, rat_lst, None)
+        steps: list[ConvergenceStep] = [step]
+
+        while True:
+            growths: list[tuple[nonnegint, nonnegint]] = []
+            if space.nu_max < nu_limit:
+                growths.append((min(space.nu_max + nu_step, nu_limit), space.v_max))
+            if space.v_max < v_limit:
+                growths.append((space.nu_max, min(space.v_max + v_step, v_limit)))
+            if len(growths) == 0:
+                return TruncationResult(space.nu_max, space.v_max, False, steps)
+
+            current: ConvergenceStep = step
+            tries: list[tuple[GrowingXspace, ConvergenceStep]] = []
+            for nu_grown, v_grown in growths:
+                tries.append(convergence_step(lambda: space.grown(nu_grown, v_grown), eig_num, rat_lst, current))
+                steps.append(tries[-1][1])
+
+            # a limit is only reached by a growth that did not meet tol, or is the starting truncation
+            if all(tried.change < tol for _, tried in tries):
+                return TruncationResult(space.nu_max, space.v_max, len(growths) == 2, steps)
+
+            space, step = max(tries, key=lambda tried: tried[1].change)
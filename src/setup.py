@@ -13,6 +13,7 @@ setup(
     long_description_content_type='text/markdown',
     url='https://github.com/agryman/acmpy',
     packages=find_packages(),
+    install_requires=['threadpoolctl'],
     classifiers=[
         'Programming Language :: Python :: 3',
         'Operating System :: OS Independent',